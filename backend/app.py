@@ -2,7 +2,7 @@
 Moodflo V2 - FastAPI Backend
 Real-time emotion analysis for meeting recordings
 """
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 import uvicorn
@@ -11,20 +11,55 @@ import tempfile
 import os
 import asyncio
 import json
-from typing import Dict, Optional
+import hashlib
+import shutil
+from typing import BinaryIO, Dict, Optional, Tuple
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from services.analyzer_service import AnalyzerService
+from services.analyzer_service import AnalyzerService, STAGE_PROGRESS
 from services.realtime_service import RealtimeStreamingService
+from services.analysis_cache import AnalysisCache
+from services.stream_connection import StreamConnection
+from services.stream_protocol import DeltaUpdateEncoder, negotiate_subprotocol
+from services.stream_broadcast import BroadcastRegistry
+from services.session_store import create_session_store
+from services.session_reaper import SessionReaper
+from services.job_queue import AnalysisJob, AnalysisJobQueue, QueueFullError
 from models.schemas import AnalysisResponse, StreamConfig
 from modules.report_generator import ReportGenerator
+from core.worker_pool import EmotionWorkerPool
+from core.task_executor import TaskExecutor
+from core.audio_processor import EXTENSION_MEDIA_FORMATS, MEDIA_HEADER_SIZE, detect_media_format
+from core.timeline_format import RESULTS_VERSION_COLUMNAR, RESULTS_VERSION_ROWS, results_version
 from config import settings
 
+# Shared emotion detection worker pool (one per API process)
+emotion_worker_pool = EmotionWorkerPool()
+
+# Execution layer: every blocking stage goes through here, not the event loop
+task_executor = TaskExecutor(emotion_worker_pool)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the warm worker pool on startup, stop it on shutdown"""
+    await task_executor.run_io(emotion_worker_pool.start)
+    session_reaper.start(task_executor)
+    analysis_jobs.start()
+    yield
+    await analysis_jobs.stop()
+    await session_reaper.stop()
+    task_executor.shutdown()
+    emotion_worker_pool.shutdown()
+
+
 app = FastAPI(
     title="Moodflo API",
     description="Real-time emotion analysis for meetings",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -36,12 +71,196 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse uploads whose declared size is over the limit before the body is read"""
+    if request.url.path == "/api/upload":
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_SIZE:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File too large (max {settings.MAX_UPLOAD_SIZE} bytes)"}
+            )
+    return await call_next(request)
+
+# Content-addressed cache shared by batch and streaming analysis
+analysis_cache = AnalysisCache()
+
 # Service instances
-analyzer_service = AnalyzerService()
-streaming_service = RealtimeStreamingService()
+analyzer_service = AnalyzerService(emotion_worker_pool, task_executor, analysis_cache)
+streaming_service = RealtimeStreamingService(emotion_worker_pool, task_executor, analysis_cache)
+
+# Session metadata and results (SQLite by default, shared by worker processes)
+session_store = create_session_store()
+
+# Live stream state is process-local (numpy buffers, background tasks)
+live_streams: Dict[str, Dict] = {}
+stream_starts: Dict[str, asyncio.Task] = {}  # initializations in progress
+
+# Live dashboard viewers, one shared broadcaster per session
+stream_broadcasts = BroadcastRegistry()
+
+# Idle/over-budget session garbage collection (runs in the lifespan)
+session_reaper = SessionReaper(
+    session_store,
+    live_streams,
+    streaming_service.estimate_memory,
+    has_viewers=lambda session_id: (
+        stream_broadcasts.has_viewers(session_id)
+        or analysis_jobs.active_job(session_id) is not None
+    ),
+    stop_stream=streaming_service.stop_stream
+)
+
+
+async def get_session(session_id: str) -> Dict:
+    """Session metadata from the store, 404 if unknown"""
+    session = await task_executor.run_io(session_store.get, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await task_executor.run_io(session_store.touch, session_id)
+    return session
+
+
+async def update_session(session_id: str, **fields):
+    await task_executor.run_io(session_store.update, session_id, **fields)
+
 
-# Active sessions storage
-active_sessions: Dict[str, Dict] = {}
+async def save_results(session_id: str, results: Dict):
+    await task_executor.run_io(session_store.save_results, session_id, results)
+
+
+async def load_results(session_id: str, version: int) -> Optional[Dict]:
+    """Stored results with the timeline in the requested response version's format"""
+    results = await task_executor.run_io(session_store.load_results, session_id)
+    if results is None:
+        return None
+    return await task_executor.run_io(results_version, results, version)
+
+
+# ?version= on result endpoints: 1 = row timeline (default), 2 = columnar timeline
+ResponseVersion = Query(
+    RESULTS_VERSION_ROWS,
+    ge=RESULTS_VERSION_ROWS,
+    le=RESULTS_VERSION_COLUMNAR,
+    description="1: timeline as a list of points, 2: columnar timeline"
+)
+
+
+async def get_live_stream(session_id: str, session: Dict) -> Dict:
+    """
+    The session's live stream, started on first use
+    Concurrent callers (viewers, analysis jobs) share one initialization,
+    so each frame of a session is analyzed once
+    """
+    stream_data = live_streams.get(session_id)
+    if stream_data is not None:
+        return stream_data
+    
+    start = stream_starts.get(session_id)
+    if start is None:
+        start = asyncio.create_task(streaming_service.initialize_stream(
+            session["file_path"],
+            content_hash=session.get("content_hash"),
+            n_clusters=session.get("cluster_k")
+        ))
+        stream_starts[session_id] = start
+        start.add_done_callback(lambda _: stream_starts.pop(session_id, None))
+    
+    # A disconnecting caller must not cancel the shared initialization
+    stream_data = await asyncio.shield(start)
+    live_streams.setdefault(session_id, stream_data)
+    return live_streams[session_id]
+
+
+async def run_analysis_job(job: AnalysisJob):
+    """
+    Analyze one session (runs on an analysis job slot)
+    Frames come from the session's live stream, started here if no viewer
+    has started it, so overall analysis and the live dashboard share them
+    """
+    session_id = job.session_id
+    session = await task_executor.run_io(session_store.get, session_id)
+    if session is None:
+        raise RuntimeError("Session not found")
+    if session.get("analysis_complete"):
+        return
+    
+    await update_session(session_id, status="analyzing")
+    
+    try:
+        job.report("analyzing_frames", 0.0)
+        stream_data = await get_live_stream(session_id, session)
+        
+        # Frame analysis dominates; report it up to where the build stages start
+        build_start = STAGE_PROGRESS["computing_metrics"]
+        while True:
+            try:
+                await asyncio.wait_for(streaming_service.wait_until_processed(stream_data), timeout=1.0)
+                break
+            except asyncio.TimeoutError:
+                job.report("analyzing_frames", build_start * stream_data["frame_results"].progress)
+        
+        if not stream_data["is_fully_processed"]:
+            # Failed mid-way; drop it so the next request starts over
+            if live_streams.get(session_id) is stream_data:
+                del live_streams[session_id]
+            raise RuntimeError("Frame analysis did not complete")
+        
+        chosen_counts = []
+        results = await analyzer_service.build_analysis(
+            stream_data["frame_results"],
+            stream_data["duration"],
+            content_hash=session.get("content_hash"),
+            progress=job.report,
+            cluster_centers=stream_data["clusters"].centers,
+            n_clusters=session.get("cluster_k"),
+            analysis_seconds=stream_data["analysis_seconds"],
+            cluster_count_chosen=chosen_counts.append
+        )
+        
+        # Re-analysis of the session reuses a searched cluster count (never the fallback)
+        if chosen_counts:
+            await update_session(session_id, cluster_k=chosen_counts[0])
+        
+        # Store results for both overall and live dashboard
+        await save_results(session_id, results)
+        print(f"✅ Analysis built from frame results for session {session_id}")
+    
+    except Exception as e:
+        await update_session(session_id, status="error", error=str(e))
+        raise
+
+
+# Analyze requests run here: bounded slots, priority FIFO, one job per session
+analysis_jobs = AnalysisJobQueue(run_analysis_job)
+
+
+def job_in_other_worker(session: Dict) -> Optional[str]:
+    """
+    Id of the session's job when another worker process is running it
+    The job queue is per process; the store records which process owns a
+    session's job. Workers share a host (the store is a local SQLite file),
+    so an owner that has since died is detected and its job ignored.
+    """
+    if session.get("status") not in ("queued", "analyzing"):
+        return None
+    owner = session.get("job_pid")
+    if owner is None or owner == os.getpid():
+        return None
+    try:
+        os.kill(owner, 0)
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        pass
+    return session.get("job_id")
+
+
+def _job_status(job: AnalysisJob) -> Dict:
+    status = job.to_dict()
+    status["position"] = analysis_jobs.position(job)
+    return status
 
 
 @app.get("/")
@@ -53,6 +272,7 @@ async def root():
         "endpoints": {
             "upload": "/api/upload",
             "analyze": "/api/analyze/{session_id}",
+            "jobs": "/api/jobs/{job_id}",
             "stream": "/ws/stream/{session_id}"
         }
     }
@@ -65,7 +285,7 @@ async def upload_file(file: UploadFile = File(...)):
     Returns a session_id for further analysis
     """
     # Validate file type
-    allowed_extensions = ['.mp4', '.mp3', '.wav', '.avi', '.mov', '.mkv']
+    allowed_extensions = list(EXTENSION_MEDIA_FORMATS)
     file_ext = Path(file.filename).suffix.lower()
     
     if file_ext not in allowed_extensions:
@@ -74,157 +294,200 @@ async def upload_file(file: UploadFile = File(...)):
             detail=f"File type {file_ext} not supported. Allowed: {', '.join(allowed_extensions)}"
         )
     
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large (max {settings.MAX_UPLOAD_SIZE} bytes)"
+        )
+    
     # Create session
     session_id = str(uuid.uuid4())
     
     # Save file temporarily
-    temp_dir = Path(tempfile.gettempdir()) / "moodflo" / session_id
+    temp_dir = session_reaper.session_dir(session_id)
     temp_dir.mkdir(parents=True, exist_ok=True)
     
     file_path = temp_dir / file.filename
     
-    # Write file
-    content = await file.read()
-    with open(file_path, 'wb') as f:
-        f.write(content)
+    # Stream to disk, hashing and counting as we go
+    try:
+        size, content_hash = await _save_upload(file, file_path, file_ext)
+    except HTTPException:
+        await task_executor.run_io(shutil.rmtree, temp_dir, True)
+        raise
     
     # Store session info
-    active_sessions[session_id] = {
+    session = {
         "file_path": str(file_path),
         "filename": file.filename,
+        "content_hash": content_hash,
         "status": "uploaded",
         "analysis_complete": False
     }
     
+    # Identical audio analyzed before - results are ready immediately
+    cached_analysis = await task_executor.run_io(
+        analysis_cache.get_analysis,
+        content_hash,
+        analyzer_service.emotion_detector.engine
+    )
+    await task_executor.run_io(session_store.create, session_id, session)
+    if cached_analysis is not None:
+        print(f"♻️ Cached analysis found for upload {session_id}")
+        await save_results(session_id, cached_analysis)
+    
     return {
         "session_id": session_id,
         "filename": file.filename,
-        "size": len(content),
+        "size": size,
+        "content_hash": content_hash,
+        "cached": cached_analysis is not None,
         "message": "File uploaded successfully"
     }
 
 
+def _write_upload_chunk(out: BinaryIO, hasher, chunk: bytes):
+    out.write(chunk)
+    hasher.update(chunk)
+
+
+async def _save_upload(file: UploadFile, file_path: Path, file_ext: str) -> Tuple[int, str]:
+    """
+    Copy an upload to disk in UPLOAD_CHUNK_SIZE pieces
+    Rejects content that does not match the extension's container (magic
+    bytes of the first chunk) or grows past MAX_UPLOAD_SIZE
+    Returns (bytes written, SHA-256 hex digest)
+    """
+    chunk_size = max(settings.UPLOAD_CHUNK_SIZE, MEDIA_HEADER_SIZE)
+    hasher = hashlib.sha256()
+    size = 0
+    
+    out = await task_executor.run_io(open, file_path, 'wb')
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            
+            if size == 0:
+                media_format = detect_media_format(chunk[:MEDIA_HEADER_SIZE])
+                if media_format != EXTENSION_MEDIA_FORMATS[file_ext]:
+                    raise HTTPException(
+                        status_code=415,
+                        detail=f"File content is not a valid {file_ext} file"
+                    )
+            
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large (max {settings.MAX_UPLOAD_SIZE} bytes)"
+                )
+            
+            await task_executor.run_io(_write_upload_chunk, out, hasher, chunk)
+    finally:
+        await task_executor.run_io(out.close)
+    
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    
+    return size, hasher.hexdigest()
+
+
 @app.post("/api/analyze/{session_id}")
-async def analyze_meeting(session_id: str, background_tasks: BackgroundTasks):
+async def analyze_meeting(session_id: str, priority: int = 0, version: int = ResponseVersion):
     """
     Start comprehensive analysis of uploaded meeting
     This runs the full analysis: clustering, AI insights, etc.
-    Shares results with live streaming to avoid duplicate processing
-    """
-    if session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
     
-    session = active_sessions[session_id]
+    Completed analyses are returned directly. Otherwise the analysis is
+    queued as a background job (202 with a job id to poll at
+    /api/jobs/{job_id}); a session with a job in flight gets that job.
+    Jobs are polled on the worker that runs them, so a session whose job
+    another worker owns gets 409 + Retry-After (retry until complete).
+    When the queue is full the request is refused with 429 + Retry-After.
+    """
+    session = await get_session(session_id)
     
     # Check if analysis already exists (from live streaming or previous analysis)
-    if session.get("analysis_complete") and session.get("analysis"):
-        print(f"✅ Using cached analysis for session {session_id}")
-        return {
-            "session_id": session_id,
-            "status": "complete",
-            "results": session["analysis"]
-        }
-    
-    # Check if stream_data exists from progressive streaming
-    # If so, wait a bit for it to complete, then generate analysis from it
-    if "stream_data" in session:
-        stream_data = session["stream_data"]
-        
-        # Wait up to 30 seconds for streaming to complete (check every 2 seconds)
-        for _ in range(15):
-            if stream_data.get("is_fully_processed"):
-                print(f"✅ Using completed stream_data for analysis (session {session_id})")
-                break
-            print(f"⏳ Waiting for progressive streaming to complete...")
-            await asyncio.sleep(2)
-        
-        # If streaming completed, build analysis from stream_data (much faster!)
-        if stream_data.get("is_fully_processed"):
-            print(f"🚀 Building analysis from stream_data (no reprocessing needed)")
-            results = await streaming_service.build_analysis_from_stream(stream_data, session["file_path"])
-            session["analysis"] = results
-            session["analysis_complete"] = True
-            session["status"] = "complete"
-            print(f"✅ Analysis built from stream_data for session {session_id}")
-            
+    if session.get("analysis_complete"):
+        results = await load_results(session_id, version)
+        if results is not None:
+            print(f"✅ Using cached analysis for session {session_id}")
             return {
                 "session_id": session_id,
                 "status": "complete",
                 "results": results
             }
     
-    file_path = session["file_path"]
-    
-    if not os.path.exists(file_path):
+    in_flight = analysis_jobs.active_job(session_id)
+    if in_flight is None:
+        other_job_id = job_in_other_worker(session)
+        if other_job_id is not None:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Analysis is running in another worker", "job_id": other_job_id},
+                headers={"Retry-After": str(int(analysis_jobs.retry_after() + 0.5))}
+            )
+    
+    if in_flight is None and session_id not in live_streams and not os.path.exists(session["file_path"]):
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Update status
-    session["status"] = "analyzing"
-    
     try:
-        # Run full analysis from scratch
-        print(f"🔄 Running full analysis from scratch for session {session_id}")
-        results = await analyzer_service.analyze_full(file_path)
-        
-        # Store results for both overall and live dashboard
-        session["analysis"] = results
-        session["analysis_complete"] = True
-        session["status"] = "complete"
-        
-        # Also create stream_data from analysis results for live dashboard
-        if "stream_data" not in session:
-            # Convert analysis timeline to stream_data format
-            timeline = results["timeline"]
-            
-            # Extract timestamps, energy, emotions, and categories from timeline
-            timestamps = [point['time'] for point in timeline]
-            energy_timeline = [point['energy'] for point in timeline]
-            emotion_series = [point['emotion_raw'] for point in timeline]
-            categories = [point['category'] for point in timeline]
-            
-            stream_data = {
-                "duration": results["duration"],
-                "timestamps": timestamps,
-                "energy_timeline": energy_timeline,
-                "emotion_series": emotion_series,
-                "categories": categories,
-                "sample_rate": 16000,  # Default sample rate
-                "is_fully_processed": True
-            }
-            session["stream_data"] = stream_data
-            print(f"💾 Created complete stream_data from analysis for session {session_id}")
-        
-        return {
-            "session_id": session_id,
-            "status": "complete",
-            "results": results
-        }
+        job = await analysis_jobs.submit(session_id, priority)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after + 0.5))}
+        )
     
-    except Exception as e:
-        session["status"] = "error"
-        session["error"] = str(e)
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    if in_flight is None:
+        await update_session(session_id, status="queued", job_id=job.job_id, job_pid=os.getpid())
+    
+    status_url = f"/api/jobs/{job.job_id}"
+    return JSONResponse(
+        status_code=202,
+        content={
+            "session_id": session_id,
+            "job_id": job.job_id,
+            "status": job.status,
+            "position": analysis_jobs.position(job),
+            "status_url": status_url
+        },
+        headers={"Location": status_url}
+    )
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and per-stage progress of an analysis job"""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
 
 
 @app.get("/api/analysis/{session_id}")
-async def get_analysis(session_id: str):
+async def get_analysis(session_id: str, version: int = ResponseVersion):
     """Get analysis results for a session"""
-    if session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = active_sessions[session_id]
+    session = await get_session(session_id)
     
     if not session.get("analysis_complete"):
-        return {
+        response = {
             "session_id": session_id,
             "status": session.get("status", "pending"),
             "message": "Analysis not complete"
         }
+        job = analysis_jobs.active_job(session_id)
+        if job is not None:
+            response["job"] = _job_status(job)
+        return response
     
     return {
         "session_id": session_id,
         "status": "complete",
-        "results": session.get("analysis")
+        "results": await load_results(session_id, version)
     }
 
 
@@ -232,11 +495,14 @@ async def get_analysis(session_id: str):
 async def websocket_stream(websocket: WebSocket, session_id: str):
     """
     WebSocket endpoint for real-time emotion streaming
-    Client sends video playback time, server streams emotion data
+    Client sends playback events (play/pause/rate/seek), server pushes emotion data
+    Offering the "moodflo.delta.v1" subprotocol switches updates to binary deltas
     """
-    await websocket.accept()
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
     
-    if session_id not in active_sessions:
+    session = await task_executor.run_io(session_store.get, session_id)
+    if session is None:
         await websocket.send_json({
             "type": "error",
             "message": "Session not found"
@@ -244,92 +510,47 @@ async def websocket_stream(websocket: WebSocket, session_id: str):
         await websocket.close()
         return
     
-    session = active_sessions[session_id]
-    file_path = session["file_path"]
+    client_id = str(uuid.uuid4())
     
     try:
         # Initialize streaming for this session if not already done
-        if "stream_data" not in session:
-            print(f"🔄 Cache miss for session {session_id}, initializing stream...")
+        if session_id not in live_streams:
+            print(f"🔄 No live stream for session {session_id}, initializing...")
             await websocket.send_json({
                 "type": "status",
                 "message": "Initializing real-time analysis..."
             })
-            
-            # Pre-process file for streaming
-            stream_data = await streaming_service.initialize_stream(file_path)
-            session["stream_data"] = stream_data
-            print(f"💾 Cached stream_data for session {session_id}")
-            
-            # Don't run duplicate full analysis - progressive streaming already processes everything
-            # The full analysis will be generated on-demand when user navigates to Overall Analysis
-            
-            # Send ready message
-            ready_msg = {
-                "type": "ready",
-                "duration": stream_data["duration"],
-                "message": "Ready for streaming"
-            }
-            print(f"📡 Sending ready message: {ready_msg}")
-            await websocket.send_json(ready_msg)
-            
-            # Give client time to process
-            await asyncio.sleep(0.1)
-        else:
-            # Stream data already exists, send ready immediately
-            print(f"✅ Cache hit for session {session_id}, using cached stream_data")
-            stream_data = session["stream_data"]
-            ready_msg = {
-                "type": "ready",
-                "duration": stream_data["duration"],
-                "message": "Ready for streaming"
-            }
-            print(f"📡 Sending ready message (cached): {ready_msg}")
-            await websocket.send_json(ready_msg)
-            await asyncio.sleep(0.1)
         
-        stream_data = session["stream_data"]
+        stream_data = await get_live_stream(session_id, session)
         
-        # Listen for playback time updates
-        while True:
-            try:
-                # Receive message from client
-                data = await websocket.receive_json()
-                
-                if data.get("type") == "seek":
-                    current_time = data.get("time", 0)
-                    
-                    # Get emotion data for current time window
-                    emotion_update = streaming_service.get_realtime_data(
-                        stream_data,
-                        current_time
-                    )
-                    
-                    # Send update to client
-                    await websocket.send_json({
-                        "type": "update",
-                        "time": current_time,
-                        "data": emotion_update
-                    })
-                
-                elif data.get("type") == "ping":
-                    # Respond to keep-alive ping
-                    await websocket.send_json({
-                        "type": "pong"
-                    })
-            
-            except WebSocketDisconnect:
-                print("WebSocket disconnected by client")
-                break
-            except Exception as e:
-                try:
-                    await websocket.send_json({
-                        "type": "error",
-                        "message": str(e)
-                    })
-                except:
-                    pass
-                break
+        # Send ready message
+        ready_msg = {
+            "type": "ready",
+            "duration": stream_data["duration"],
+            "message": "Ready for streaming"
+        }
+        print(f"📡 Sending ready message: {ready_msg}")
+        await websocket.send_json(ready_msg)
+        
+        # Give client time to process
+        await asyncio.sleep(0.1)
+        
+        # Client reports play/pause/rate/seek changes; updates are pushed on a timer
+        broadcaster = stream_broadcasts.subscribe(
+            session_id, client_id, streaming_service, stream_data
+        )
+        connection = StreamConnection(
+            websocket,
+            streaming_service,
+            stream_data,
+            client_id,
+            encoder=DeltaUpdateEncoder() if subprotocol else None,
+            broadcaster=broadcaster
+        )
+        try:
+            await connection.run()
+        finally:
+            stream_broadcasts.unsubscribe(session_id, client_id)
     
     except WebSocketDisconnect:
         print("WebSocket disconnected during initialization")
@@ -346,10 +567,7 @@ async def websocket_stream(websocket: WebSocket, session_id: str):
 @app.get("/api/video/{session_id}")
 async def get_video(session_id: str):
     """Stream video file for playback"""
-    if session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = active_sessions[session_id]
+    session = await get_session(session_id)
     file_path = session["file_path"]
     
     if not os.path.exists(file_path):
@@ -368,23 +586,13 @@ async def get_video(session_id: str):
 @app.delete("/api/session/{session_id}")
 async def delete_session(session_id: str):
     """Clean up session and temporary files"""
-    if session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    await get_session(session_id)
     
-    session = active_sessions[session_id]
-    
-    # Delete temporary files
-    file_path = Path(session["file_path"])
-    if file_path.exists():
-        file_path.unlink()
-    
-    # Remove directory
-    temp_dir = file_path.parent
-    if temp_dir.exists():
-        temp_dir.rmdir()
-    
-    # Remove from active sessions
-    del active_sessions[session_id]
+    # Queued or running analysis, store entry, upload, exported reports and live stream state
+    analysis_jobs.cancel(session_id)
+    await task_executor.run_io(session_reaper.remove_session, session_id)
+    await session_reaper.stop_dropped_streams()
+    stream_broadcasts.close_session(session_id)
     
     return {"message": "Session deleted successfully"}
 
@@ -392,22 +600,19 @@ async def delete_session(session_id: str):
 @app.get("/api/export/{session_id}/pdf")
 async def export_pdf(session_id: str):
     """Export analysis as PDF file"""
-    if session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = active_sessions[session_id]
+    session = await get_session(session_id)
     
     if not session.get("analysis_complete"):
         raise HTTPException(status_code=400, detail="Analysis not complete")
     
-    # Generate PDF report
-    generator = ReportGenerator(session["analysis"], session_id)
-    pdf_buffer = generator.generate_pdf_report()
+    # Generate PDF report (pure-Python layout, runs in the process pool)
+    results = await task_executor.run_io(session_store.load_results, session_id)
+    generator = ReportGenerator(results, session_id)
+    pdf_buffer = await task_executor.run_cpu(generator.generate_pdf_report)
     
-    # Save to temp file
-    temp_file = Path(tempfile.gettempdir()) / f"moodflo_report_{session_id[:8]}.pdf"
-    with open(temp_file, 'wb') as f:
-        f.write(pdf_buffer.read())
+    # Save next to the upload so the session's cleanup removes it too
+    temp_file = Path(session["file_path"]).parent / f"moodflo_report_{session_id[:8]}.pdf"
+    await task_executor.run_io(temp_file.write_bytes, pdf_buffer.getvalue())
     
     return FileResponse(
         temp_file,
@@ -417,21 +622,20 @@ async def export_pdf(session_id: str):
 
 
 @app.get("/api/export/{session_id}/json")
-async def export_json(session_id: str):
+async def export_json(session_id: str, version: int = ResponseVersion):
     """Export analysis as JSON file"""
-    if session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = active_sessions[session_id]
+    session = await get_session(session_id)
     
     if not session.get("analysis_complete"):
         raise HTTPException(status_code=400, detail="Analysis not complete")
     
-    # Generate JSON report
-    generator = ReportGenerator(session["analysis"], session_id)
-    json_data = generator.generate_json_report()
+    # Generate JSON report (timeline conversion and serialization are off the event loop)
+    results = await task_executor.run_io(session_store.load_results, session_id)
+    generator = ReportGenerator(results, session_id)
+    json_data = await task_executor.run_io(generator.generate_json_report, version)
     
-    return JSONResponse(
+    return await task_executor.run_io(
+        JSONResponse,
         content=json_data,
         headers={
             'Content-Disposition': f'attachment; filename=moodflo_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
@@ -442,10 +646,16 @@ async def export_json(session_id: str):
 @app.get("/api/health")
 async def health_check():
     """Detailed health check"""
+    worker_pool_status = await task_executor.run_io(emotion_worker_pool.health_check)
     return {
         "status": "healthy",
-        "active_sessions": len(active_sessions),
-        "vokaturi_available": analyzer_service.emotion_detector.vokaturi_loaded
+        "active_sessions": await task_executor.run_io(session_store.count),
+        "live_streams": len(live_streams),
+        "stream_viewers": stream_broadcasts.stats(),
+        "reaper": session_reaper.stats,
+        "analysis_jobs": analysis_jobs.summary(),
+        "vokaturi_available": analyzer_service.emotion_detector.vokaturi_loaded,
+        "worker_pool": worker_pool_status
     }
 
 
@@ -0,0 +1,73 @@
+"""
+Clustering benchmark for long recordings
+Wall time and cluster quality (inertia ratio) of exact vs size-aware ClusterAnalyzer modes
+
+Run from backend/:  python -m benchmarks.bench_clustering [--frames 1000 10000 100000]
+"""
+import argparse
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from benchmarks.common import best_of
+from config import settings
+from core.cluster_analyzer import ClusterAnalyzer, cluster_features
+
+
+def emotion_mixture(n_frames: int, n_components: int = 6, seed: int = 7):
+    """Frames from a mixture of emotion profiles (Dirichlet) with component-specific energy"""
+    rng = np.random.default_rng(seed)
+    alphas = rng.uniform(0.5, 6, (n_components, 5))
+    component = rng.integers(0, n_components, n_frames)
+    gamma = rng.gamma(alphas[component])
+    emotions = gamma / gamma.sum(axis=1, keepdims=True)
+    energy = np.clip(rng.normal(20 + 10 * component, 8), 0, 100)
+    return emotions, energy
+
+
+def inertia(features: np.ndarray, labels: np.ndarray) -> float:
+    """Within-cluster sum of squares of a labelling, on all frames"""
+    return float(sum(
+        ((features[labels == label] - features[labels == label].mean(axis=0)) ** 2).sum()
+        for label in np.unique(labels)
+    ))
+
+
+def exact_analyze(analyzer, emotions, energy):
+    """Full K-means and PCA on every frame (the mode used below CLUSTER_EXACT_MAX_FRAMES)"""
+    threshold = settings.CLUSTER_EXACT_MAX_FRAMES
+    settings.CLUSTER_EXACT_MAX_FRAMES = len(emotions)
+    try:
+        return analyzer.analyze(emotions, energy)
+    finally:
+        settings.CLUSTER_EXACT_MAX_FRAMES = threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    analyzer = ClusterAnalyzer()
+    print(
+        f"exact up to {settings.CLUSTER_EXACT_MAX_FRAMES} frames, "
+        f"sampled fit on {settings.CLUSTER_SAMPLE_FRAMES} frames above"
+    )
+    print(f"{'frames':>8} {'exact':>10} {'size-aware':>11} {'speed-up':>9} {'inertia ratio':>14}")
+    for n_frames in args.frames:
+        emotions, energy = emotion_mixture(n_frames)
+        features = StandardScaler().fit_transform(cluster_features(emotions, energy))
+
+        exact_time, exact = best_of(lambda: exact_analyze(analyzer, emotions, energy), args.repeats)
+        new_time, result = best_of(lambda: analyzer.analyze(emotions, energy), args.repeats)
+
+        ratio = inertia(features, np.array(result['labels'])) / inertia(features, np.array(exact['labels']))
+        print(
+            f"{n_frames:>8} {exact_time * 1e3:>8.0f} ms {new_time * 1e3:>8.0f} ms "
+            f"{exact_time / new_time:>8.1f}x {ratio:>14.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Shared-memory batch dispatch benchmark (emotion detection)
+Bytes copied to workers and frames/s: one pickled task per frame vs shared frame ranges
+
+Run from backend/:  python -m benchmarks.bench_shared_memory [--minutes 20] [--workers 4]
+"""
+import argparse
+import contextlib
+import io
+import pickle
+
+import numpy as np
+
+from benchmarks.common import best_of, synthetic_audio
+from core.audio_processor import AudioProcessor
+from core.emotion_detector import (
+    EMOTION_KEYS,
+    EmotionDetector,
+    _analyze_frame_worker,
+    _share_frames,
+    get_vokaturi_lib_path
+)
+from core.worker_pool import EmotionWorkerPool
+
+
+def per_frame_submit(pool, frames, sample_rate, lib_path) -> np.ndarray:
+    """Previous dispatch: one future per frame, each frame pickled into the worker"""
+    futures = [pool.submit(_analyze_frame_worker, (frame, sample_rate, lib_path)) for frame in frames]
+    return np.array([[future.result()[key] for key in EMOTION_KEYS] for future in futures])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=20.0, help="synthetic audio length")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default PARALLEL_WORKERS)")
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    processor = AudioProcessor()
+    sample_rate = processor.sample_rate
+    frames, _ = processor.segment_audio(synthetic_audio(args.minutes * 60, sample_rate))
+    lib_path = str(get_vokaturi_lib_path())
+
+    pool = EmotionWorkerPool(args.workers)
+    pool.start()
+    detector = EmotionDetector(pool)
+    if not detector.vokaturi_loaded:
+        print("Vokaturi is not loaded - only the vectorized fallback would run, nothing to compare")
+        pool.shutdown()
+        return
+
+    try:
+        # Bytes that cross the process boundary per batch
+        per_frame_bytes = sum(len(pickle.dumps((frame, sample_rate, lib_path))) for frame in frames)
+        ranges = detector._chunk_ranges(len(frames), pool.max_workers)
+        shm, layout = _share_frames(frames)
+        shared_bytes = shm.size
+        task_bytes = sum(
+            len(pickle.dumps((shm.name, *layout, start, end, sample_rate, lib_path)))
+            for start, end in ranges
+        )
+        shm.close()
+        shm.unlink()
+        result_bytes = len(frames) * len(EMOTION_KEYS) * 8
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            old_time, old_results = best_of(
+                lambda: per_frame_submit(pool, frames, sample_rate, lib_path), args.repeats
+            )
+            new_time, new_results = best_of(
+                lambda: detector.batch_analyze_array(frames, sample_rate), args.repeats
+            )
+    finally:
+        pool.shutdown()
+
+    n_frames = len(frames)
+    print(f"{n_frames} frames of {frames.shape[1]} samples ({args.minutes:g} min), {pool.max_workers} workers")
+    print(f"per-frame submit : {per_frame_bytes / 1e6:8.1f} MB pickled over pipes, {n_frames / old_time:6.1f} frames/s")
+    print(
+        f"shared memory    : {shared_bytes / 1e6:8.1f} MB copied into shared memory once, "
+        f"{task_bytes / len(ranges):.0f} B per task ({len(ranges)} tasks), "
+        f"{result_bytes / 1e3:.0f} KB of results, {n_frames / new_time:6.1f} frames/s"
+    )
+    print(f"max abs difference between paths: {np.abs(old_results - new_results).max():.3g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+WebSocket update protocol benchmark
+Payload size and encode throughput: JSON text updates vs MessagePack delta updates
+
+Run from backend/:  python -m benchmarks.bench_stream_protocol [--minutes 60]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.common import best_of, synthetic_audio
+from services.realtime_service import RealtimeStreamingService
+from services.stream_protocol import MSGPACK_AVAILABLE, DeltaUpdateDecoder, DeltaUpdateEncoder
+
+
+def json_text(message) -> bytes:
+    """How WebSocket.send_json serializes a message"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+async def stream_updates(path: str):
+    """One update per frame of a fully analyzed stream, as a viewer playing it through gets them"""
+    service = RealtimeStreamingService()
+    stream_data = await service.initialize_stream(path)
+    await service.wait_until_processed(stream_data)
+    return [
+        {
+            'type': 'update',
+            'time': float(time),
+            'playing': True,
+            'rate': 1.0,
+            'data': service.get_realtime_data(stream_data, float(time))
+        }
+        for time in stream_data['frame_results'].timestamps
+    ]
+
+
+def mismatches(messages, payloads) -> int:
+    """Updates whose decoded form differs from the original (floats compared at float32)"""
+    decoder = DeltaUpdateDecoder()
+    count = 0
+    for message, payload in zip(messages, payloads):
+        original, decoded = message['data'], decoder.decode(payload)['data']
+        same = (
+            decoded['current_emotion'] == original['current_emotion']
+            and decoded['emotion_distribution'].keys() == original['emotion_distribution'].keys()
+            and decoded['timeline_length'] == original['timeline_length']
+            and decoded['pattern_clusters'] == original['pattern_clusters']
+            and np.isclose(decoded['avg_energy'], original['avg_energy'], rtol=1e-6)
+        )
+        count += not same
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60.0, help="synthetic recording length")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if not MSGPACK_AVAILABLE:
+        print("msgpack is not installed - the compact protocol is unavailable")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "meeting.wav"
+        sf.write(path, synthetic_audio(args.minutes * 60), 16000)
+        with contextlib.redirect_stdout(io.StringIO()):
+            messages = asyncio.run(stream_updates(str(path)))
+
+    json_time, json_payloads = best_of(lambda: [json_text(message) for message in messages], args.repeats)
+
+    def encode_all():
+        encoder = DeltaUpdateEncoder()
+        return [encoder.encode(message) for message in messages]
+    delta_time, delta_payloads = best_of(encode_all, args.repeats)
+
+    n_messages = len(messages)
+    json_bytes = sum(map(len, json_payloads))
+    delta_bytes = sum(map(len, delta_payloads))
+    print(f"{n_messages} updates ({args.minutes:g} min, one per frame)")
+    print(
+        f"size  : JSON {json_bytes / n_messages:.0f} B/msg ({json_bytes / 1024:.1f} KiB), "
+        f"delta {delta_bytes / n_messages:.0f} B/msg ({delta_bytes / 1024:.1f} KiB), "
+        f"{json_bytes / delta_bytes:.1f}x smaller; keyframe {len(delta_payloads[0])} B"
+    )
+    print(
+        f"encode: JSON {json_time / n_messages * 1e6:.1f} us/msg ({n_messages / json_time:.0f} msg/s), "
+        f"delta {delta_time / n_messages * 1e6:.1f} us/msg ({n_messages / delta_time:.0f} msg/s)"
+    )
+    print(f"round trip mismatches: {mismatches(messages, delta_payloads)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Vokaturi voice reuse benchmark
+Frames/s of sequential analyze_frame: a new voice and C buffer per frame vs the reused VoiceContext
+
+Run from backend/:  python -m benchmarks.bench_voice_context [--frames 400]
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import best_of, synthetic_audio
+from core.audio_processor import AudioProcessor
+from core.emotion_detector import EMOTION_KEYS, EmotionDetector, Vokaturi
+
+
+def analyze_with_new_voice(frame: np.ndarray, sample_rate: int):
+    """Previous per-frame path: allocate and fill a ctypes buffer, create and destroy a voice"""
+    n_samples = len(frame)
+    buffer = Vokaturi.float64array(n_samples)
+    buffer[:] = frame[:]
+    voice = Vokaturi.Voice(float(sample_rate), n_samples, 0)
+    voice.fill_float64array(n_samples, buffer)
+    quality = Vokaturi.Quality()
+    probabilities = Vokaturi.EmotionProbabilities()
+    voice.extract(quality, probabilities)
+    voice.destroy()
+    if not quality.valid:
+        return None
+    return [
+        probabilities.neutrality,
+        probabilities.happiness,
+        probabilities.sadness,
+        probabilities.anger,
+        probabilities.fear
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=400, help="frames to analyze")
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    detector = EmotionDetector()
+    if not detector.vokaturi_loaded:
+        print("Vokaturi is not loaded - nothing to compare")
+        return
+
+    processor = AudioProcessor()
+    sample_rate = processor.sample_rate
+    seconds = args.frames * processor.hop_duration + processor.frame_duration
+    frames, _ = processor.segment_audio(synthetic_audio(seconds, sample_rate))
+    frames = frames[:args.frames]
+
+    old_time, old_results = best_of(
+        lambda: [analyze_with_new_voice(frame, sample_rate) for frame in frames], args.repeats
+    )
+    new_time, new_results = best_of(
+        lambda: [detector.analyze_frame(frame, sample_rate) for frame in frames], args.repeats
+    )
+
+    identical = all(
+        old is None or old == [new[key] for key in EMOTION_KEYS]
+        for old, new in zip(old_results, new_results)
+    )
+    n_frames = len(frames)
+    print(f"{n_frames} frames of {frames.shape[1]} samples ({frames.dtype})")
+    print(f"new voice per frame : {n_frames / old_time:6.0f} frames/s")
+    print(f"reused VoiceContext : {n_frames / new_time:6.0f} frames/s ({old_time / new_time:.2f}x)")
+    print(f"identical results   : {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Configuration settings for Moodflo backend
 """
 import os
+import tempfile
 from pathlib import Path
 from pydantic_settings import BaseSettings
 from typing import List
@@ -32,11 +33,57 @@ class Settings(BaseSettings):
     
     # Real-time Streaming
     STREAM_UPDATE_INTERVAL: float = 5.0  # Update every 5 seconds
+    STREAM_MIN_PUSH_INTERVAL: float = 0.25  # Fastest server push cadence (high playback rates)
+    STREAM_MAX_RATE: float = 16.0  # Highest accepted playback rate
+    BROADCAST_CACHE_FRAMES: int = 64  # Frame positions whose updates are shared per session
     STREAM_BUFFER_SIZE: int = 10  # Number of frames to buffer
+    STREAM_DECODE_CHUNK_DURATION: float = 10.0  # Seconds of audio decoded per chunk
+    SCHEDULER_PRIORITY_FRAMES: int = 2  # Frames analyzed per batch at a client's seek
+    SCHEDULER_LOOKAHEAD_FRAMES: int = 12  # Frames ahead of a playhead analyzed first
     
     # Parallel Processing
     PARALLEL_WORKERS: int = 4  # Conservative for real-time
     BATCH_SIZE: int = 20
+    WORKER_POOL_HEALTH_TIMEOUT: float = 10.0  # seconds
+    TASKS_PER_WORKER: int = 4  # Frame ranges dispatched per worker in a batch
+    IO_WORKERS: int = 8  # Threads for blocking I/O and GIL-releasing stages
+    
+    # Uploads (streamed to disk in chunks)
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1 MiB
+    MAX_UPLOAD_SIZE: int = 2 * 1024 ** 3  # 2 GiB
+    
+    # Session Store ("sqlite" shares sessions across worker processes, "memory" for tests)
+    SESSION_STORE: str = "sqlite"
+    SESSION_DB_PATH: Path = Path(tempfile.gettempdir()) / "moodflo" / "sessions.db"
+    SESSION_FILES_DIR: Path = Path(tempfile.gettempdir()) / "moodflo"  # Uploads and reports, one dir per session
+    
+    # Session Reaper (idle expiry, then least recently used over budget)
+    REAPER_INTERVAL: float = 300.0  # seconds between passes
+    SESSION_IDLE_TTL: float = 2 * 3600  # seconds without activity
+    SESSION_DISK_BUDGET: int = 20 * 1024 ** 3  # 20 GiB of uploads and reports
+    SESSION_MEMORY_BUDGET: int = 1024 ** 3  # 1 GiB of live stream state
+    
+    # Analysis Jobs (analyze requests run in the background, bounded)
+    ANALYSIS_JOB_SLOTS: int = 2  # Analyses running at once per process
+    MAX_QUEUED_JOBS: int = 32  # Waiting jobs before new ones get 429
+    JOB_HISTORY_SIZE: int = 256  # Finished jobs kept for status polling
+    
+    # Clustering (exact K-means up to a frame count, sampled mini-batch fit above)
+    CLUSTER_EXACT_MAX_FRAMES: int = 5000  # ~3.5 h at the default hop
+    CLUSTER_SAMPLE_FRAMES: int = 20000  # Frames the mini-batch fit is trained on
+    CLUSTER_BATCH_SIZE: int = 2048
+    CLUSTER_ONLINE_SEED_FRAMES: int = 32  # Streamed frames before online centers are seeded
+    CLUSTER_REFINE_MAX_ITER: int = 20  # K-means iterations refining streamed centers
+    CLUSTER_AUTO_K: bool = True  # Pick the cluster count by silhouette score (else 4)
+    CLUSTER_MIN_K: int = 2
+    CLUSTER_MAX_K: int = 8
+    CLUSTER_SILHOUETTE_SAMPLE: int = 2000  # Frames each candidate count is fitted and scored on
+    CLUSTER_AUTO_K_BUDGET: float = 0.1  # Fraction of the recording's analysis time the search may use
+    
+    # Analysis Cache (content-addressed, LRU-evicted)
+    CACHE_ENABLED: bool = True
+    CACHE_DIR: Path = Path(tempfile.gettempdir()) / "moodflo_cache"
+    CACHE_MAX_BYTES: int = 2 * 1024 ** 3  # 2 GiB
     
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -6,12 +6,71 @@ import numpy as np
 import soundfile as sf
 import subprocess
 import tempfile
+import shutil
 import os
+import re
 from pathlib import Path
-from typing import Tuple, Generator
+from typing import Callable, Optional, Tuple, Generator
+from core.frame_stats import FrameStatistics
 from config import settings
 
 
+# Containers decoded by streaming raw PCM from ffmpeg's stdout
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv']
+PIPE_DECODE_EXTENSIONS = VIDEO_EXTENSIONS + ['.mp3']
+
+# Bytes per decoded sample (ffmpeg -f f32le)
+_PCM_SAMPLE_BYTES = 4
+
+# ffmpeg diagnostics kept for error messages (the end of its stderr)
+_STDERR_TAIL_BYTES = 4096
+
+_FFMPEG_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+def _stderr_tail(stderr_file) -> bytes:
+    """Last _STDERR_TAIL_BYTES written to a decoder's stderr file"""
+    size = stderr_file.seek(0, os.SEEK_END)
+    stderr_file.seek(max(0, size - _STDERR_TAIL_BYTES))
+    return stderr_file.read()
+
+
+# Container format each supported extension must actually contain
+EXTENSION_MEDIA_FORMATS = {
+    '.mp4': 'mp4',
+    '.mov': 'mp4',
+    '.mkv': 'matroska',
+    '.avi': 'avi',
+    '.wav': 'wav',
+    '.mp3': 'mp3'
+}
+
+# Bytes needed to recognise any supported container
+MEDIA_HEADER_SIZE = 12
+
+# QuickTime files may start with a top-level atom other than ftyp
+_QUICKTIME_ATOMS = (b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip')
+
+
+def detect_media_format(header: bytes) -> Optional[str]:
+    """Identify a supported container from its leading magic bytes"""
+    if header[:4] == b'RIFF':
+        if header[8:12] == b'WAVE':
+            return 'wav'
+        if header[8:12] == b'AVI ':
+            return 'avi'
+        return None
+    if header[4:8] in _QUICKTIME_ATOMS:
+        return 'mp4'
+    if header[:4] == b'\x1a\x45\xdf\xa3':
+        return 'matroska'
+    if header[:3] == b'ID3':
+        return 'mp3'
+    # Bare MPEG audio frame sync (11 set bits)
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        return 'mp3'
+    return None
+
+
 class AudioProcessor:
     """Process audio from video/audio files"""
     
@@ -21,9 +80,10 @@ class AudioProcessor:
         self.hop_duration = settings.HOP_DURATION
     
     def extract_audio_from_video(self, video_path: str) -> str:
-        """Extract audio from video file using ffmpeg"""
-        temp_dir = tempfile.gettempdir()
-        output_path = os.path.join(temp_dir, f"extracted_{Path(video_path).stem}.wav")
+        """Extract audio from video file to a temporary WAV using ffmpeg"""
+        # Unique name so concurrent uploads with the same stem don't collide
+        fd, output_path = tempfile.mkstemp(prefix=f"extracted_{Path(video_path).stem}_", suffix=".wav")
+        os.close(fd)
         
         command = [
             'ffmpeg', '-i', str(video_path),
@@ -42,6 +102,165 @@ class AudioProcessor:
         )
         return output_path
     
+    def probe_duration(self, file_path: str) -> Optional[float]:
+        """
+        Get media duration in seconds from the container header
+        Uses ffprobe, or the banner of `ffmpeg -i` (None if unavailable)
+        """
+        if shutil.which('ffprobe') is not None:
+            try:
+                result = subprocess.run(
+                    [
+                        'ffprobe', '-v', 'error',
+                        '-show_entries', 'format=duration',
+                        '-of', 'default=noprint_wrappers=1:nokey=1',
+                        str(file_path)
+                    ],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+                return float(result.stdout.strip())
+            except (subprocess.CalledProcessError, ValueError):
+                pass
+        
+        if shutil.which('ffmpeg') is not None:
+            # Without an output ffmpeg exits non-zero after printing the header
+            result = subprocess.run(
+                ['ffmpeg', '-hide_banner', '-i', str(file_path)],
+                capture_output=True,
+                text=True
+            )
+            match = _FFMPEG_DURATION_RE.search(result.stderr)
+            if match:
+                hours, minutes, seconds = match.groups()
+                return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        
+        return None
+    
+    def probe_stream_duration(self, file_path: str) -> Optional[float]:
+        """Get expected audio duration without decoding (None if unknown)"""
+        file_ext = Path(file_path).suffix.lower()
+        
+        if file_ext in PIPE_DECODE_EXTENSIONS:
+            return self.probe_duration(file_path)
+        
+        try:
+            return sf.info(str(file_path)).duration
+        except RuntimeError:
+            return None
+    
+    def _ffmpeg_pcm_command(self, file_path: str) -> list:
+        """ffmpeg command writing mono float32 PCM at the target rate to stdout"""
+        return [
+            'ffmpeg', '-v', 'error',
+            '-i', str(file_path),
+            '-vn',  # No video
+            '-ac', '1',  # Mono
+            '-ar', str(self.sample_rate),
+            '-f', 'f32le',  # Raw little-endian float32
+            'pipe:1'
+        ]
+    
+    def decode_audio(self, file_path: str) -> np.ndarray:
+        """
+        Decode audio with ffmpeg straight into memory
+        Raw mono float32 PCM at the target sample rate is read from ffmpeg's
+        stdout into a preallocated buffer - no intermediate WAV file.
+        """
+        command = self._ffmpeg_pcm_command(file_path)
+        
+        # Size the buffer from the probed duration (plus slack), grow if needed
+        duration = self.probe_duration(file_path)
+        if duration:
+            capacity = int((duration + 1.0) * self.sample_rate)
+        else:
+            capacity = int(60 * self.sample_rate)
+        buffer = np.empty(capacity, dtype=np.float32)
+        n_bytes = 0
+        
+        # stderr goes to a file: an undrained pipe would fill up on a damaged
+        # input's errors and block ffmpeg before it closes stdout
+        with tempfile.TemporaryFile() as stderr_file:
+            with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file) as process:
+                while True:
+                    if n_bytes == buffer.nbytes:
+                        grown = np.empty(len(buffer) * 2, dtype=np.float32)
+                        grown[:len(buffer)] = buffer
+                        buffer = grown
+                    
+                    read = process.stdout.readinto(memoryview(buffer).cast('B')[n_bytes:])
+                    if not read:
+                        break
+                    n_bytes += read
+            
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    process.returncode,
+                    command,
+                    stderr=_stderr_tail(stderr_file)
+                )
+        
+        return buffer[:n_bytes // _PCM_SAMPLE_BYTES]
+    
+    def stream_decode(
+        self,
+        file_path: str,
+        chunk_duration: float = None,
+        on_process: Optional[Callable[[subprocess.Popen], None]] = None
+    ) -> Generator[np.ndarray, None, None]:
+        """
+        Decode audio progressively
+        Yields mono float32 chunks at the target sample rate as soon as
+        they are decoded, so analysis can start before decoding finishes.
+        on_process receives the ffmpeg process when one is started, so it
+        can be killed from another thread to abandon the decode.
+        """
+        if chunk_duration is None:
+            chunk_duration = settings.STREAM_DECODE_CHUNK_DURATION
+        chunk_samples = max(1, int(chunk_duration * self.sample_rate))
+        file_ext = Path(file_path).suffix.lower()
+        
+        if file_ext in PIPE_DECODE_EXTENSIONS:
+            command = self._ffmpeg_pcm_command(file_path)
+            # stderr to a file, not an undrained pipe (see decode_audio)
+            stderr_file = tempfile.TemporaryFile()
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+            if on_process is not None:
+                on_process(process)
+            try:
+                while True:
+                    data = process.stdout.read(chunk_samples * _PCM_SAMPLE_BYTES)
+                    if not data:
+                        break
+                    usable = len(data) - len(data) % _PCM_SAMPLE_BYTES
+                    yield np.frombuffer(data[:usable], dtype=np.float32)
+                
+                if process.wait() != 0:
+                    raise subprocess.CalledProcessError(
+                        process.returncode, command, stderr=_stderr_tail(stderr_file)
+                    )
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+                stderr_file.close()
+            return
+        
+        info = sf.info(str(file_path))
+        if info.samplerate != self.sample_rate:
+            # Resampling needs the whole signal
+            audio, _ = self.load_audio(file_path)
+            for start in range(0, len(audio), chunk_samples):
+                yield audio[start:start + chunk_samples]
+            return
+        
+        for block in sf.blocks(str(file_path), blocksize=chunk_samples, dtype='float32'):
+            if block.ndim > 1:
+                block = block.mean(axis=1, dtype=np.float32)
+            yield block
+    
     def load_audio(self, file_path: str) -> Tuple[np.ndarray, int]:
         """Load audio file and resample if needed"""
         audio, sr = sf.read(file_path)
@@ -64,23 +283,33 @@ class AudioProcessor:
         
         return audio, self.sample_rate
     
-    def segment_audio(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def segment_audio(
+        self,
+        audio: np.ndarray,
+        copy: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Segment audio into overlapping frames
+        
+        By default frames are a read-only strided view over `audio`
+        (no samples are copied, overlapping frames share memory).
+        Pass copy=True to get an independent contiguous 2-D array.
+        
         Returns: (frames, timestamps)
         """
         win_samples = int(self.frame_duration * self.sample_rate)
         hop_samples = int(self.hop_duration * self.sample_rate)
         
-        frames = []
-        timestamps = []
+        if len(audio) < win_samples:
+            return np.empty((0, win_samples), dtype=audio.dtype), np.empty(0)
         
-        for i in range(0, len(audio) - win_samples + 1, hop_samples):
-            frame = audio[i:i + win_samples]
-            frames.append(frame)
-            timestamps.append(i / self.sample_rate)
+        frames = np.lib.stride_tricks.sliding_window_view(audio, win_samples)[::hop_samples]
+        timestamps = np.arange(len(frames)) * hop_samples / self.sample_rate
         
-        return np.array(frames), np.array(timestamps)
+        if copy:
+            frames = np.ascontiguousarray(frames)
+        
+        return frames, timestamps
     
     def segment_audio_streaming(
         self,
@@ -117,14 +346,27 @@ class AudioProcessor:
         # Check file type
         file_ext = Path(file_path).suffix.lower()
         
-        # Extract audio if video
-        if file_ext in ['.mp4', '.avi', '.mov', '.mkv']:
-            audio_path = self.extract_audio_from_video(file_path)
-            audio, sr = self.load_audio(audio_path)
-            os.remove(audio_path)  # Clean up
+        # Decode video/mp3 via ffmpeg pipe, read other audio directly
+        if file_ext in PIPE_DECODE_EXTENSIONS:
+            try:
+                audio, sr = self.decode_audio(file_path), self.sample_rate
+            except FileNotFoundError:
+                if file_ext in VIDEO_EXTENSIONS:
+                    raise
+                # No ffmpeg installed - soundfile can still read mp3
+                audio, sr = self.load_audio(file_path)
         else:
             audio, sr = self.load_audio(file_path)
         
+        return self.process_audio(audio)
+    
+    def process_audio(self, audio: np.ndarray) -> dict:
+        """
+        Build batch audio data from already-decoded mono audio
+        (at this processor's sample rate)
+        """
+        sr = self.sample_rate
+        
         # Segment into frames
         frames, timestamps = self.segment_audio(audio)
         
@@ -133,5 +375,75 @@ class AudioProcessor:
             'timestamps': timestamps,
             'duration': len(audio) / sr,
             'sample_rate': sr,
-            'full_audio': audio
+            'full_audio': audio,
+            'frame_stats': self.compute_frame_stats(audio, len(frames))
         }
+    
+    def compute_frame_stats(self, audio: np.ndarray, n_frames: int = None) -> FrameStatistics:
+        """Compute RMS/ZCR/peak/energy for every frame in one pass"""
+        win_samples = int(self.frame_duration * self.sample_rate)
+        hop_samples = int(self.hop_duration * self.sample_rate)
+        return FrameStatistics.from_audio(audio, win_samples, hop_samples, n_frames)
+
+
+class IncrementalFramer:
+    """
+    Accumulates decoded chunks and frames them as windows complete
+    Frames are read-only views over the accumulated audio, identical to
+    AudioProcessor.segment_audio on the full signal.
+    """
+    
+    def __init__(self, win_samples: int, hop_samples: int, expected_samples: int = 0):
+        self.win_samples = win_samples
+        self.hop_samples = hop_samples
+        self._buffer = np.empty(max(expected_samples, win_samples), dtype=np.float32)
+        self.n_samples = 0
+    
+    @staticmethod
+    def count_frames(n_samples: int, win_samples: int, hop_samples: int) -> int:
+        """Number of complete windows in n_samples"""
+        if n_samples < win_samples:
+            return 0
+        return (n_samples - win_samples) // hop_samples + 1
+    
+    @property
+    def n_frames(self) -> int:
+        """Number of complete frames available so far"""
+        return self.count_frames(self.n_samples, self.win_samples, self.hop_samples)
+    
+    @property
+    def audio(self) -> np.ndarray:
+        """All audio decoded so far"""
+        return self._buffer[:self.n_samples]
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated for decoded audio (the whole expected length up front)"""
+        return self._buffer.nbytes
+    
+    def push(self, chunk: np.ndarray) -> int:
+        """Append decoded samples, returns the new number of complete frames"""
+        end = self.n_samples + len(chunk)
+        
+        if end > len(self._buffer):
+            # Earlier frame views keep the old buffer alive, so growing is safe
+            grown = np.empty(max(end, 2 * len(self._buffer)), dtype=np.float32)
+            grown[:self.n_samples] = self._buffer[:self.n_samples]
+            self._buffer = grown
+        
+        self._buffer[self.n_samples:end] = chunk
+        self.n_samples = end
+        return self.n_frames
+    
+    def frames(self, start: int, end: int) -> np.ndarray:
+        """Read-only strided view of complete frames [start, end)"""
+        if end <= start:
+            return np.empty((0, self.win_samples), dtype=np.float32)
+        
+        first_sample = start * self.hop_samples
+        last_sample = (end - 1) * self.hop_samples + self.win_samples
+        windows = np.lib.stride_tricks.sliding_window_view(
+            self._buffer[first_sample:last_sample],
+            self.win_samples
+        )
+        return windows[::self.hop_samples]
@@ -2,64 +2,169 @@
 Cluster Analysis Module
 Groups emotion patterns using K-means clustering
 """
+import time
 import numpy as np
-from typing import Dict, List
-from sklearn.cluster import KMeans
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from sklearn.cluster import KMeans, MiniBatchKMeans, kmeans_plusplus
+from sklearn.decomposition import PCA
+from sklearn.metrics import silhouette_score
 from sklearn.preprocessing import StandardScaler
+from core.emotion_detector import emotions_to_array
+from config import settings
+
+
+def cluster_features(
+    emotion_series: Union[List[Dict[str, float]], np.ndarray],
+    energy_timeline: Sequence[float]
+) -> np.ndarray:
+    """Feature matrix: 5 emotions (EMOTION_KEYS order) + energy normalized to 0-1"""
+    if not isinstance(emotion_series, np.ndarray):
+        emotion_series = emotions_to_array(emotion_series)
+    return np.column_stack([
+        emotion_series,
+        np.asarray(energy_timeline, dtype=float) / 100
+    ])
+
+
+def candidate_cluster_counts(n_frames: int) -> List[int]:
+    """Cluster counts the auto-k search considers for a recording"""
+    return list(range(settings.CLUSTER_MIN_K, min(settings.CLUSTER_MAX_K, n_frames - 1) + 1))
+
+
+def silhouette_sample(
+    emotion_series: Union[List[Dict[str, float]], np.ndarray],
+    energy_timeline: Sequence[float]
+) -> np.ndarray:
+    """Standardized features of up to CLUSTER_SILHOUETTE_SAMPLE random frames"""
+    features = StandardScaler().fit_transform(cluster_features(emotion_series, energy_timeline))
+    if len(features) > settings.CLUSTER_SILHOUETTE_SAMPLE:
+        rng = np.random.default_rng(42)
+        features = features[np.sort(rng.choice(len(features), settings.CLUSTER_SILHOUETTE_SAMPLE, replace=False))]
+    return features
+
+
+def score_cluster_count(sample: np.ndarray, n_clusters: int) -> float:
+    """Silhouette score of K-means with n_clusters on a feature sample"""
+    labels = KMeans(n_clusters=n_clusters, random_state=42, n_init=3).fit_predict(sample)
+    if len(np.unique(labels)) < 2:
+        return -1.0
+    return float(silhouette_score(sample, labels))
+
+
+def score_cluster_counts(
+    sample: np.ndarray,
+    candidates: Sequence[int],
+    deadline: float
+) -> Dict[int, float]:
+    """
+    Silhouette scores of candidate cluster counts, in order, until deadline
+    (a time.time() value). A fit only starts if the slowest one so far
+    would still finish in time, so nothing is left running past it.
+    Can be pickled for multiprocessing.
+    """
+    scores = {}
+    slowest = 0.0
+    for n_clusters in candidates:
+        started = time.time()
+        if started + slowest > deadline:
+            break
+        scores[n_clusters] = score_cluster_count(sample, n_clusters)
+        slowest = max(slowest, time.time() - started)
+    return scores
+
+
+def resize_centers(
+    centers: np.ndarray,
+    features: np.ndarray,
+    n_clusters: int
+) -> np.ndarray:
+    """
+    Starting centers for n_clusters from centers fitted with another count
+    (e.g. streamed online before auto-k chose the count)
+    
+    - fewer wanted: the centers are themselves clustered, weighted by the
+      frames nearest to each
+    - more wanted: the extra centers are drawn k-means++ style, from frames
+      far from the existing ones
+    """
+    nearest = ((features[:, np.newaxis] - centers[np.newaxis]) ** 2).sum(axis=2)
+    if len(centers) > n_clusters:
+        weights = np.bincount(nearest.argmin(axis=1), minlength=len(centers)) + 1
+        return KMeans(n_clusters=n_clusters, random_state=42, n_init=3).fit(
+            centers, sample_weight=weights
+        ).cluster_centers_
+    
+    rng = np.random.default_rng(42)
+    distances = nearest.min(axis=1)
+    resized = list(centers)
+    while len(resized) < n_clusters:
+        total = distances.sum()
+        index = rng.choice(len(features), p=distances / total) if total > 0 else rng.integers(len(features))
+        resized.append(features[index])
+        distances = np.minimum(distances, ((features - features[index]) ** 2).sum(axis=1))
+    return np.array(resized)
 
 
 class ClusterAnalyzer:
-    """Analyze emotion patterns using clustering"""
+    """
+    Analyze emotion patterns using clustering
+    
+    Up to CLUSTER_EXACT_MAX_FRAMES frames, full K-means and PCA run on
+    every frame. Longer recordings are fitted on a random sample of
+    CLUSTER_SAMPLE_FRAMES frames (mini-batch K-means, randomized PCA) and
+    every frame is then labelled and projected in one vectorized pass.
+    
+    Centers streamed by an OnlineClusterModel can be passed as init_centers:
+    K-means then only refines them (one run, CLUSTER_REFINE_MAX_ITER
+    iterations) instead of clustering from scratch. Centers streamed with
+    a different count are resized to this one first (resize_centers).
+    
+    n_clusters may be overridden per call (e.g. by the auto-k search,
+    see candidate_cluster_counts / score_cluster_counts).
+    """
     
     def __init__(self, n_clusters: int = 4):
         self.n_clusters = n_clusters
     
     def analyze(
         self,
-        emotion_series: List[Dict[str, float]],
-        energy_timeline: List[float]
+        emotion_series: Union[List[Dict[str, float]], np.ndarray],
+        energy_timeline: Sequence[float],
+        init_centers: Optional[np.ndarray] = None,
+        n_clusters: Optional[int] = None
     ) -> Dict:
         """
         Perform clustering analysis on emotion patterns
+        emotion_series: emotion dicts or an (N, 5) array in EMOTION_KEYS order
+        init_centers: optional starting centers in raw feature space
+        (resized when there is not one per cluster)
+        n_clusters: cluster count for this call (default self.n_clusters)
         Returns cluster data with labels and coordinates
         """
-        # Create feature matrix
-        features = []
-        
-        for emotion, energy in zip(emotion_series, energy_timeline):
-            feature_vector = [
-                emotion.get('neutral', 0),
-                emotion.get('happy', 0),
-                emotion.get('sad', 0),
-                emotion.get('angry', 0),
-                emotion.get('fearful', 0),
-                energy / 100  # Normalize energy to 0-1
-            ]
-            features.append(feature_vector)
+        if n_clusters is not None and n_clusters != self.n_clusters:
+            return ClusterAnalyzer(n_clusters).analyze(emotion_series, energy_timeline, init_centers)
         
-        features = np.array(features)
+        features = cluster_features(emotion_series, energy_timeline)
         
         # Standardize features
         scaler = StandardScaler()
         features_scaled = scaler.fit_transform(features)
         
-        # Perform K-means clustering
-        kmeans = KMeans(
-            n_clusters=self.n_clusters,
-            random_state=42,
-            n_init=10
-        )
-        labels = kmeans.fit_predict(features_scaled)
+        initial = None
+        if init_centers is not None and len(init_centers):
+            initial = scaler.transform(init_centers)
+            if len(initial) != self.n_clusters:
+                initial = resize_centers(initial, self._resize_sample(features_scaled), self.n_clusters)
         
-        # Get cluster centers for visualization
-        # Use PCA to reduce to 2D for visualization
-        from sklearn.decomposition import PCA
-        pca = PCA(n_components=2)
-        coords_2d = pca.fit_transform(features_scaled)
+        # Perform K-means clustering, with PCA to 2D for visualization
+        if len(features_scaled) <= settings.CLUSTER_EXACT_MAX_FRAMES:
+            centers, labels, coords_2d = self._cluster_exact(features_scaled, initial)
+        else:
+            centers, labels, coords_2d = self._cluster_sampled(features_scaled, initial)
         
         # Interpret clusters
         cluster_description = self._interpret_clusters(
-            kmeans.cluster_centers_,
+            centers,
             scaler
         )
         
@@ -70,6 +175,69 @@ class ClusterAnalyzer:
             'description': cluster_description
         }
     
+    def _resize_sample(self, features: np.ndarray) -> np.ndarray:
+        """Frames resize_centers weighs / draws from (at most CLUSTER_SAMPLE_FRAMES)"""
+        if len(features) <= settings.CLUSTER_SAMPLE_FRAMES:
+            return features
+        rng = np.random.default_rng(42)
+        return features[np.sort(rng.choice(len(features), settings.CLUSTER_SAMPLE_FRAMES, replace=False))]
+    
+    def _refine_kmeans(self, initial: np.ndarray) -> KMeans:
+        """K-means started from known centers (one run, few iterations)"""
+        return KMeans(
+            n_clusters=self.n_clusters,
+            init=initial,
+            n_init=1,
+            max_iter=settings.CLUSTER_REFINE_MAX_ITER
+        )
+    
+    def _cluster_exact(
+        self,
+        features: np.ndarray,
+        initial: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Full K-means (10 restarts, or refining initial) and exact PCA on every frame"""
+        if initial is not None:
+            kmeans = self._refine_kmeans(initial)
+        else:
+            kmeans = KMeans(
+                n_clusters=self.n_clusters,
+                random_state=42,
+                n_init=10
+            )
+        labels = kmeans.fit_predict(features)
+        coords_2d = PCA(n_components=2).fit_transform(features)
+        return kmeans.cluster_centers_, labels, coords_2d
+    
+    def _cluster_sampled(
+        self,
+        features: np.ndarray,
+        initial: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Mini-batch K-means (or refinement of initial) and randomized PCA
+        fitted on a frame sample, then applied to every frame
+        """
+        rng = np.random.default_rng(42)
+        n_sample = min(len(features), settings.CLUSTER_SAMPLE_FRAMES)
+        sample = features[np.sort(rng.choice(len(features), n_sample, replace=False))]
+        
+        if initial is not None:
+            kmeans = self._refine_kmeans(initial).fit(sample)
+        else:
+            kmeans = MiniBatchKMeans(
+                n_clusters=self.n_clusters,
+                random_state=42,
+                batch_size=settings.CLUSTER_BATCH_SIZE,
+                n_init=3
+            ).fit(sample)
+        pca = PCA(
+            n_components=2,
+            svd_solver='randomized',
+            random_state=42
+        ).fit(sample)
+        return kmeans.cluster_centers_, kmeans.predict(features), pca.transform(features)
+    
     def _interpret_clusters(
         self,
         cluster_centers: np.ndarray,
@@ -110,3 +278,69 @@ class ClusterAnalyzer:
             )
         
         return " | ".join(descriptions)
+
+
+class OnlineClusterModel:
+    """
+    Cluster centers updated incrementally as a stream's frames are analyzed
+    
+    - feature mean / variance are tracked with StandardScaler.partial_fit
+    - centers are seeded with k-means++ once CLUSTER_ONLINE_SEED_FRAMES
+      frames have arrived, then moved by mini-batch K-means steps
+      (per-center learning rate 1 / frames assigned so far)
+    - centers are kept in raw feature space and standardized with the
+      current scaler for each step, so they stay valid as it moves
+    
+    Updates come from one analysis call at a time; readers only ever see
+    whole replaced attributes.
+    """
+    
+    def __init__(self, n_clusters: int = 4):
+        self.n_clusters = n_clusters
+        self.scaler = StandardScaler()
+        self.centers: Optional[np.ndarray] = None  # (n_clusters, 6), raw feature space
+        self.counts = np.zeros(n_clusters)
+        self.description: Optional[str] = None
+        self.version = 0  # Bumped whenever the description changes
+        self._pending: List[np.ndarray] = []
+    
+    @property
+    def ready(self) -> bool:
+        return self.centers is not None
+    
+    def partial_fit(self, emotions: np.ndarray, energy: Sequence[float]):
+        """Fold a chunk of analyzed frames into the centers"""
+        features = cluster_features(emotions, energy)
+        if not len(features):
+            return
+        self.scaler.partial_fit(features)
+        
+        if self.centers is None:
+            # Buffer until there are enough frames to seed from
+            self._pending.append(features)
+            features = np.concatenate(self._pending)
+            if len(features) < max(self.n_clusters, settings.CLUSTER_ONLINE_SEED_FRAMES):
+                return
+            self._pending = []
+            features_scaled = self.scaler.transform(features)
+            centers, _ = kmeans_plusplus(features_scaled, self.n_clusters, random_state=42)
+        else:
+            features_scaled = self.scaler.transform(features)
+            centers = self.scaler.transform(self.centers)
+        
+        # Mini-batch step: each center moves to the running mean of its frames
+        labels = ((features_scaled[:, np.newaxis] - centers[np.newaxis]) ** 2).sum(axis=2).argmin(axis=1)
+        batch_counts = np.bincount(labels, minlength=self.n_clusters)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, features_scaled)
+        counts = self.counts + batch_counts
+        moved = batch_counts > 0
+        centers[moved] += (sums[moved] - batch_counts[moved, np.newaxis] * centers[moved]) / counts[moved, np.newaxis]
+        
+        self.counts = counts
+        self.centers = self.scaler.inverse_transform(centers)
+        
+        description = ClusterAnalyzer(self.n_clusters)._interpret_clusters(centers, self.scaler)
+        if description != self.description:
+            self.description = description
+            self.version += 1
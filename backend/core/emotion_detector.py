@@ -2,12 +2,17 @@
 Emotion Detection Module
 Uses Vokaturi SDK with fallback to acoustic analysis
 """
+import ctypes
 import numpy as np
 import sys
 import os
+import threading
+from multiprocessing import shared_memory
+from numpy.lib.stride_tricks import as_strided
 from pathlib import Path
-from typing import Dict, List
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import as_completed
+from core.frame_stats import FrameStatistics
 from config import settings
 
 
@@ -23,6 +28,56 @@ except ImportError:
     print("Warning: Vokaturi not available, using fallback analysis")
 
 
+# Column order of compact (N, 5) emotion arrays
+EMOTION_KEYS = ('neutral', 'happy', 'sad', 'angry', 'fearful')
+
+# Set in each pool worker by init_emotion_worker
+_worker_vokaturi_loaded = False
+
+# Sample dtype -> (Voice fill method, C element type); others are converted to float64
+_VOICE_FILLS = {
+    np.dtype(np.float64): ('fill_float64array', ctypes.c_double),
+    np.dtype(np.float32): ('fill_float32array', ctypes.c_float),
+    np.dtype(np.int32): ('fill_int32array', ctypes.c_int),
+    np.dtype(np.int16): ('fill_int16array', ctypes.c_short)
+}
+
+
+def get_vokaturi_lib_path() -> Path:
+    """Get platform-specific Vokaturi library path"""
+    base_path = settings.VOKATURI_PATH / "lib" / "open"
+    
+    import struct
+    if sys.platform == "win32":
+        if struct.calcsize("P") == 4:
+            lib_file = "win/OpenVokaturi-4-0-win32.dll"
+        else:
+            lib_file = "win/OpenVokaturi-4-0-win64.dll"
+    elif sys.platform == "darwin":
+        lib_file = "macos/OpenVokaturi-4-0-mac.dylib"
+    else:
+        lib_file = "linux/OpenVokaturi-4-0-linux.so"
+    
+    return base_path / lib_file
+
+
+def init_emotion_worker(lib_path: str):
+    """
+    Process pool initializer
+    Loads Vokaturi once per worker instead of once per task
+    """
+    global _worker_vokaturi_loaded
+    
+    if not VOKATURI_AVAILABLE or not os.path.exists(lib_path):
+        return
+    
+    try:
+        Vokaturi.load(str(lib_path))
+        _worker_vokaturi_loaded = True
+    except Exception as e:
+        print(f"Warning: Worker could not load Vokaturi: {e}")
+
+
 def _analyze_frame_worker(frame_data: tuple) -> Dict[str, float]:
     """
     Worker function for parallel processing
@@ -30,72 +85,223 @@ def _analyze_frame_worker(frame_data: tuple) -> Dict[str, float]:
     """
     frame, sample_rate, lib_path = frame_data
     
-    # Re-import Vokaturi in worker process
+    # Workers started outside the shared pool load Vokaturi lazily
+    if not _worker_vokaturi_loaded:
+        init_emotion_worker(str(lib_path))
+        if not _worker_vokaturi_loaded:
+            return _fallback_frame(frame)
+    
     try:
-        if not hasattr(_analyze_frame_worker, 'vokaturi_loaded'):
-            Vokaturi.load(str(lib_path))
-            _analyze_frame_worker.vokaturi_loaded = True
-    except Exception as e:
-        return _fallback_analysis_static(frame)
+        emotion = voice_context().analyze(frame, sample_rate)
+        if emotion is not None:
+            return emotion
+    except Exception:
+        pass
+    
+    return _fallback_frame(frame)
+
+
+def _analyze_range_worker(task: tuple) -> np.ndarray:
+    """
+    Worker function for batched parallel processing
+    Attaches to the shared frame buffer and analyzes frames [start, end)
+    Returns: (end - start, 5) array in EMOTION_KEYS order
+    """
+    shm_name, span, dtype, frame_stride, win, start, end, sample_rate, lib_path = task
     
+    shm = shared_memory.SharedMemory(name=shm_name)
     try:
-        buffer_length = len(frame)
-        c_buffer = Vokaturi.float64array(buffer_length)
+        base = np.ndarray((span,), dtype=dtype, buffer=shm.buf)
+        itemsize = base.itemsize
+        frames = as_strided(
+            base[start * frame_stride:],
+            shape=(end - start, win),
+            strides=(frame_stride * itemsize, itemsize),
+            writeable=False
+        )
         
-        # Convert to float
-        if frame.dtype == np.int16:
-            c_buffer[:] = frame[:] / 32768.0
-        elif frame.dtype == np.int32:
-            c_buffer[:] = frame[:] / 2147483648.0
+        if not _worker_vokaturi_loaded:
+            init_emotion_worker(str(lib_path))
+        
+        if _worker_vokaturi_loaded:
+            results = np.empty((end - start, len(EMOTION_KEYS)))
+            for i, frame in enumerate(frames):
+                emotion = _analyze_frame_worker((frame, sample_rate, lib_path))
+                results[i] = [emotion[key] for key in EMOTION_KEYS]
         else:
-            c_buffer[:] = frame[:]
+            # Whole range in one vectorized pass
+            results = fallback_analysis(frames)
         
-        # Create voice
-        voice = Vokaturi.Voice(float(sample_rate), buffer_length, 0)
-        voice.fill_float64array(buffer_length, c_buffer)
+        # Views must be released before the segment can be closed
+        del frames, base
+    finally:
+        shm.close()
+    
+    return results
+
+
+def _share_frames(frames) -> Tuple[shared_memory.SharedMemory, tuple]:
+    """
+    Copy the samples behind a frame matrix into shared memory once
+    Overlapping strided frames share their samples, so only the unique
+    span of audio is copied.
+    Returns: (shared memory block, (span, dtype, frame_stride, win))
+    """
+    frames = np.asarray(frames)
+    itemsize = frames.itemsize
+    
+    if not (
+        frames.ndim == 2
+        and frames.strides[1] == itemsize
+        and frames.strides[0] > 0
+        and frames.strides[0] % itemsize == 0
+    ):
+        frames = np.ascontiguousarray(frames)
+    
+    n_frames, win = frames.shape
+    frame_stride = frames.strides[0] // itemsize
+    span = (n_frames - 1) * frame_stride + win
+    
+    # 1-D view over every sample referenced by the frames
+    samples = as_strided(frames, shape=(span,), strides=(itemsize,), writeable=False)
+    
+    shm = shared_memory.SharedMemory(create=True, size=max(1, samples.nbytes))
+    shared = np.ndarray((span,), dtype=frames.dtype, buffer=shm.buf)
+    shared[:] = samples
+    del shared
+    
+    return shm, (span, frames.dtype.str, frame_stride, win)
+
+
+def emotions_to_array(emotion_series: List[Dict[str, float]]) -> np.ndarray:
+    """Convert a list of emotion dicts to a compact (N, 5) array"""
+    return np.array(
+        [[emotion.get(key, 0) for key in EMOTION_KEYS] for emotion in emotion_series],
+        dtype=np.float64
+    ).reshape(-1, len(EMOTION_KEYS))
+
+
+def array_to_emotions(emotion_array: np.ndarray) -> List[Dict[str, float]]:
+    """Convert a compact (N, 5) array back to a list of emotion dicts"""
+    return [dict(zip(EMOTION_KEYS, row)) for row in emotion_array.tolist()]
+
+
+class VoiceContext:
+    """
+    Vokaturi voice kept alive across frames
+    
+    The voice is created once per (sample rate, frame length) and reset
+    between frames; samples are passed straight from NumPy memory with
+    the fill variant matching their dtype, so nothing is copied
+    element-wise. Not thread-safe - use voice_context() for the calling
+    thread's (or worker process's) instance.
+    """
+    
+    def __init__(self):
+        self.voice = None
+        self.shape: Optional[Tuple[float, int]] = None
+        self.quality = Vokaturi.Quality()
+        self.emotion = Vokaturi.EmotionProbabilities()
+    
+    def analyze(self, frame: np.ndarray, sample_rate: int) -> Optional[Dict[str, float]]:
+        """Emotion probabilities for one frame, None if Vokaturi rejects it"""
+        fill = _VOICE_FILLS.get(frame.dtype)
+        if fill is None:
+            frame = frame.astype(np.float64)
+            fill = _VOICE_FILLS[frame.dtype]
+        # No-op for frame matrix rows
+        frame = np.ascontiguousarray(frame)
+        fill_method, c_type = fill
         
-        # Extract emotions
-        quality = Vokaturi.Quality()
-        emotion = Vokaturi.EmotionProbabilities()
-        voice.extract(quality, emotion)
+        buffer_length = len(frame)
+        shape = (float(sample_rate), buffer_length)
+        if self.voice is None or self.shape != shape:
+            self.close()
+            # (sample_rate, buffer_length, multi_threading)
+            self.voice = Vokaturi.Voice(shape[0], buffer_length, 0)
+            self.shape = shape
+        else:
+            self.voice.reset()
         
-        voice.destroy()
+        getattr(self.voice, fill_method)(buffer_length, frame.ctypes.data_as(ctypes.POINTER(c_type)))
+        self.voice.extract(self.quality, self.emotion)
         
-        if quality.valid:
-            return {
-                'neutral': emotion.neutrality,
-                'happy': emotion.happiness,
-                'sad': emotion.sadness,
-                'angry': emotion.anger,
-                'fearful': emotion.fear
-            }
-    except Exception:
-        pass
+        if not self.quality.valid:
+            return None
+        emotion = self.emotion
+        return {
+            'neutral': emotion.neutrality,
+            'happy': emotion.happiness,
+            'sad': emotion.sadness,
+            'angry': emotion.anger,
+            'fearful': emotion.fear
+        }
+    
+    def close(self):
+        if self.voice is not None:
+            self.voice.destroy()
+            self.voice = None
+            self.shape = None
     
-    return _fallback_analysis_static(frame)
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
 
-def _fallback_analysis_static(frame: np.ndarray) -> Dict[str, float]:
-    """Static fallback analysis (can be pickled for multiprocessing)"""
-    energy = float(np.sqrt(np.mean(frame ** 2)))
-    zcr = float(np.mean(np.abs(np.diff(np.sign(frame)))))
-    
-    if energy > 0.08:
-        if zcr > 0.15:
-            return {'neutral': 0.2, 'happy': 0.5, 'sad': 0.1, 'angry': 0.1, 'fearful': 0.1}
-        else:
-            return {'neutral': 0.2, 'happy': 0.1, 'sad': 0.1, 'angry': 0.4, 'fearful': 0.2}
-    elif energy < 0.02:
-        return {'neutral': 0.4, 'happy': 0.1, 'sad': 0.3, 'angry': 0.1, 'fearful': 0.1}
-    else:
-        return {'neutral': 0.6, 'happy': 0.1, 'sad': 0.1, 'angry': 0.1, 'fearful': 0.1}
+_voice_contexts = threading.local()
+
+
+def voice_context() -> VoiceContext:
+    """The calling thread's reusable Vokaturi voice"""
+    context = getattr(_voice_contexts, 'context', None)
+    if context is None:
+        context = _voice_contexts.context = VoiceContext()
+    return context
+
+
+# Fallback emotion profiles (EMOTION_KEYS order) by acoustic regime
+_FALLBACK_PROFILES = np.array([
+    [0.2, 0.5, 0.1, 0.1, 0.1],  # High energy + high variation = Happy/Energised
+    [0.2, 0.1, 0.1, 0.4, 0.2],  # High energy + low variation = Angry/Stressed
+    [0.4, 0.1, 0.3, 0.1, 0.1],  # Low energy = Sad/Flat
+    [0.6, 0.1, 0.1, 0.1, 0.1]   # Medium energy = Neutral
+])
+
+
+def fallback_emotions(rms: np.ndarray, zcr: np.ndarray) -> np.ndarray:
+    """
+    Heuristic emotions from acoustic features, when Vokaturi is unavailable
+    rms / zcr are per-frame arrays (FrameStatistics); returns (N, 5)
+    """
+    rms = np.asarray(rms, dtype=float)
+    zcr = np.asarray(zcr, dtype=float)
+    profile = np.select(
+        [(rms > 0.08) & (zcr > 0.15), rms > 0.08, rms < 0.02],
+        [0, 1, 2],
+        default=3
+    )
+    return _FALLBACK_PROFILES[profile]
+
+
+def fallback_analysis(frames: np.ndarray) -> np.ndarray:
+    """Fallback emotions for a frame matrix, features computed in one vectorized pass"""
+    stats = FrameStatistics.from_frames(frames)
+    return fallback_emotions(stats.rms, stats.zcr)
+
+
+def _fallback_frame(frame: np.ndarray) -> Dict[str, float]:
+    """Fallback emotions for a single frame (can be pickled for multiprocessing)"""
+    return array_to_emotions(fallback_analysis(np.asarray(frame)[np.newaxis]))[0]
 
 
 class EmotionDetector:
     """Detect emotions from audio frames using Vokaturi or fallback"""
     
-    def __init__(self):
+    def __init__(self, worker_pool=None):
         self.vokaturi_loaded = False
+        self.worker_pool = worker_pool
         
         if VOKATURI_AVAILABLE:
             lib_path = self._get_vokaturi_lib_path()
@@ -107,22 +313,21 @@ class EmotionDetector:
                 except Exception as e:
                     print(f"Warning: Could not load Vokaturi: {e}")
     
+    @property
+    def engine(self) -> str:
+        """Name of the active emotion engine (part of analysis cache keys)"""
+        return 'vokaturi' if self.vokaturi_loaded else 'fallback'
+    
     def _get_vokaturi_lib_path(self) -> Path:
         """Get platform-specific Vokaturi library path"""
-        base_path = settings.VOKATURI_PATH / "lib" / "open"
-        
-        import struct
-        if sys.platform == "win32":
-            if struct.calcsize("P") == 4:
-                lib_file = "win/OpenVokaturi-4-0-win32.dll"
-            else:
-                lib_file = "win/OpenVokaturi-4-0-win64.dll"
-        elif sys.platform == "darwin":
-            lib_file = "macos/OpenVokaturi-4-0-mac.dylib"
-        else:
-            lib_file = "linux/OpenVokaturi-4-0-linux.so"
-        
-        return base_path / lib_file
+        return get_vokaturi_lib_path()
+    
+    def _get_worker_pool(self):
+        """Get the injected worker pool, or the process-wide shared one"""
+        if self.worker_pool is None:
+            from core.worker_pool import get_default_pool
+            self.worker_pool = get_default_pool()
+        return self.worker_pool
     
     def analyze_frame(self, frame: np.ndarray, sample_rate: int) -> Dict[str, float]:
         """
@@ -130,134 +335,102 @@ class EmotionDetector:
         Returns: dict with emotion probabilities
         """
         if not self.vokaturi_loaded:
-            return self._fallback_analysis(frame)
+            return _fallback_frame(frame)
         
         try:
-            buffer_length = len(frame)
-            c_buffer = Vokaturi.float64array(buffer_length)
-            
-            # Convert to float
-            if frame.dtype == np.int16:
-                c_buffer[:] = frame[:] / 32768.0
-            elif frame.dtype == np.int32:
-                c_buffer[:] = frame[:] / 2147483648.0
-            else:
-                c_buffer[:] = frame[:]
-            
-            # Create voice (sample_rate, buffer_length, multi_threading)
-            voice = Vokaturi.Voice(float(sample_rate), buffer_length, 0)
-            voice.fill_float64array(buffer_length, c_buffer)
-            
-            # Extract emotions
-            quality = Vokaturi.Quality()
-            emotion = Vokaturi.EmotionProbabilities()
-            voice.extract(quality, emotion)
-            
-            voice.destroy()
-            
-            if quality.valid:
-                return {
-                    'neutral': emotion.neutrality,
-                    'happy': emotion.happiness,
-                    'sad': emotion.sadness,
-                    'angry': emotion.anger,
-                    'fearful': emotion.fear
-                }
+            emotion = voice_context().analyze(frame, sample_rate)
+            if emotion is not None:
+                return emotion
         
         except Exception as e:
             print(f"Vokaturi error: {e}, using fallback")
         
-        return self._fallback_analysis(frame)
-    
-    def _fallback_analysis(self, frame: np.ndarray) -> Dict[str, float]:
-        """
-        Fallback emotion analysis using acoustic features
-        When Vokaturi is unavailable
-        """
-        # Compute acoustic features
-        energy = float(np.sqrt(np.mean(frame ** 2)))
-        zcr = float(np.mean(np.abs(np.diff(np.sign(frame)))))
-        
-        # Heuristic emotion mapping
-        if energy > 0.08:
-            if zcr > 0.15:
-                # High energy + high variation = Happy/Energised
-                return {
-                    'neutral': 0.2,
-                    'happy': 0.5,
-                    'sad': 0.1,
-                    'angry': 0.1,
-                    'fearful': 0.1
-                }
-            else:
-                # High energy + low variation = Angry/Stressed
-                return {
-                    'neutral': 0.2,
-                    'happy': 0.1,
-                    'sad': 0.1,
-                    'angry': 0.4,
-                    'fearful': 0.2
-                }
-        elif energy < 0.02:
-            # Low energy = Sad/Flat
-            return {
-                'neutral': 0.4,
-                'happy': 0.1,
-                'sad': 0.3,
-                'angry': 0.1,
-                'fearful': 0.1
-            }
-        else:
-            # Medium energy = Neutral
-            return {
-                'neutral': 0.6,
-                'happy': 0.1,
-                'sad': 0.1,
-                'angry': 0.1,
-                'fearful': 0.1
-            }
+        return _fallback_frame(frame)
     
     def batch_analyze(
         self,
         frames: List[np.ndarray],
         sample_rate: int,
-        use_parallel: bool = True
+        use_parallel: bool = True,
+        frame_stats: FrameStatistics = None
     ) -> List[Dict[str, float]]:
         """
         Analyze multiple frames
-        Uses ProcessPoolExecutor for true parallel processing
+        Uses the shared worker pool for true parallel processing
         """
-        if not use_parallel or len(frames) < settings.BATCH_SIZE:
-            # Sequential processing for small batches
-            return [self.analyze_frame(frame, sample_rate) for frame in frames]
+        return array_to_emotions(
+            self.batch_analyze_array(frames, sample_rate, use_parallel, frame_stats)
+        )
+    
+    def batch_analyze_array(
+        self,
+        frames: np.ndarray,
+        sample_rate: int,
+        use_parallel: bool = True,
+        frame_stats: FrameStatistics = None
+    ) -> np.ndarray:
+        """
+        Analyze multiple frames, returning a compact (N, 5) array
+        in EMOTION_KEYS order
+        
+        Frames are placed in shared memory once and workers receive
+        index ranges, so no audio is pickled per task.
+        Without Vokaturi, the fallback reuses frame_stats (or computes
+        them in one vectorized pass) instead of analyzing frame by frame.
+        """
+        n_frames = len(frames)
         
-        # Parallel processing with ProcessPoolExecutor
-        print(f"🚀 Starting parallel emotion detection for {len(frames)} frames...")
-        results = [None] * len(frames)
-        lib_path = self._get_vokaturi_lib_path()
+        if not self.vokaturi_loaded:
+            if frame_stats is None:
+                return fallback_analysis(frames)
+            return fallback_emotions(frame_stats.rms, frame_stats.zcr)
+        
+        if not use_parallel or n_frames < settings.BATCH_SIZE:
+            # Sequential processing for small batches
+            return emotions_to_array(
+                [self.analyze_frame(frame, sample_rate) for frame in frames]
+            )
         
-        # Prepare frame data with index, frame, sample_rate, lib_path
-        frame_data = [(frame, sample_rate, lib_path) for frame in frames]
+        # Parallel processing with the shared worker pool
+        results = np.empty((n_frames, len(EMOTION_KEYS)))
+        lib_path = str(self._get_vokaturi_lib_path())
+        pool = self._get_worker_pool()
         
-        with ProcessPoolExecutor(max_workers=settings.PARALLEL_WORKERS) as executor:
-            future_to_idx = {
-                executor.submit(_analyze_frame_worker, data): idx
-                for idx, data in enumerate(frame_data)
-            }
+        shm, (span, dtype, frame_stride, win) = _share_frames(frames)
+        try:
+            future_to_range = {}
+            for start, end in self._chunk_ranges(n_frames, pool.max_workers):
+                task = (shm.name, span, dtype, frame_stride, win, start, end, sample_rate, lib_path)
+                future_to_range[pool.submit(_analyze_range_worker, task)] = (start, end)
             
-            completed = 0
-            for future in as_completed(future_to_idx):
-                idx = future_to_idx[future]
-                results[idx] = future.result()
-                completed += 1
-                
-                # Progress logging every 10%
-                if completed % max(1, len(frames) // 10) == 0:
-                    print(f"  Progress: {completed}/{len(frames)} frames ({(completed/len(frames)*100):.0f}%)")
+            for future in as_completed(future_to_range):
+                start, end = future_to_range[future]
+                try:
+                    results[start:end] = future.result()
+                except Exception as e:
+                    # Worker died (e.g. pool broken) - analyze in-process instead
+                    print(f"Worker error: {e}, analyzing frames {start}-{end} locally")
+                    results[start:end] = emotions_to_array(
+                        [self.analyze_frame(frame, sample_rate) for frame in frames[start:end]]
+                    )
+        finally:
+            shm.close()
+            shm.unlink()
         
-        print(f"✅ Parallel emotion detection complete!")
         return results
     
+    @staticmethod
+    def _chunk_ranges(n_frames: int, n_workers: int) -> List[Tuple[int, int]]:
+        """
+        Split frame indices into contiguous ranges
+        A few ranges per worker keeps the pool balanced without per-frame tasks
+        """
+        chunk_size = max(1, -(-n_frames // (n_workers * settings.TASKS_PER_WORKER)))
+        return [
+            (start, min(start + chunk_size, n_frames))
+            for start in range(0, n_frames, chunk_size)
+        ]
+    
     def analyze_streaming(
         self,
         frame: np.ndarray,
@@ -0,0 +1,101 @@
+"""
+Frame Scheduling Module
+Orders streaming frame analysis around the viewers' playheads
+"""
+import asyncio
+from typing import Dict, Optional, Tuple
+import numpy as np
+from config import settings
+
+
+class PlayheadScheduler:
+    """
+    Picks the next range of frames to analyze for a stream
+
+    Frames just ahead of the most recent client playhead come first, in
+    small batches so a seek is answered after a couple of frame analyses.
+    Otherwise the earliest unanalyzed frames are filled in full batches.
+    Progress is read from the stream's FrameResultStore bitmap.
+    """
+
+    def __init__(
+        self,
+        frames,
+        batch_size: int = None,
+        priority_frames: int = None,
+        lookahead_frames: int = None
+    ):
+        self.batch_size = batch_size or settings.BATCH_SIZE
+        self.priority_frames = priority_frames or settings.SCHEDULER_PRIORITY_FRAMES
+        self.lookahead_frames = lookahead_frames or settings.SCHEDULER_LOOKAHEAD_FRAMES
+        self.frames = frames
+        self.playheads: Dict[str, int] = {}  # client -> frame index, oldest seek first
+        self.changed = asyncio.Event()
+        self._frontier = 0  # every frame before this one is analyzed
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def processed(self) -> np.ndarray:
+        return self.frames.processed
+
+    def set_playhead(self, client_id: str, frame_idx: int):
+        """Record a client's latest seek; it becomes the top priority"""
+        self.playheads.pop(client_id, None)
+        self.playheads[client_id] = frame_idx
+        self.changed.set()
+
+    def remove_client(self, client_id: str):
+        self.playheads.pop(client_id, None)
+
+    def notify(self):
+        """Wake the analysis loop (new frames decoded)"""
+        self.changed.set()
+
+    def mark_processed(self, start: int, end: int):
+        """Note that frames [start, end) were written to the store"""
+        if start > self._frontier:
+            return
+        while self._frontier < len(self.processed) and self.processed[self._frontier]:
+            self._frontier += 1
+
+    def is_complete(self, available: int) -> bool:
+        """Whether every one of the first `available` frames is analyzed"""
+        return self._frontier >= available
+
+    def next_range(self, available: int, final: bool = False) -> Optional[Tuple[int, int]]:
+        """
+        Next [start, end) to analyze among the first `available` frames
+
+        While more frames are still being decoded (final=False), background
+        batches wait until a full batch is available, and are held entirely
+        while a playhead is past the decoded audio so the decoder gets there
+        sooner. Returns None when there is nothing worth dispatching yet.
+        """
+        awaiting_decode = False
+
+        # Most recent seek first
+        for frame_idx in reversed(list(self.playheads.values())):
+            if frame_idx >= available:
+                awaiting_decode = not final
+                continue
+            window_end = min(frame_idx + self.lookahead_frames, available)
+            pending = np.flatnonzero(~self.processed[frame_idx:window_end])
+            if len(pending):
+                start = frame_idx + int(pending[0])
+                return start, self._run_end(start, min(start + self.priority_frames, window_end))
+
+        if awaiting_decode or self._frontier >= available:
+            return None
+
+        start = self._frontier
+        end = self._run_end(start, min(start + self.batch_size, available))
+        if end - start < self.batch_size and end == available and not final:
+            return None
+        return start, end
+
+    def _run_end(self, start: int, limit: int) -> int:
+        """End of the contiguous unanalyzed run from start, capped at limit"""
+        done = np.flatnonzero(self.processed[start:limit])
+        return start + int(done[0]) if len(done) else limit
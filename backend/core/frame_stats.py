@@ -0,0 +1,139 @@
+"""
+Frame Statistics Module
+Per-frame acoustic statistics (RMS, ZCR, peak, energy) in one vectorized pass
+"""
+import numpy as np
+from numpy.lib.stride_tricks import as_strided, sliding_window_view
+from config import settings
+
+
+# Hops processed per block, bounds temporary memory on long recordings
+_HOPS_PER_BLOCK = 256
+
+
+class FrameStatistics:
+    """
+    Acoustic statistics for every frame of a recording
+
+    Attributes (all 1-D arrays, one value per frame):
+    - rms: root-mean-square amplitude
+    - zcr: mean absolute sign change between consecutive samples
+    - peak: maximum absolute amplitude
+    - energy: RMS scaled to 0-100 (settings.ENERGY_SCALE, clipped)
+    """
+
+    def __init__(self, rms: np.ndarray, zcr: np.ndarray, peak: np.ndarray):
+        self.rms = rms
+        self.zcr = zcr
+        self.peak = peak
+        self.energy = np.minimum(rms * settings.ENERGY_SCALE, 100)
+
+    def __len__(self) -> int:
+        return len(self.rms)
+
+    def __getitem__(self, index) -> 'FrameStatistics':
+        """Slice statistics for a subset of frames"""
+        return FrameStatistics(self.rms[index], self.zcr[index], self.peak[index])
+
+    @classmethod
+    def from_audio(
+        cls,
+        audio: np.ndarray,
+        win_samples: int,
+        hop_samples: int,
+        n_frames: int = None
+    ) -> 'FrameStatistics':
+        """
+        Compute statistics for frames audio[i*hop : i*hop + win]
+
+        When the window is a whole number of hops, squared sums, peaks and
+        zero crossings are reduced once per hop and combined per frame, so
+        overlapping samples are never re-summed.
+        """
+        if n_frames is None:
+            n_frames = max(0, (len(audio) - win_samples) // hop_samples + 1)
+
+        if n_frames == 0:
+            return cls(np.empty(0), np.empty(0), np.empty(0))
+
+        if win_samples % hop_samples != 0:
+            frames = sliding_window_view(audio, win_samples)[::hop_samples][:n_frames]
+            return cls._from_frame_rows(frames)
+
+        hops_per_frame = win_samples // hop_samples
+        n_hops = n_frames - 1 + hops_per_frame
+
+        hop_sq = np.empty(n_hops)
+        hop_peak = np.empty(n_hops)
+        hop_zc = np.empty(n_hops)
+
+        for h0 in range(0, n_hops, _HOPS_PER_BLOCK):
+            h1 = min(h0 + _HOPS_PER_BLOCK, n_hops)
+            block = audio[h0 * hop_samples:h1 * hop_samples].reshape(h1 - h0, hop_samples)
+
+            hop_sq[h0:h1] = np.einsum('ij,ij->i', block, block, dtype=np.float64)
+            hop_peak[h0:h1] = np.abs(block).max(axis=1)
+
+            # Sign changes d[i] = |sign(x[i+1]) - sign(x[i])| starting in this block
+            signs = np.sign(audio[h0 * hop_samples:h1 * hop_samples + 1])
+            changes = np.abs(np.diff(signs))
+            if len(changes) < block.size:
+                changes = np.append(changes, 0.0)
+            hop_zc[h0:h1] = changes.reshape(h1 - h0, hop_samples).sum(axis=1)
+
+        frame_sq = sliding_window_view(hop_sq, hops_per_frame).sum(axis=1)
+        peak = sliding_window_view(hop_peak, hops_per_frame).max(axis=1)
+        frame_zc = sliding_window_view(hop_zc, hops_per_frame).sum(axis=1)
+
+        # A frame has win-1 sign changes; drop the one crossing its right edge
+        edge = np.arange(n_frames) * hop_samples + win_samples - 1
+        has_next = edge + 1 < len(audio)
+        edge_change = np.zeros(n_frames)
+        edge_change[has_next] = np.abs(
+            np.sign(audio[edge[has_next] + 1]) - np.sign(audio[edge[has_next]])
+        )
+        frame_zc = frame_zc - edge_change
+
+        rms = np.sqrt(frame_sq / win_samples)
+        zcr = frame_zc / max(1, win_samples - 1)
+
+        return cls(rms, zcr, peak)
+
+    @classmethod
+    def from_frames(cls, frames: np.ndarray) -> 'FrameStatistics':
+        """
+        Compute statistics for a frame matrix
+        Strided views over a single signal are reduced per hop via from_audio
+        """
+        frames = np.asarray(frames)
+
+        if frames.ndim != 2 or len(frames) == 0:
+            return cls._from_frame_rows(frames)
+
+        itemsize = frames.itemsize
+        n_frames, win_samples = frames.shape
+        stride = frames.strides[0]
+
+        if frames.strides[1] == itemsize and stride > 0 and stride % itemsize == 0:
+            hop_samples = stride // itemsize
+            span = (n_frames - 1) * hop_samples + win_samples
+            samples = as_strided(frames, shape=(span,), strides=(itemsize,), writeable=False)
+            return cls.from_audio(samples, win_samples, hop_samples, n_frames)
+
+        return cls._from_frame_rows(frames)
+
+    @classmethod
+    def _from_frame_rows(cls, frames) -> 'FrameStatistics':
+        """Row-wise reduction for arbitrary frame layouts"""
+        n_frames = len(frames)
+        rms = np.empty(n_frames)
+        zcr = np.empty(n_frames)
+        peak = np.empty(n_frames)
+
+        for i, frame in enumerate(frames):
+            frame = np.asarray(frame, dtype=np.float64)
+            rms[i] = np.sqrt(np.mean(frame ** 2)) if frame.size else 0.0
+            zcr[i] = np.mean(np.abs(np.diff(np.sign(frame)))) if frame.size > 1 else 0.0
+            peak[i] = np.max(np.abs(frame)) if frame.size else 0.0
+
+        return cls(rms, zcr, peak)
@@ -0,0 +1,103 @@
+"""
+Frame Result Store Module
+Columnar per-session frame results shared by the live dashboard and overall analysis
+"""
+import numpy as np
+from core.emotion_detector import EMOTION_KEYS
+from core.frame_stats import FrameStatistics
+from core.metrics_processor import RealtimeMetricsIndex
+from core.mood_mapper import CATEGORY_KEYS, UNPROCESSED_CODE
+
+
+class FrameResultStore:
+    """
+    Analysis results for every frame of one recording, one array per field
+
+    - timestamps: frame start times (seconds)
+    - rms, zcr, peak, energy: acoustic statistics (see FrameStatistics)
+    - emotions: (n, 5) probabilities in EMOTION_KEYS order
+    - codes: category codes (UNPROCESSED_CODE until analyzed)
+    - processed: bitmap of analyzed frames
+
+    Frames are written once, in any order, as they are analyzed; a
+    prefix-sum index over them answers playhead metric queries.
+    """
+
+    def __init__(self, n_frames: int, hop_samples: int, sample_rate: int):
+        self.hop_samples = hop_samples
+        self.sample_rate = sample_rate
+        self.timestamps = np.arange(n_frames) * hop_samples / sample_rate
+        self.rms = np.zeros(n_frames)
+        self.zcr = np.zeros(n_frames)
+        self.peak = np.zeros(n_frames)
+        self.energy = np.zeros(n_frames)
+        self.emotions = np.zeros((n_frames, len(EMOTION_KEYS)))
+        self.codes = np.full(n_frames, UNPROCESSED_CODE, dtype=np.int8)
+        self.processed = np.zeros(n_frames, dtype=bool)
+        self.metrics_index = RealtimeMetricsIndex(n_frames, len(CATEGORY_KEYS))
+
+    def __len__(self) -> int:
+        return len(self.processed)
+
+    def write(
+        self,
+        start: int,
+        frame_stats: FrameStatistics,
+        emotions: np.ndarray,
+        codes: np.ndarray
+    ):
+        """Store analyzed frames [start, start + len(codes))"""
+        end = start + len(codes)
+        if end > len(self):
+            self.resize(end)
+
+        self.rms[start:end] = frame_stats.rms
+        self.zcr[start:end] = frame_stats.zcr
+        self.peak[start:end] = frame_stats.peak
+        self.energy[start:end] = frame_stats.energy
+        self.emotions[start:end] = emotions
+        self.codes[start:end] = codes
+        self.processed[start:end] = True
+        self.metrics_index.update(start, self.energy[start:end], self.codes[start:end])
+
+    def resize(self, n_frames: int):
+        """Grow (unanalyzed) or trim to n_frames"""
+        keep = min(n_frames, len(self))
+
+        def resized(values: np.ndarray, fill) -> np.ndarray:
+            out = np.full((n_frames,) + values.shape[1:], fill, dtype=values.dtype)
+            out[:keep] = values[:keep]
+            return out
+
+        self.timestamps = np.arange(n_frames) * self.hop_samples / self.sample_rate
+        self.rms = resized(self.rms, 0)
+        self.zcr = resized(self.zcr, 0)
+        self.peak = resized(self.peak, 0)
+        self.energy = resized(self.energy, 0)
+        self.emotions = resized(self.emotions, 0)
+        self.codes = resized(self.codes, UNPROCESSED_CODE)
+        self.processed = resized(self.processed, False)
+        self.metrics_index.resize(n_frames)
+
+    def is_processed(self, idx: int) -> bool:
+        return bool(self.processed[idx])
+
+    @property
+    def is_complete(self) -> bool:
+        return bool(self.processed.all())
+
+    @property
+    def progress(self) -> float:
+        """Fraction of frames analyzed"""
+        return float(self.processed.mean()) if len(self) else 1.0
+
+    @property
+    def nbytes(self) -> int:
+        columns = (
+            self.timestamps, self.rms, self.zcr, self.peak, self.energy,
+            self.emotions, self.codes, self.processed
+        )
+        return sum(values.nbytes for values in columns) + self.metrics_index.nbytes
+
+    def frame_stats(self) -> FrameStatistics:
+        return FrameStatistics(self.rms, self.zcr, self.peak)
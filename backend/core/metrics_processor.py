@@ -2,73 +2,76 @@
 Metrics Processing Module
 Calculate meeting metrics from audio and emotion data
 """
+import threading
 import numpy as np
 from typing import Dict, List
+from core.frame_stats import FrameStatistics
 from config import settings
 
 
 class MetricsProcessor:
-    """Calculate meeting performance metrics"""
+    """
+    Calculate meeting performance metrics
+    Frame inputs may be read-only strided views from AudioProcessor.segment_audio
+    """
     
     def __init__(self, sample_rate: int = None):
         self.sample_rate = sample_rate or settings.AUDIO_SAMPLE_RATE
     
-    def calculate_energy_timeline(self, frames: np.ndarray) -> List[float]:
-        """Calculate energy level for each frame"""
-        energy_timeline = []
-        
-        for frame in frames:
-            rms = np.sqrt(np.mean(frame ** 2))
-            # Scale to 0-100
-            energy = min(rms * settings.ENERGY_SCALE, 100)
-            energy_timeline.append(float(energy))
+    def calculate_energy_timeline(
+        self,
+        frames: np.ndarray,
+        stats: FrameStatistics = None
+    ) -> List[float]:
+        """Calculate energy level (RMS scaled to 0-100) for each frame"""
+        if stats is None:
+            stats = FrameStatistics.from_frames(frames)
         
-        return energy_timeline
+        return stats.energy.tolist()
     
     def calculate_silence_percentage(
         self,
         frames: np.ndarray,
-        threshold: float = None
+        threshold: float = None,
+        stats: FrameStatistics = None
     ) -> float:
         """Calculate percentage of silent frames"""
         if threshold is None:
             threshold = settings.SILENCE_THRESHOLD
         
-        silent_count = 0
-        for frame in frames:
-            # Calculate RMS energy
-            rms = np.sqrt(np.mean(frame ** 2))
-            # Convert to more sensitive scale (0-1 range for audio)
-            energy_level = rms
-            
-            # Consider silence if energy is below threshold
-            # Typical speech has energy > 0.01, silence < 0.005
-            if energy_level < threshold:
-                silent_count += 1
+        if stats is None:
+            stats = FrameStatistics.from_frames(frames)
+        
+        if len(stats) == 0:
+            return 0.0
         
-        silence_pct = (silent_count / len(frames)) * 100
+        # Consider silence if RMS energy is below threshold
+        # Typical speech has energy > 0.01, silence < 0.005
+        silent_count = np.count_nonzero(stats.rms < threshold)
+        
+        silence_pct = (silent_count / len(stats)) * 100
         return float(silence_pct)
     
     def calculate_participation(
         self,
         frames: np.ndarray,
-        threshold: float = 0.02
+        threshold: float = 0.02,
+        stats: FrameStatistics = None
     ) -> float:
         """
         Calculate participation percentage
         Based on RMS energy of frames (speech vs silence)
         """
-        if len(frames) == 0:
+        if stats is None:
+            stats = FrameStatistics.from_frames(frames)
+        
+        if len(stats) == 0:
             return 0.0
         
-        active_count = 0
-        for frame in frames:
-            rms = np.sqrt(np.mean(frame ** 2))
-            # Active speech typically has RMS > 0.02
-            if rms > threshold:
-                active_count += 1
+        # Active speech typically has RMS > 0.02
+        active_count = np.count_nonzero(stats.rms > threshold)
         
-        participation = (active_count / len(frames)) * 100
+        participation = (active_count / len(stats)) * 100
         return float(participation)
     
     def calculate_volatility(self, energy_timeline: List[float]) -> float:
@@ -108,20 +111,25 @@ class MetricsProcessor:
         self,
         frames: np.ndarray,
         emotion_series: List[Dict],
-        full_audio: np.ndarray = None
+        full_audio: np.ndarray = None,
+        frame_stats: FrameStatistics = None
     ) -> Dict:
         """
         Calculate all metrics at once
+        Frame statistics are computed once (or reused) for every metric
         Returns comprehensive metrics dictionary
         """
+        if frame_stats is None:
+            frame_stats = FrameStatistics.from_frames(frames)
+        
         # Energy timeline
-        energy_timeline = self.calculate_energy_timeline(frames)
+        energy_timeline = self.calculate_energy_timeline(frames, frame_stats)
         
         # Silence percentage
-        silence_pct = self.calculate_silence_percentage(frames)
+        silence_pct = self.calculate_silence_percentage(frames, stats=frame_stats)
         
         # Participation
-        participation = self.calculate_participation(frames)
+        participation = self.calculate_participation(frames, stats=frame_stats)
         
         # Average energy
         avg_energy = self.calculate_average_energy(energy_timeline)
@@ -174,3 +182,163 @@ class MetricsProcessor:
             'emotion_shifts': emotion_shifts,
             'volatility': volatility
         }
+
+
+class RealtimeMetricsIndex:
+    """
+    Prefix sums over analyzed frames for constant-time playhead queries
+    
+    Maintained as frames are analyzed (update) so each seek only reads a
+    handful of prefix values instead of rescanning the timeline.
+    Metrics cover analyzed frames up to the playhead, in time order.
+    
+    An update only recomputes prefixes from its first frame onward; the
+    last analyzed frame before it (kept as a running prefix too) supplies
+    the energy difference and category shift at the boundary. Updates run
+    on analysis threads while queries run on the event loop, so both take
+    the index lock.
+    """
+    
+    _SUM_KEYS = ('count', 'energy', 'silent', 'diff', 'diff_sq', 'shifts')
+    
+    def __init__(self, n_frames: int, n_categories: int, silence_energy: float = 20):
+        self.n_categories = n_categories
+        self.silence_energy = silence_energy
+        self.energy = np.zeros(n_frames)
+        self.codes = np.full(n_frames, -1, dtype=np.int16)
+        self._lock = threading.Lock()
+        self._prefix = self._allocate_prefix(n_frames)
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def update(self, start: int, energy: np.ndarray, codes: np.ndarray):
+        """Record analyzed frames [start, start + len(codes)) and refresh prefixes"""
+        end = start + len(codes)
+        with self._lock:
+            self.energy[start:end] = energy
+            self.codes[start:end] = codes
+            
+            # Prefixes up to start are unaffected (O((n - start) * k) per analyzed chunk)
+            self._refresh_prefix(start)
+    
+    def resize(self, n_frames: int):
+        """Grow (unanalyzed) or trim the indexed timeline to n_frames"""
+        with self._lock:
+            keep = min(n_frames, len(self.codes))
+            energy = np.zeros(n_frames)
+            codes = np.full(n_frames, -1, dtype=np.int16)
+            energy[:keep] = self.energy[:keep]
+            codes[:keep] = self.codes[:keep]
+            self.energy = energy
+            self.codes = codes
+            self._prefix = self._allocate_prefix(n_frames)
+            self._refresh_prefix(0)
+    
+    def is_processed(self, idx: int) -> bool:
+        return bool(self.codes[idx] >= 0)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the timeline and its prefix sums"""
+        return (
+            self.energy.nbytes + self.codes.nbytes
+            + sum(values.nbytes for values in self._prefix.values())
+        )
+    
+    def processed_count(self, idx: int) -> int:
+        """Number of analyzed frames in 0..idx (inclusive)"""
+        with self._lock:
+            return int(self._prefix['count'][idx + 1])
+    
+    def _allocate_prefix(self, n_frames: int) -> Dict[str, np.ndarray]:
+        """Prefixes of an unanalyzed timeline (entry i covers frames 0..i-1)"""
+        prefix = {key: np.zeros(n_frames + 1) for key in self._SUM_KEYS}
+        prefix['categories'] = np.zeros((n_frames + 1, self.n_categories))
+        prefix['last'] = np.full(n_frames + 1, -1, dtype=np.int64)  # Last analyzed frame
+        return prefix
+    
+    def _refresh_prefix(self, start: int):
+        """Recompute prefix entries start + 1 .. n from frame start onward"""
+        prefix = self._prefix
+        n_frames = len(self.codes)
+        if start >= n_frames:
+            return
+        
+        pos = np.flatnonzero(self.codes[start:] >= 0)
+        energy = self.energy[start:][pos]
+        codes = self.codes[start:][pos]
+        
+        # Differences between consecutive analyzed frames, continuing from
+        # the last analyzed frame before start (the very first one is 0)
+        previous = prefix['last'][start]
+        if previous >= 0:
+            diffs = np.diff(energy, prepend=self.energy[previous])
+            shifts = codes != np.concatenate(([self.codes[previous]], codes[:-1]))
+        else:
+            diffs = np.diff(energy, prepend=energy[:1])
+            shifts = np.concatenate(([False], codes[1:] != codes[:-1]))
+        
+        def extend(key, values):
+            scattered = np.zeros(n_frames - start)
+            scattered[pos] = values
+            np.cumsum(scattered, out=prefix[key][start + 1:])
+            prefix[key][start + 1:] += prefix[key][start]
+        
+        extend('count', 1.0)
+        extend('energy', energy)
+        extend('silent', energy < self.silence_energy)
+        extend('diff', diffs)
+        extend('diff_sq', diffs * diffs)
+        extend('shifts', shifts)
+        
+        category_counts = np.zeros((n_frames - start, self.n_categories))
+        category_counts[pos, codes] = 1
+        np.cumsum(category_counts, axis=0, out=prefix['categories'][start + 1:])
+        prefix['categories'][start + 1:] += prefix['categories'][start]
+        
+        analyzed = np.full(n_frames - start, -1, dtype=np.int64)
+        analyzed[pos] = start + pos
+        np.maximum.accumulate(analyzed, out=prefix['last'][start + 1:])
+        np.maximum(prefix['last'][start + 1:], previous, out=prefix['last'][start + 1:])
+    
+    def query(self, idx: int) -> Dict:
+        """
+        Metrics for analyzed frames 0..idx (inclusive) in O(1)
+        Same definitions as MetricsProcessor.calculate_realtime_metrics
+        """
+        end = idx + 1
+        with self._lock:
+            count = int(self._prefix['count'][end])
+            values = {
+                key: self._prefix[key][end]
+                for key in ('energy', 'silent', 'diff', 'diff_sq', 'shifts')
+            }
+            category_counts = self._prefix['categories'][end].copy()
+        
+        if count == 0:
+            return {
+                'avg_energy': 0,
+                'silence_pct': 0,
+                'emotion_shifts': 0,
+                'volatility': 0,
+                'category_counts': np.zeros(self.n_categories),
+                'count': 0
+            }
+        
+        # Population std of consecutive differences (matches np.std(np.diff(...)))
+        volatility = 0.0
+        if count >= 2:
+            n_diffs = count - 1
+            mean_diff = values['diff'] / n_diffs
+            variance = max(values['diff_sq'] / n_diffs - mean_diff ** 2, 0.0)
+            volatility = min(np.sqrt(variance) / 5, 10)
+        
+        return {
+            'avg_energy': float(values['energy'] / count),
+            'silence_pct': float(values['silent'] / count * 100),
+            'emotion_shifts': int(values['shifts']),
+            'volatility': float(volatility),
+            'category_counts': category_counts,
+            'count': count
+        }
@@ -4,9 +4,20 @@ Maps raw emotions to Moodflo categories
 """
 import numpy as np
 from typing import Dict, List, Tuple
+from core.emotion_detector import EMOTION_KEYS, emotions_to_array
 from config import settings
 
 
+# Integer codes for compact category arrays (-1 = not yet analyzed)
+CATEGORY_KEYS = tuple(settings.MOODFLO_CATEGORIES.keys())
+CATEGORY_CODES = {key: code for code, key in enumerate(CATEGORY_KEYS)}
+CATEGORY_CODES.update({
+    display: CATEGORY_CODES[key]
+    for key, display in settings.MOODFLO_CATEGORIES.items()
+})
+UNPROCESSED_CODE = -1
+
+
 class MoodMapper:
     """Map Vokaturi emotions to Moodflo categories"""
     
@@ -52,6 +63,54 @@ class MoodMapper:
         """Get display name for category"""
         return settings.MOODFLO_CATEGORIES.get(category, category)
     
+    @staticmethod
+    def get_category_code(category: str) -> int:
+        """Get integer code for a category key or display name"""
+        return CATEGORY_CODES.get(category, UNPROCESSED_CODE)
+    
+    @staticmethod
+    def map_emotions_to_categories(
+        emotion_matrix: np.ndarray,
+        energy_array: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized map_emotion_to_category over many frames
+        
+        emotion_matrix is (N, 5) in EMOTION_KEYS order. The same rules are
+        applied as boolean masks; np.select takes the first that matches,
+        so rule order is preserved. Returns int8 category codes.
+        """
+        emotions = np.asarray(emotion_matrix, dtype=float).reshape(-1, len(EMOTION_KEYS))
+        energy = np.asarray(energy_array, dtype=float)
+        neutral, happy, sad, angry, fearful = (emotions[:, EMOTION_KEYS.index(key)] for key in (
+            'neutral', 'happy', 'sad', 'angry', 'fearful'
+        ))
+        
+        rules = [
+            (happy > 0.4) & (energy > 30),
+            ((angry + fearful) > 0.35) | ((energy > 40) & (angry > 0.25)),
+            (neutral > 0.55) & (energy < 20),
+            (neutral > 0.35) & (20 <= energy) & (energy <= 45) & (sad < 0.25)
+        ]
+        codes = [CATEGORY_CODES[key] for key in ("energised", "stressed", "flat", "thoughtful")]
+        
+        return np.select(rules, codes, default=CATEGORY_CODES["volatile"]).astype(np.int8)
+    
+    @staticmethod
+    def distribution_from_codes(codes: np.ndarray) -> Dict[str, float]:
+        """Percentage of frames per category display name (analyzed frames only)"""
+        codes = np.asarray(codes)
+        analyzed = codes[codes >= 0]
+        if len(analyzed) == 0:
+            return {}
+        
+        counts = np.bincount(analyzed, minlength=len(CATEGORY_KEYS))
+        return {
+            MoodMapper.get_category_display(key): (count / len(analyzed)) * 100
+            for key, count in zip(CATEGORY_KEYS, counts.tolist())
+            if count > 0
+        }
+    
     @staticmethod
     def get_category_distribution(
         emotion_series: List[Dict[str, float]],
@@ -61,22 +120,12 @@ class MoodMapper:
         Calculate distribution of categories across timeline
         Returns: (distribution dict, category list)
         """
-        categories = []
-        
-        for emotion, energy in zip(emotion_series, energy_series):
-            category = MoodMapper.map_emotion_to_category(emotion, energy)
-            categories.append(category)
-        
-        # Calculate percentages
-        distribution = {}
-        total = len(categories)
-        
-        for category in set(categories):
-            count = categories.count(category)
-            display_name = MoodMapper.get_category_display(category)
-            distribution[display_name] = (count / total) * 100
-        
-        return distribution, categories
+        codes = MoodMapper.map_emotions_to_categories(
+            emotions_to_array(emotion_series),
+            energy_series
+        )
+        categories = [CATEGORY_KEYS[code] for code in codes.tolist()]
+        return MoodMapper.distribution_from_codes(codes), categories
     
     @staticmethod
     def get_dominant_emotion(distribution: Dict[str, float]) -> str:
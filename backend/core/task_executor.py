@@ -0,0 +1,65 @@
+"""
+Task Execution Module
+Runs blocking analysis stages off the asyncio event loop
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+from config import settings
+
+
+class TaskExecutor:
+    """
+    Executor-backed execution layer for async endpoints and services
+
+    - run_io: thread pool, for file/network I/O, subprocess pipes and
+      GIL-releasing work (NumPy, waiting on the emotion worker pool)
+    - run_cpu: the shared process pool, for pure-Python CPU work
+      (clustering, PDF rendering) that would otherwise hold the GIL
+    """
+
+    def __init__(self, worker_pool=None, io_workers: int = None):
+        self.io_workers = io_workers or settings.IO_WORKERS
+        self.worker_pool = worker_pool
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_io_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(
+                    max_workers=self.io_workers,
+                    thread_name_prefix="moodflo-io"
+                )
+            return self._io_executor
+
+    def _get_worker_pool(self):
+        if self.worker_pool is None:
+            from core.worker_pool import get_default_pool
+            self.worker_pool = get_default_pool()
+        return self.worker_pool
+
+    async def run_io(self, func: Callable, *args, **kwargs):
+        """Run a blocking call in the I/O thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_io_executor(),
+            partial(func, *args, **kwargs)
+        )
+
+    async def run_cpu(self, func: Callable, *args, **kwargs):
+        """Run a picklable CPU-bound call in the shared process pool"""
+        future = self._get_worker_pool().submit(partial(func, *args, **kwargs))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the I/O thread pool (the process pool is owned by the app)"""
+        with self._lock:
+            executor = self._io_executor
+            self._io_executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
@@ -0,0 +1,98 @@
+"""
+Timeline Format Module
+Columnar (parallel array) emotion timeline and conversion to/from the row format
+"""
+from typing import Dict, List, Sequence
+import numpy as np
+from core.emotion_detector import EMOTION_KEYS
+from core.mood_mapper import CATEGORY_KEYS
+from config import settings
+
+
+# Response versions: 1 = timeline as a list of per-frame dicts, 2 = columnar
+RESULTS_VERSION_ROWS = 1
+RESULTS_VERSION_COLUMNAR = 2
+
+COLUMNAR_FORMAT = "columnar"
+
+
+def category_table() -> List[str]:
+    """Category display names indexed by category code"""
+    return [settings.MOODFLO_CATEGORIES[key] for key in CATEGORY_KEYS]
+
+
+def columnar_timeline(
+    timestamps: np.ndarray,
+    energy: Sequence[float],
+    codes: np.ndarray,
+    emotions: np.ndarray
+) -> Dict:
+    """
+    Timeline as parallel arrays: one list per field, categories as codes
+    into a lookup table, emotions as one list per emotion
+    """
+    emotions = np.asarray(emotions).reshape(-1, len(EMOTION_KEYS))
+    return {
+        'format': COLUMNAR_FORMAT,
+        'length': len(codes),
+        'time': np.asarray(timestamps, dtype=float).tolist(),
+        'energy': np.asarray(energy, dtype=float).tolist(),
+        'category': np.asarray(codes, dtype=int).tolist(),
+        'categories': category_table(),
+        'emotion_raw': {key: emotions[:, i].tolist() for i, key in enumerate(EMOTION_KEYS)}
+    }
+
+
+def is_columnar(timeline) -> bool:
+    return isinstance(timeline, dict) and timeline.get('format') == COLUMNAR_FORMAT
+
+
+def timeline_columns(timeline) -> Dict:
+    """Columnar timeline from either format"""
+    if is_columnar(timeline):
+        return timeline
+
+    table = category_table()
+    codes = {display: code for code, display in enumerate(table)}
+    return {
+        'format': COLUMNAR_FORMAT,
+        'length': len(timeline),
+        'time': [point['time'] for point in timeline],
+        'energy': [point['energy'] for point in timeline],
+        'category': [codes[point['category']] for point in timeline],
+        'categories': table,
+        'emotion_raw': {
+            key: [point['emotion_raw'].get(key, 0) for point in timeline]
+            for key in EMOTION_KEYS
+        }
+    }
+
+
+def timeline_rows(timeline) -> List[Dict]:
+    """Row timeline (list of per-frame dicts) from either format"""
+    if not is_columnar(timeline):
+        return timeline
+
+    table = timeline['categories']
+    emotion_raw = timeline['emotion_raw']
+    emotions = zip(*(emotion_raw[key] for key in EMOTION_KEYS))
+    return [
+        {
+            'time': time,
+            'energy': energy,
+            'category': table[code],
+            'emotion_raw': dict(zip(EMOTION_KEYS, values))
+        }
+        for time, energy, code, values in zip(
+            timeline['time'], timeline['energy'], timeline['category'], emotions
+        )
+    ]
+
+
+def results_version(results: Dict, version: int) -> Dict:
+    """Analysis results with the timeline in the format of a response version"""
+    if version == RESULTS_VERSION_COLUMNAR:
+        timeline = timeline_columns(results['timeline'])
+    else:
+        timeline = timeline_rows(results['timeline'])
+    return dict(results, timeline=timeline, version=version)
@@ -0,0 +1,156 @@
+"""
+Worker Pool Module
+Long-lived process pool for emotion detection, shared by all sessions
+"""
+import os
+import threading
+from multiprocessing import resource_tracker
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+from config import settings
+
+
+def _ping_worker() -> int:
+    """Trivial task used to warm up and health-check workers"""
+    return os.getpid()
+
+
+class EmotionWorkerPool:
+    """
+    Persistent ProcessPoolExecutor with Vokaturi preloaded in every worker
+    Created once at app startup and reused by batch and streaming analysis
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or settings.PARALLEL_WORKERS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.restarts = 0
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """Spawn workers with the Vokaturi initializer"""
+        from core.emotion_detector import get_vokaturi_lib_path, init_emotion_worker
+
+        # Workers must share the parent's resource tracker, otherwise each
+        # one tracks (and later "cleans up") the shared frame buffers itself
+        resource_tracker.ensure_running()
+
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_emotion_worker,
+            initargs=(str(get_vokaturi_lib_path()),)
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def start(self, warm: bool = True):
+        """
+        Start the pool (no-op if already running)
+        With warm=True every worker is spawned and initialised up front
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+                print(f"✓ Emotion worker pool started ({self.max_workers} workers)")
+            executor = self._executor
+
+        if warm:
+            pings = [executor.submit(_ping_worker) for _ in range(self.max_workers)]
+            for ping in pings:
+                ping.result(timeout=settings.WORKER_POOL_HEALTH_TIMEOUT)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Submit a task, restarting the pool once if it is broken"""
+        if self._executor is None:
+            self.start(warm=False)
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError):
+            self.restart()
+            future = self._executor.submit(fn, *args)
+
+        with self._lock:
+            self._in_flight += 1
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future: Future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def health_check(self, timeout: float = None) -> Dict:
+        """
+        Round-trip a trivial task through the pool
+        Restarts the pool if it is broken or unresponsive
+        A busy pool is only checked for breakage - a ping would queue
+        behind the analysis work and time out spuriously
+        """
+        if timeout is None:
+            timeout = settings.WORKER_POOL_HEALTH_TIMEOUT
+
+        executor = self._executor
+        in_flight = self._in_flight
+
+        if executor is None:
+            status = 'stopped'
+        elif getattr(executor, '_broken', False):
+            print("Warning: Emotion worker pool broken, restarting")
+            self.restart()
+            status = 'restarted'
+        elif in_flight > 0:
+            status = 'busy'
+        else:
+            try:
+                executor.submit(_ping_worker).result(timeout=timeout)
+                status = 'healthy'
+            except Exception as e:
+                print(f"Warning: Emotion worker pool unhealthy ({e!r}), restarting")
+                self.restart()
+                status = 'restarted'
+
+        return {
+            'status': status,
+            'workers': self.max_workers,
+            'in_flight': in_flight,
+            'restarts': self.restarts
+        }
+
+    def restart(self):
+        """Replace a broken executor with a fresh one"""
+        with self._lock:
+            old_executor = self._executor
+            self._executor = self._create_executor()
+            self.restarts += 1
+
+        if old_executor is not None:
+            old_executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True):
+        """Gracefully stop all workers"""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            print("✓ Emotion worker pool stopped")
+
+
+# Shared pool used when a detector is not given one explicitly
+_default_pool: Optional[EmotionWorkerPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> EmotionWorkerPool:
+    """Get (or lazily create) the process-wide shared pool"""
+    global _default_pool
+
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = EmotionWorkerPool()
+        return _default_pool
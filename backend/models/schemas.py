@@ -30,6 +30,7 @@ class RealtimeUpdate(BaseModel):
     silence_percentage: float
     emotion_shifts: int
     emotion_distribution: Dict[str, float]
+    pattern_clusters: Optional[str] = None
 
 
 class TimelinePoint(BaseModel):
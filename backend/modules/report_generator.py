@@ -11,6 +11,7 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER
+from core.timeline_format import RESULTS_VERSION_ROWS, results_version, timeline_columns
 
 
 class ReportGenerator:
@@ -55,7 +56,7 @@ class ReportGenerator:
         story = []
         
         summary = self.results['summary']
-        timeline = self.results['timeline']
+        timeline = timeline_columns(self.results['timeline'])
         duration = self.results['duration']
         suggestions = self.results.get('suggestions', 'No insights available.')
         
@@ -177,11 +178,11 @@ class ReportGenerator:
         story.append(Paragraph("Emotion Timeline - 30-second intervals", heading_style))
         
         timeline_data = [["Time", "Emotion", "Energy"]]
-        for t_idx in range(0, len(timeline), max(1, int(30 / 5))):
-            point = timeline[t_idx]
-            time_str = self.format_time(point['time'])
-            emotion = self.strip_emoji(point['category'])  # Remove emoji for PDF
-            energy = f"{point['energy']:.1f}"
+        for t_idx in range(0, timeline['length'], max(1, int(30 / 5))):
+            time_str = self.format_time(timeline['time'][t_idx])
+            category = timeline['categories'][timeline['category'][t_idx]]
+            emotion = self.strip_emoji(category)  # Remove emoji for PDF
+            energy = f"{timeline['energy'][t_idx]:.1f}"
             timeline_data.append([time_str, emotion, energy])
         
         timeline_table = Table(timeline_data, colWidths=[1*inch, 3.5*inch, 1*inch])
@@ -224,18 +225,23 @@ class ReportGenerator:
         buffer.seek(0)
         return buffer
     
-    def generate_json_report(self) -> Dict:
-        """Generate JSON export of all analysis data"""
+    def generate_json_report(self, version: int = RESULTS_VERSION_ROWS) -> Dict:
+        """
+        Generate JSON export of all analysis data
+        The timeline is in the format of the given response version
+        """
+        results = results_version(self.results, version)
         return {
             "metadata": {
                 "session_id": self.session_id,
                 "generated": self.timestamp,
-                "duration": self.results['duration']
+                "duration": results['duration'],
+                "response_version": version
             },
-            "summary": self.results['summary'],
-            "timeline": self.results['timeline'],
-            "clusters": self.results.get('clusters', {}),
-            "suggestions": self.results.get('suggestions', ''),
+            "summary": results['summary'],
+            "timeline": results['timeline'],
+            "clusters": results.get('clusters', {}),
+            "suggestions": results.get('suggestions', ''),
             "version": "2.0.0"
         }
 
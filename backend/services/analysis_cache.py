@@ -0,0 +1,163 @@
+"""
+Analysis Cache Service
+Content-addressed on-disk cache of decoded audio, per-frame emotions and
+full analysis results, keyed by (content hash, pipeline config hash)
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+from config import settings
+
+
+# Settings that change the output of each cached stage
+_STAGE_SETTINGS = {
+    'audio': ['AUDIO_SAMPLE_RATE'],
+    'emotions': ['AUDIO_SAMPLE_RATE', 'FRAME_DURATION', 'HOP_DURATION'],
+    'analysis': [
+        'AUDIO_SAMPLE_RATE', 'FRAME_DURATION', 'HOP_DURATION',
+        'SILENCE_THRESHOLD', 'ENERGY_SCALE', 'MOODFLO_CATEGORIES',
+        'PSYCH_SAFETY_THRESHOLDS', 'OPENAI_MODEL',
+        'CLUSTER_EXACT_MAX_FRAMES', 'CLUSTER_SAMPLE_FRAMES', 'CLUSTER_BATCH_SIZE',
+        'CLUSTER_ONLINE_SEED_FRAMES', 'CLUSTER_REFINE_MAX_ITER', 'CLUSTER_AUTO_K',
+        'CLUSTER_MIN_K', 'CLUSTER_MAX_K', 'CLUSTER_SILHOUETTE_SAMPLE', 'CLUSTER_AUTO_K_BUDGET'
+    ],
+}
+
+def pipeline_config_hash(stage: str, **extra) -> str:
+    """
+    Hash of the settings a stage depends on
+    `extra` adds runtime facts (e.g. which emotion engine is loaded)
+    """
+    config = {name: getattr(settings, name) for name in _STAGE_SETTINGS[stage]}
+    config.update(extra)
+    encoded = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class AnalysisCache:
+    """
+    Size-bounded content-addressed store with LRU eviction
+
+    Each entry is a single file named <stage>-<content hash>-<config hash>.
+    Reads refresh the file's mtime; when the store exceeds max_bytes the
+    least recently used files are evicted first.
+    """
+
+    def __init__(self, root: Path = None, max_bytes: int = None):
+        self.root = Path(root or settings.CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.CACHE_MAX_BYTES
+        self.enabled = settings.CACHE_ENABLED and self.max_bytes > 0
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, stage: str, content_hash: str, suffix: str, **extra) -> Path:
+        config_hash = pipeline_config_hash(stage, **extra)
+        return self.root / f"{stage}-{content_hash}-{config_hash}{suffix}"
+
+    def _read(self, path: Path) -> Optional[Path]:
+        """Return path if cached, marking it recently used"""
+        if not self.enabled:
+            return None
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: Path, write_func):
+        """Write atomically via a temp file, then enforce the size budget"""
+        if not self.enabled:
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_func(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        self.evict()
+
+    # Decoded audio
+
+    def get_audio(self, content_hash: str) -> Optional[np.ndarray]:
+        """Decoded mono audio at AUDIO_SAMPLE_RATE (memory-mapped, read-only)"""
+        path = self._read(self._path('audio', content_hash, '.npy'))
+        if path is None:
+            return None
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+    def put_audio(self, content_hash: str, audio: np.ndarray):
+        path = self._path('audio', content_hash, '.npy')
+        self._write(path, lambda f: np.save(f, np.asarray(audio)))
+
+    # Per-frame emotions
+
+    def get_emotions(self, content_hash: str, engine: str) -> Optional[np.ndarray]:
+        """(N, 5) emotion probabilities in EMOTION_KEYS order"""
+        path = self._read(self._path('emotions', content_hash, '.npy', engine=engine))
+        if path is None:
+            return None
+        try:
+            return np.load(path)
+        except (OSError, ValueError):
+            return None
+
+    def put_emotions(self, content_hash: str, engine: str, emotions: np.ndarray):
+        path = self._path('emotions', content_hash, '.npy', engine=engine)
+        self._write(path, lambda f: np.save(f, np.asarray(emotions, dtype=np.float64)))
+
+    # Full analysis results
+
+    def get_analysis(self, content_hash: str, engine: str) -> Optional[Dict]:
+        path = self._read(self._path('analysis', content_hash, '.json', engine=engine))
+        if path is None:
+            return None
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def put_analysis(self, content_hash: str, engine: str, results: Dict):
+        path = self._path('analysis', content_hash, '.json', engine=engine)
+        encoded = json.dumps(results, default=float).encode('utf-8')
+        self._write(path, lambda f: f.write(encoded))
+
+    # Eviction
+
+    def evict(self) -> int:
+        """Evict least recently used entries until under budget, returns bytes freed"""
+        with self._lock:
+            entries = []
+            for path in self.root.iterdir():
+                if path.name.startswith('.tmp-'):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            freed = 0
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                freed += size
+
+            return freed
@@ -2,97 +2,229 @@
 Analyzer Service
 Handles comprehensive meeting analysis (Overall Analysis section)
 """
+import asyncio
+import os
+import time
+import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Callable, Dict, Optional, Sequence
 from core.audio_processor import AudioProcessor
 from core.emotion_detector import EmotionDetector
 from core.mood_mapper import MoodMapper
 from core.metrics_processor import MetricsProcessor
-from core.cluster_analyzer import ClusterAnalyzer
+from core.frame_stats import FrameStatistics
+from core.frame_store import FrameResultStore
+from core.timeline_format import columnar_timeline
+from core.cluster_analyzer import (
+    ClusterAnalyzer,
+    candidate_cluster_counts,
+    score_cluster_counts,
+    silhouette_sample
+)
 from core.risk_assessor import RiskAssessor
 from core.insights_generator import InsightsGenerator
+from core.task_executor import TaskExecutor
+from services.analysis_cache import AnalysisCache
 from config import settings
 
 
+# Overall progress when each analyze_full stage starts (emotion detection dominates)
+STAGE_PROGRESS = {
+    'processing_audio': 0.0,
+    'detecting_emotions': 0.15,
+    'computing_metrics': 0.75,
+    'mapping_emotions': 0.82,
+    'clustering': 0.85,
+    'assessing_risk': 0.93,
+    'generating_insights': 0.95
+}
+
+
 class AnalyzerService:
     """
     Service for comprehensive meeting analysis
     Used for "Overall Analysis" section
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        worker_pool=None,
+        executor: TaskExecutor = None,
+        cache: AnalysisCache = None
+    ):
+        self.executor = executor or TaskExecutor(worker_pool)
+        self.cache = cache or AnalysisCache()
         self.audio_processor = AudioProcessor()
-        self.emotion_detector = EmotionDetector()
+        self.emotion_detector = EmotionDetector(worker_pool)
         self.mood_mapper = MoodMapper()
         self.cluster_analyzer = ClusterAnalyzer()
         self.risk_assessor = RiskAssessor()
         self.insights_generator = InsightsGenerator()
     
-    async def analyze_full(self, file_path: str) -> Dict:
+    async def analyze_full(
+        self,
+        file_path: str,
+        content_hash: Optional[str] = None,
+        progress: Optional[Callable[[str, float], None]] = None
+    ) -> Dict:
         """
         Run complete analysis on meeting recording
         Returns comprehensive results including clustering and AI insights
+        Every blocking stage runs on the executor, never on the event loop
+        
+        With a content_hash, cached results for identical audio are reused:
+        the final analysis, else decoded audio and per-frame emotions.
+        progress(stage, fraction) is called as each stage starts.
         """
+        started_at = time.time()
+        run_io = self.executor.run_io
+        engine = self.emotion_detector.engine
+        report = progress or (lambda stage, fraction: None)
+        
+        if content_hash:
+            cached = await run_io(self.cache.get_analysis, content_hash, engine)
+            if cached is not None:
+                print("♻️ Using cached analysis for identical audio")
+                return cached
+        
         # Step 1: Process audio
         print("📊 Processing audio...")
-        audio_data = self.audio_processor.process_file(file_path)
+        report("processing_audio", STAGE_PROGRESS["processing_audio"])
+        audio_data = await run_io(self._load_audio_data, file_path, content_hash)
         
         frames = audio_data['frames']
-        timestamps = audio_data['timestamps']
         sample_rate = audio_data['sample_rate']
-        duration = audio_data['duration']
+        frame_stats = audio_data['frame_stats']
         
         # Step 2: Detect emotions (with parallel processing)
         print("🎭 Detecting emotions...")
-        emotion_series = self.emotion_detector.batch_analyze(
-            frames,
-            sample_rate,
-            use_parallel=True
+        report("detecting_emotions", STAGE_PROGRESS["detecting_emotions"])
+        emotion_array = None
+        if content_hash:
+            emotion_array = await run_io(self.cache.get_emotions, content_hash, engine)
+            if emotion_array is not None and len(emotion_array) != len(frames):
+                emotion_array = None
+        
+        if emotion_array is None:
+            emotion_array = await run_io(
+                self.emotion_detector.batch_analyze_array,
+                frames,
+                sample_rate,
+                use_parallel=True,
+                frame_stats=frame_stats
+            )
+            if content_hash:
+                await run_io(self.cache.put_emotions, content_hash, engine, emotion_array)
+        
+        frame_results = await run_io(self._build_frame_results, frame_stats, emotion_array, sample_rate)
+        
+        return await self.build_analysis(
+            frame_results,
+            audio_data['duration'],
+            content_hash=content_hash,
+            progress=progress,
+            analysis_seconds=time.time() - started_at
         )
+    
+    def _build_frame_results(
+        self,
+        frame_stats: FrameStatistics,
+        emotion_array: np.ndarray,
+        sample_rate: int
+    ) -> FrameResultStore:
+        """Frame result store for a whole, already analyzed recording"""
+        hop_samples = int(self.audio_processor.hop_duration * sample_rate)
+        frame_results = FrameResultStore(len(emotion_array), hop_samples, sample_rate)
+        codes = self.mood_mapper.map_emotions_to_categories(emotion_array, frame_stats.energy)
+        frame_results.write(0, frame_stats, emotion_array, codes)
+        return frame_results
+    
+    async def build_analysis(
+        self,
+        frame_results: FrameResultStore,
+        duration: float,
+        content_hash: Optional[str] = None,
+        progress: Optional[Callable[[str, float], None]] = None,
+        cluster_centers: Optional[np.ndarray] = None,
+        n_clusters: Optional[int] = None,
+        analysis_seconds: float = 0.0,
+        cluster_count_chosen: Optional[Callable[[int], None]] = None
+    ) -> Dict:
+        """
+        Overall analysis (metrics, clustering, risk, insights) from fully
+        analyzed frame results - a batch run's or a finished live stream's
+        With a content_hash the result is cached for identical uploads
+        Centers clustered online while streaming only need refining
+        (after resizing, if the chosen count differs from theirs)
         
-        # Step 3: Calculate metrics
+        Without n_clusters (e.g. a count chosen earlier for the session)
+        the count is searched for, within a budget relative to the whole
+        analysis time: analysis_seconds already spent decoding and
+        analyzing frames, plus this build so far. cluster_count_chosen is
+        called with the count only when the search picked it (not when it
+        fell back to the default), so only searched counts are kept.
+        """
+        started_at = time.time()
+        run_io = self.executor.run_io
+        report = progress or (lambda stage, fraction: None)
+        
+        # Step 3: Calculate metrics (stored frame statistics stand in for the frames)
         print("📈 Computing metrics...")
-        metrics_proc = MetricsProcessor(sample_rate)
-        metrics = metrics_proc.calculate_all_metrics(
-            frames,
-            emotion_series,
-            audio_data.get('full_audio')
+        report("computing_metrics", STAGE_PROGRESS["computing_metrics"])
+        metrics_proc = MetricsProcessor(frame_results.sample_rate)
+        metrics = await run_io(
+            metrics_proc.calculate_all_metrics,
+            None,
+            None,
+            frame_stats=frame_results.frame_stats()
         )
         
-        # Step 4: Map to categories
+        # Step 4: Category distribution (frames were categorized as analyzed)
         print("🎯 Mapping emotions...")
-        distribution, categories = self.mood_mapper.get_category_distribution(
-            emotion_series,
-            metrics['energy_timeline']
-        )
+        report("mapping_emotions", STAGE_PROGRESS["mapping_emotions"])
+        distribution = await run_io(self.mood_mapper.distribution_from_codes, frame_results.codes)
         
         dominant_emotion = self.mood_mapper.get_dominant_emotion(distribution)
         
         # Step 5: Cluster analysis (for Overall Analysis only)
         print("🔬 Analyzing patterns...")
-        cluster_data = self.cluster_analyzer.analyze(
-            emotion_series,
-            metrics['energy_timeline']
+        report("clustering", STAGE_PROGRESS["clustering"])
+        if n_clusters is None:
+            analysis_time = analysis_seconds + time.time() - started_at
+            n_clusters = await self.choose_cluster_count(
+                frame_results.emotions,
+                metrics['energy_timeline'],
+                budget=settings.CLUSTER_AUTO_K_BUDGET * analysis_time
+            )
+            if n_clusters is None:
+                n_clusters = self.cluster_analyzer.n_clusters
+            elif cluster_count_chosen is not None:
+                cluster_count_chosen(n_clusters)
+        cluster_data = await self.executor.run_cpu(
+            self.cluster_analyzer.analyze,
+            frame_results.emotions,
+            metrics['energy_timeline'],
+            cluster_centers,
+            n_clusters
         )
         
         # Step 6: Risk assessment
         print("⚠️ Assessing risks...")
-        psych_risk = self.risk_assessor.assess_psychological_safety(
+        report("assessing_risk", STAGE_PROGRESS["assessing_risk"])
+        psych_risk = await run_io(
+            self.risk_assessor.assess_psychological_safety,
             metrics,
             distribution
         )
         
-        # Step 7: Build timeline
-        timeline_data = []
-        for i, (time, energy, category, emotion) in enumerate(
-            zip(timestamps, metrics['energy_timeline'], categories, emotion_series)
-        ):
-            timeline_data.append({
-                'time': float(time),
-                'energy': float(energy),
-                'category': self.mood_mapper.get_category_display(category),
-                'emotion_raw': emotion
-            })
+        # Step 7: Build timeline (columnar; row format is produced per request)
+        timeline_data = await run_io(
+            columnar_timeline,
+            frame_results.timestamps,
+            metrics['energy_timeline'],
+            frame_results.codes,
+            frame_results.emotions
+        )
         
         # Step 8: Create summary
         summary = {
@@ -107,28 +239,80 @@ class AnalyzerService:
         
         # Step 9: Generate AI insights
         print("💡 Generating insights...")
-        suggestions = self.insights_generator.generate_suggestions(summary)
+        report("generating_insights", STAGE_PROGRESS["generating_insights"])
+        suggestions = await run_io(self.insights_generator.generate_suggestions, summary)
         
         print("✅ Analysis complete!")
         
-        return {
+        results = {
             'duration': float(duration),
             'summary': summary,
             'timeline': timeline_data,
             'clusters': cluster_data,
             'suggestions': suggestions
         }
+        
+        if content_hash:
+            await run_io(self.cache.put_analysis, content_hash, self.emotion_detector.engine, results)
+        
+        return results
     
-    def get_timeline_at_time(
+    async def choose_cluster_count(
         self,
-        timeline_data: list,
-        current_time: float
-    ) -> list:
+        emotions: np.ndarray,
+        energy_timeline: Sequence[float],
+        budget: float = 0.0
+    ) -> Optional[int]:
         """
-        Get timeline data up to current time
-        Used for progressive loading in UI
+        Auto-k: the candidate cluster count with the best silhouette score
+        
+        Candidates are fitted and scored on a frame sample, split across
+        one process pool task per core. Each task scores its candidates one
+        by one and stops before a fit that would end past the deadline
+        (`budget` seconds from now), so no scoring outlives the budget.
+        The best count scored in time wins; None if auto-k is off or no
+        candidate was scored (the caller keeps its default count).
         """
-        return [
-            point for point in timeline_data
-            if point['time'] <= current_time
-        ]
+        candidates = candidate_cluster_counts(len(emotions))
+        if not settings.CLUSTER_AUTO_K or not candidates or budget <= 0:
+            return None
+        
+        deadline = time.time() + budget
+        sample = await self.executor.run_io(silhouette_sample, emotions, energy_timeline)
+        
+        # Interleaved so every task covers small and large counts
+        n_tasks = min(os.cpu_count() or 1, len(candidates))
+        results = await asyncio.gather(
+            *(
+                self.executor.run_cpu(score_cluster_counts, sample, candidates[i::n_tasks], deadline)
+                for i in range(n_tasks)
+            ),
+            return_exceptions=True
+        )
+        
+        scores = {}
+        for result in results:
+            if isinstance(result, dict):
+                scores.update(result)
+        if not scores:
+            print(f"⚠️ No cluster count scored within {budget * 1000:.0f} ms budget")
+            return None
+        
+        best = max(scores, key=scores.get)
+        print(f"🔢 Cluster count {best} (silhouette {scores[best]:.3f}, scored {sorted(scores)})")
+        return best
+    
+    def _load_audio_data(self, file_path: str, content_hash: Optional[str] = None) -> Dict:
+        """Decode the file, or rebuild audio data from cached decoded audio"""
+        if content_hash:
+            audio = self.cache.get_audio(content_hash)
+            if audio is not None:
+                print("♻️ Using cached decoded audio")
+                return self.audio_processor.process_audio(audio)
+        
+        audio_data = self.audio_processor.process_file(file_path)
+        
+        if content_hash:
+            self.cache.put_audio(content_hash, audio_data['full_audio'])
+        
+        return audio_data
@@ -0,0 +1,235 @@
+"""
+Analysis Job Queue
+Bounded background execution of analyze requests with status and progress
+"""
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+from config import settings
+
+
+class QueueFullError(Exception):
+    """Raised when a job is refused by admission control"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Analysis queue is full, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class AnalysisJob:
+    """One analyze request: queued, then run by a worker slot"""
+
+    def __init__(self, session_id: str, priority: int = 0):
+        self.job_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.priority = priority
+        self.status = "queued"  # queued | running | complete | failed | cancelled
+        self.stage: Optional[str] = None
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def report(self, stage: str, progress: float):
+        """Progress callback for the running job (stage name, 0..1 overall)"""
+        self.stage = stage
+        self.progress = min(max(float(progress), 0.0), 1.0)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("complete", "failed", "cancelled")
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "priority": self.priority,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class AnalysisJobQueue:
+    """
+    Runs analysis jobs on a fixed number of worker slots
+
+    - jobs wait in a priority queue (higher priority first, FIFO within
+      a priority) and at most `slots` run at once
+    - a request for a session with a queued or running job attaches to
+      that job instead of starting another
+    - once `max_queued` jobs are waiting, new jobs are refused with
+      QueueFullError carrying a Retry-After estimate
+    - finished jobs are kept (up to `history`) so clients can poll them
+
+    Jobs are process-local, like live streams.
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[AnalysisJob], Awaitable[None]],
+        slots: int = None,
+        max_queued: int = None,
+        history: int = None
+    ):
+        self.run_job = run_job
+        self.slots = slots or settings.ANALYSIS_JOB_SLOTS
+        self.max_queued = max_queued if max_queued is not None else settings.MAX_QUEUED_JOBS
+        self.history = history or settings.JOB_HISTORY_SIZE
+
+        self._heap: List = []  # (-priority, seq, job)
+        self._seq = itertools.count()
+        self._available = asyncio.Condition()
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._active: Dict[str, AnalysisJob] = {}  # session id -> queued/running job
+        self._workers: List[asyncio.Task] = []
+        self._avg_duration: Optional[float] = None
+
+        self.stats = {'submitted': 0, 'attached': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for job in self._active.values() if job.status == "queued")
+
+    @property
+    def running(self) -> int:
+        return sum(1 for job in self._active.values() if job.status == "running")
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    def active_job(self, session_id: str) -> Optional[AnalysisJob]:
+        return self._active.get(session_id)
+
+    def position(self, job: AnalysisJob) -> Optional[int]:
+        """0-based place in line for a queued job, None once it has started"""
+        if job.status != "queued":
+            return None
+        waiting = sorted(entry for entry in self._heap if self._is_current(entry))
+        return next(i for i, entry in enumerate(waiting) if entry[2] is job)
+
+    def retry_after(self) -> float:
+        """Rough seconds until a queue slot frees up"""
+        avg = self._avg_duration or 30.0
+        return max(1.0, avg * (self.queued + 1) / self.slots)
+
+    async def submit(self, session_id: str, priority: int = 0) -> AnalysisJob:
+        """Queue a job for the session, or return the one already in flight"""
+        job = self._active.get(session_id)
+        if job is not None:
+            self.stats['attached'] += 1
+            if priority > job.priority and job.status == "queued":
+                # Re-queue at the higher priority; the stale entry is skipped
+                job.priority = priority
+                await self._push(job)
+            return job
+
+        if self.queued >= self.max_queued:
+            self.stats['rejected'] += 1
+            raise QueueFullError(self.retry_after())
+
+        job = AnalysisJob(session_id, priority)
+        self._jobs[job.job_id] = job
+        self._active[session_id] = job
+        self.stats['submitted'] += 1
+        self._trim_history()
+        await self._push(job)
+        return job
+
+    async def _push(self, job: AnalysisJob):
+        async with self._available:
+            heapq.heappush(self._heap, (-job.priority, next(self._seq), job))
+            self._available.notify()
+
+    def cancel(self, session_id: str):
+        """Cancel the session's queued or running job (e.g. session deleted)"""
+        job = self._active.pop(session_id, None)
+        if job is None:
+            return
+        if job._task is not None:
+            job._task.cancel()
+        else:
+            self._finish(job, "cancelled")
+
+    @staticmethod
+    def _is_current(entry) -> bool:
+        priority, _, job = entry
+        return job.status == "queued" and -priority == job.priority
+
+    def _trim_history(self):
+        excess = len(self._jobs) - self.history
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def _finish(self, job: AnalysisJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        job.done.set()
+        if self._active.get(job.session_id) is job:
+            del self._active[job.session_id]
+
+    async def _next_job(self) -> AnalysisJob:
+        async with self._available:
+            while True:
+                while not self._heap:
+                    await self._available.wait()
+                entry = heapq.heappop(self._heap)
+                # Skip cancelled jobs and entries superseded by a re-prioritization
+                if self._is_current(entry):
+                    return entry[2]
+
+    async def _worker(self):
+        while True:
+            job = await self._next_job()
+            job.status = "running"
+            job.started_at = time.time()
+            job._task = asyncio.create_task(self.run_job(job))
+            try:
+                await job._task
+            except asyncio.CancelledError:
+                if not job._task.cancelled():
+                    # The worker itself is being stopped
+                    job._task.cancel()
+                    self._finish(job, "cancelled")
+                    raise
+                self._finish(job, "cancelled")
+            except Exception as e:
+                print(f"❌ Analysis job {job.job_id} failed: {e!r}")
+                self.stats['failed'] += 1
+                self._finish(job, "failed", str(e))
+            else:
+                job.report("complete", 1.0)
+                self.stats['completed'] += 1
+                self._finish(job, "complete")
+
+            duration = job.finished_at - job.started_at
+            self._avg_duration = duration if self._avg_duration is None else 0.8 * self._avg_duration + 0.2 * duration
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.slots)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def summary(self) -> Dict:
+        return dict(self.stats, slots=self.slots, running=self.running, queued=self.queued)
@@ -4,14 +4,17 @@ Handles WebSocket streaming for live dashboard
 """
 import numpy as np
 import asyncio
-from typing import Dict, List, Optional
-from core.audio_processor import AudioProcessor
+import time
+from typing import Dict, Iterator, Optional, Tuple
+from core.audio_processor import AudioProcessor, IncrementalFramer
 from core.emotion_detector import EmotionDetector
-from core.mood_mapper import MoodMapper
-from core.metrics_processor import MetricsProcessor
-from core.cluster_analyzer import ClusterAnalyzer
-from core.insights_generator import InsightsGenerator
-from core.risk_assessor import RiskAssessor
+from core.cluster_analyzer import OnlineClusterModel
+from core.mood_mapper import MoodMapper, CATEGORY_KEYS
+from core.frame_stats import FrameStatistics
+from core.frame_store import FrameResultStore
+from core.frame_scheduler import PlayheadScheduler
+from core.task_executor import TaskExecutor
+from services.analysis_cache import AnalysisCache
 from config import settings
 
 
@@ -21,163 +24,371 @@ class RealtimeStreamingService:
     Optimized for low-latency WebSocket updates with progressive streaming
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        worker_pool=None,
+        executor: TaskExecutor = None,
+        cache: AnalysisCache = None
+    ):
+        self.executor = executor or TaskExecutor(worker_pool)
+        self.cache = cache or AnalysisCache()
+        self._background_tasks = set()
         self.audio_processor = AudioProcessor()
-        self.emotion_detector = EmotionDetector()
+        self.emotion_detector = EmotionDetector(worker_pool)
         self.mood_mapper = MoodMapper()
-        self.metrics_processor = MetricsProcessor()
-        self.cluster_analyzer = ClusterAnalyzer()
-        self.insights_generator = InsightsGenerator()
-        self.risk_assessor = RiskAssessor()
     
     async def initialize_stream(
         self,
         file_path: str,
         callback: Optional[callable] = None,
-        initial_batch_duration: float = 5.0
+        initial_batch_duration: float = 5.0,
+        content_hash: Optional[str] = None,
+        n_clusters: Optional[int] = None
     ) -> Dict:
         """
         Pre-process file for streaming with progressive loading
         
+        Audio is decoded in chunks and framed incrementally; the stream is
+        returned (ready) as soon as the first window(s) are analyzed, while
+        decoding and analysis continue in the background.
+        
         Args:
             file_path: Path to video file
             callback: Optional callback to send partial data (for progressive streaming)
-            initial_batch_duration: Duration in seconds for first batch (default 5s)
+            initial_batch_duration: Seconds of audio analyzed before returning (min one window)
+            content_hash: File hash; cached decoded audio and emotions are reused when present
+            n_clusters: Cluster count for the online clusters (e.g. the session's chosen count)
         
         Returns:
-            Complete stream_data dict (may be partially populated initially)
+            stream_data dict; its 'frame_results' store fills in as frames are analyzed
         """
         print("🎬 Initializing real-time stream...")
+        started_at = time.time()
+        
+        processor = self.audio_processor
+        run_io = self.executor.run_io
+        sample_rate = processor.sample_rate
+        win_samples = int(processor.frame_duration * sample_rate)
+        hop_samples = int(processor.hop_duration * sample_rate)
+        
+        decoder_processes = []  # ffmpeg pipe, killed if the stream is stopped
+        cached_audio = None
+        if content_hash:
+            cached_audio = await run_io(self.cache.get_audio, content_hash)
+        
+        if cached_audio is not None:
+            print("♻️ Using cached decoded audio")
+            chunks = iter([cached_audio])
+            duration = len(cached_audio) / sample_rate
+        else:
+            # Expected length from the container header, so frames can be laid out up front
+            duration = await run_io(processor.probe_stream_duration, file_path)
+            
+            if duration is None:
+                # Unknown length - decode everything first, then stream from memory
+                audio_data = await run_io(processor.process_file, file_path)
+                chunks = iter([audio_data['full_audio']])
+                duration = audio_data['duration']
+            else:
+                chunks = processor.stream_decode(file_path, on_process=decoder_processes.append)
+        
+        expected_samples = int(round(duration * sample_rate))
+        framer = IncrementalFramer(win_samples, hop_samples, expected_samples)
+        total_frames = IncrementalFramer.count_frames(expected_samples, win_samples, hop_samples)
+        
+        # Cached emotions are only trusted against the exact cached audio
+        cached_emotions = None
+        if cached_audio is not None:
+            cached_emotions = await run_io(
+                self.cache.get_emotions, content_hash, self.emotion_detector.engine
+            )
+            if cached_emotions is not None and len(cached_emotions) != total_frames:
+                cached_emotions = None
         
-        # Process audio
-        audio_data = self.audio_processor.process_file(file_path)
-        
-        frames = audio_data['frames']
-        timestamps = audio_data['timestamps']
-        sample_rate = audio_data['sample_rate']
-        duration = audio_data['duration']
-        
-        total_frames = len(frames)
-        
-        # Calculate initial batch size (approximately initial_batch_duration seconds worth of frames)
-        initial_batch_size = int((initial_batch_duration / duration) * total_frames)
-        initial_batch_size = max(1, min(initial_batch_size, total_frames))
-        
-        print(f"📊 Total: {total_frames} frames ({duration:.1f}s)")
-        print(f"🚀 Processing initial batch: {initial_batch_size} frames (~{initial_batch_duration:.1f}s)")
-        
-        # Process initial batch
-        initial_frames = frames[:initial_batch_size]
-        initial_emotions = self.emotion_detector.batch_analyze(
-            initial_frames,
-            sample_rate,
-            use_parallel=True
-        )
-        
-        # Calculate initial energy and categories
-        initial_energy = self.metrics_processor.calculate_energy_timeline(initial_frames)
-        initial_distribution, initial_categories = self.mood_mapper.get_category_distribution(
-            initial_emotions,
-            initial_energy
-        )
-        initial_category_displays = [
-            self.mood_mapper.get_category_display(cat)
-            for cat in initial_categories
-        ]
-        
-        # Create initial stream data
+        # Frames are laid out from the header estimate and filled in as analyzed
+        frame_results = FrameResultStore(total_frames, hop_samples, sample_rate)
         stream_data = {
             'duration': duration,
-            'timestamps': timestamps,
-            'energy_timeline': np.zeros(total_frames),  # Placeholder
-            'emotion_series': [None] * total_frames,  # Placeholder
-            'categories': [''] * total_frames,  # Placeholder
+            'started_at': started_at,
+            'analysis_seconds': None,  # Decode + frame analysis time, set once complete
             'sample_rate': sample_rate,
-            'is_fully_processed': False
+            'frame_results': frame_results,
+            'is_fully_processed': False,
+            'scheduler': PlayheadScheduler(frame_results),
+            'clusters': OnlineClusterModel(n_clusters) if n_clusters else OnlineClusterModel(),  # Emotion pattern clusters so far
+            'background_done': asyncio.Event(),  # Set when background work ends, even on error
+            'background_task': None,  # Decoding / analysis still running after initialization
+            'decoder_processes': decoder_processes,
+            'framer': None  # Decoded audio, held while background work runs
         }
         
-        # Fill in initial batch data
-        stream_data['energy_timeline'][:initial_batch_size] = initial_energy
-        stream_data['emotion_series'][:initial_batch_size] = initial_emotions
-        stream_data['categories'][:initial_batch_size] = initial_category_displays
+        # Decode until the initial batch of windows is complete
+        initial_batch_size = max(1, IncrementalFramer.count_frames(
+            int(initial_batch_duration * sample_rate), win_samples, hop_samples
+        ))
+        decode_finished = False
+        while framer.n_frames < initial_batch_size:
+            chunk = await run_io(next, chunks, None)
+            if chunk is None:
+                decode_finished = True
+                break
+            framer.push(chunk)
+        
+        initial_batch_size = min(initial_batch_size, framer.n_frames)
+        
+        print(f"📊 Expected: {total_frames} frames ({duration:.1f}s)")
+        print(f"🚀 Processing initial batch: {initial_batch_size} frames")
+        
+        await run_io(
+            self._analyze_frames, stream_data, framer, 0, initial_batch_size, cached_emotions
+        )
+        stream_data['scheduler'].mark_processed(0, initial_batch_size)
         
         print(f"✅ Initial batch ready! Sending early 'ready' signal...")
         
-        # If there are more frames, schedule background processing
-        if initial_batch_size < total_frames:
-            # Start background processing (non-blocking)
-            asyncio.create_task(
+        if decode_finished and initial_batch_size == framer.n_frames:
+            self._finalize_stream(stream_data, framer)
+            stream_data['background_done'].set()
+            if content_hash:
+                await run_io(
+                    self._store_stream_cache, stream_data, framer, content_hash,
+                    cached_audio is None, cached_emotions is None
+                )
+            print(f"✅ Stream fully processed!")
+        else:
+            # Keep decoding and analyzing in the background (non-blocking)
+            task = asyncio.create_task(
                 self._process_remaining_frames(
                     stream_data,
-                    frames,
-                    sample_rate,
-                    initial_batch_size
+                    framer,
+                    chunks,
+                    decode_finished,
+                    content_hash,
+                    cached_audio is None,
+                    cached_emotions
                 )
             )
-            print(f"🔄 Background processing started for remaining {total_frames - initial_batch_size} frames...")
-        else:
-            stream_data['is_fully_processed'] = True
-            print(f"✅ Stream fully processed!")
+            # Keep a reference so the task isn't garbage collected mid-run
+            self._background_tasks.add(task)
+            stream_data['background_task'] = task
+            stream_data['framer'] = framer
+            task.add_done_callback(self._background_tasks.discard)
+            task.add_done_callback(lambda _: self._end_background(stream_data))
+            print(f"🔄 Background decoding and analysis started...")
         
         return stream_data
     
     async def _process_remaining_frames(
         self,
         stream_data: Dict,
-        frames: List[np.ndarray],
-        sample_rate: int,
-        start_idx: int
+        framer: IncrementalFramer,
+        chunks: Iterator[np.ndarray],
+        decode_finished: bool = False,
+        content_hash: Optional[str] = None,
+        store_audio: bool = True,
+        cached_emotions: Optional[np.ndarray] = None
     ):
         """
-        Process remaining frames in background
-        Updates stream_data in-place
+        Decode and analyze the rest of the file in background
+        Decoding runs ahead on its own; analysis follows the stream's
+        scheduler, so frames at a client's latest seek are analyzed first
+        Updates stream_data in-place, then caches what was computed
         """
-        remaining_frames = frames[start_idx:]
-        total_frames = len(frames)
-        
-        print(f"🔄 Background: Processing {len(remaining_frames)} remaining frames...")
-        
-        # Process in chunks to allow periodic yielding
-        chunk_size = max(1, len(remaining_frames) // 4)  # Process in 4 chunks
-        
-        for chunk_start in range(0, len(remaining_frames), chunk_size):
-            chunk_end = min(chunk_start + chunk_size, len(remaining_frames))
-            chunk_frames = remaining_frames[chunk_start:chunk_end]
+        scheduler = stream_data['scheduler']
+        decoder = None
+        if not decode_finished:
+            decoder = asyncio.create_task(self._decode_remaining(framer, chunks, scheduler))
+        
+        print(f"🔄 Background: Processing remaining frames...")
+        
+        try:
+            while True:
+                scheduler.changed.clear()
+                final = decoder is None or decoder.done()
+                available = framer.n_frames
+                
+                next_range = scheduler.next_range(available, final)
+                if next_range is None:
+                    if final and scheduler.is_complete(available):
+                        break
+                    # Wait for more decoded frames or a new seek
+                    await scheduler.changed.wait()
+                    continue
+                
+                start_idx, end_idx = next_range
+                await self.executor.run_io(
+                    self._analyze_frames, stream_data, framer, start_idx, end_idx, cached_emotions
+                )
+                scheduler.mark_processed(start_idx, end_idx)
+                
+                analyzed = int(scheduler.processed.sum())
+                total_frames = max(len(stream_data['frame_results']), 1)
+                print(f"  Background progress: {analyzed}/{total_frames} frames ({(analyzed / total_frames * 100):.0f}%)")
             
-            # Analyze chunk
-            chunk_emotions = self.emotion_detector.batch_analyze(
-                chunk_frames,
-                sample_rate,
-                use_parallel=True
+            if decoder is not None:
+                # Surface decode errors
+                await decoder
+        finally:
+            # Stopped or failed: don't leave the decoder running
+            if decoder is not None and not decoder.done():
+                decoder.cancel()
+        
+        self._finalize_stream(stream_data, framer)
+        if content_hash:
+            await self.executor.run_io(
+                self._store_stream_cache, stream_data, framer, content_hash,
+                store_audio, cached_emotions is None
             )
-            
-            # Calculate energy and categories
-            chunk_energy = self.metrics_processor.calculate_energy_timeline(chunk_frames)
-            chunk_distribution, chunk_categories = self.mood_mapper.get_category_distribution(
-                chunk_emotions,
-                chunk_energy
+        print(f"✅ Background processing complete! Stream fully ready.")
+    
+    async def _decode_remaining(
+        self,
+        framer: IncrementalFramer,
+        chunks: Iterator[np.ndarray],
+        scheduler: PlayheadScheduler
+    ):
+        """Push decoded chunks into the framer as fast as the decoder delivers them"""
+        try:
+            while True:
+                chunk = await self.executor.run_io(next, chunks, None)
+                if chunk is None:
+                    break
+                framer.push(chunk)
+                scheduler.notify()
+        finally:
+            scheduler.notify()
+    
+    def _analyze_frames(
+        self,
+        stream_data: Dict,
+        framer: IncrementalFramer,
+        start_idx: int,
+        end_idx: int,
+        cached_emotions: Optional[np.ndarray] = None
+    ):
+        """
+        Analyze complete frames [start_idx, end_idx) into the stream's frame results
+        Emotion detection is skipped when cached_emotions covers the range
+        """
+        if end_idx <= start_idx:
+            return
+        
+        frames = framer.frames(start_idx, end_idx)
+        frame_stats = FrameStatistics.from_frames(frames)
+        
+        if cached_emotions is not None and end_idx <= len(cached_emotions):
+            emotion_array = cached_emotions[start_idx:end_idx]
+        else:
+            emotion_array = self.emotion_detector.batch_analyze_array(
+                frames,
+                stream_data['sample_rate'],
+                use_parallel=True,
+                frame_stats=frame_stats
             )
-            chunk_category_displays = [
-                self.mood_mapper.get_category_display(cat)
-                for cat in chunk_categories
-            ]
-            
-            # Update stream_data in-place
-            actual_start = start_idx + chunk_start
-            actual_end = actual_start + len(chunk_frames)
-            
-            stream_data['energy_timeline'][actual_start:actual_end] = chunk_energy
-            stream_data['emotion_series'][actual_start:actual_end] = chunk_emotions
-            stream_data['categories'][actual_start:actual_end] = chunk_category_displays
-            
-            progress = ((actual_end / total_frames) * 100)
-            print(f"  Background progress: {actual_end}/{total_frames} frames ({progress:.0f}%)")
-            
-            # Yield control to allow other async operations
-            await asyncio.sleep(0.1)
         
+        codes = self.mood_mapper.map_emotions_to_categories(emotion_array, frame_stats.energy)
+        
+        # Decoded length can exceed the header estimate slightly (the store grows)
+        stream_data['frame_results'].write(start_idx, frame_stats, emotion_array, codes)
+        stream_data['clusters'].partial_fit(emotion_array, frame_stats.energy)
+    
+    @staticmethod
+    def _end_background(stream_data: Dict):
+        """Background work is over (done, failed or stopped): release the decoded audio"""
+        stream_data['framer'] = None
+        stream_data['background_done'].set()
+    
+    def _finalize_stream(self, stream_data: Dict, framer: IncrementalFramer):
+        """Reconcile header estimates with the decoded audio and mark complete"""
+        frame_results = stream_data['frame_results']
+        if framer.n_frames != len(frame_results):
+            frame_results.resize(framer.n_frames)
+        
+        stream_data['duration'] = framer.n_samples / stream_data['sample_rate']
+        stream_data['analysis_seconds'] = time.time() - stream_data['started_at']
         stream_data['is_fully_processed'] = True
-        print(f"✅ Background processing complete! Stream fully ready.")
+    
+    def _store_stream_cache(
+        self,
+        stream_data: Dict,
+        framer: IncrementalFramer,
+        content_hash: str,
+        store_audio: bool,
+        store_emotions: bool
+    ):
+        """Cache decoded audio and per-frame emotions of a finished stream"""
+        if store_audio:
+            self.cache.put_audio(content_hash, framer.audio)
+        if store_emotions:
+            self.cache.put_emotions(
+                content_hash,
+                self.emotion_detector.engine,
+                stream_data['frame_results'].emotions
+            )
+    
+    @staticmethod
+    def estimate_memory(stream_data: Dict) -> int:
+        """
+        Approximate bytes held by a stream: its frame results, plus the
+        decoded audio while background decoding / analysis still runs
+        """
+        frame_results = stream_data.get('frame_results')
+        framer = stream_data.get('framer')
+        return (
+            (frame_results.nbytes if frame_results is not None else 0)
+            + (framer.nbytes if framer is not None else 0)
+        )
+    
+    async def stop_stream(self, stream_data: Dict):
+        """
+        Stop a dropped stream's background decoding and analysis
+        The task is cancelled and awaited, and the ffmpeg decoder killed
+        (a decode read already in flight then ends at once).
+        """
+        task = stream_data.get('background_task')
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        
+        for process in stream_data.get('decoder_processes', []):
+            if process.poll() is None:
+                process.kill()
+                await self.executor.run_io(process.wait)
+    
+    async def wait_until_processed(self, stream_data: Dict) -> bool:
+        """Wait for a stream's background analysis to end, True if it completed"""
+        background_done = stream_data.get('background_done')
+        if background_done is not None and not stream_data.get('is_fully_processed'):
+            await background_done.wait()
+        return bool(stream_data.get('is_fully_processed'))
+    
+    def set_playhead(self, stream_data: Dict, client_id: str, current_time: float):
+        """Prioritize analysis of the frames at a client's playback position"""
+        scheduler = stream_data.get('scheduler')
+        if scheduler is None or stream_data.get('is_fully_processed'):
+            return
+        
+        frame_idx = self._find_nearest_index(stream_data['frame_results'].timestamps, current_time)
+        scheduler.set_playhead(client_id, max(frame_idx, 0))
+    
+    def remove_client(self, stream_data: Dict, client_id: str):
+        """Forget a disconnected client's playhead"""
+        scheduler = stream_data.get('scheduler')
+        if scheduler is not None:
+            scheduler.remove_client(client_id)
+    
+    def get_update_key(self, stream_data: Dict, current_time: float) -> Tuple[int, int]:
+        """
+        (frame index, (analyzed frames up to it, cluster version)) for a playback time
+        Realtime data with equal keys differs only in its 'time' field
+        """
+        metrics_index = stream_data['frame_results'].metrics_index
+        current_idx = self._find_nearest_index(stream_data['frame_results'].timestamps, current_time)
+        
+        if current_idx < 0 or current_idx >= len(metrics_index):
+            return current_idx, -1
+        
+        return current_idx, (metrics_index.processed_count(current_idx), stream_data['clusters'].version)
     
     def get_realtime_data(
         self,
@@ -189,19 +400,18 @@ class RealtimeStreamingService:
         Returns real-time KPIs for dashboard
         Handles partially processed data gracefully
         """
-        timestamps = stream_data['timestamps']
-        energy_timeline = stream_data['energy_timeline']
-        categories = stream_data['categories']
-        emotion_series = stream_data['emotion_series']
+        frame_results = stream_data['frame_results']
+        metrics_index = frame_results.metrics_index
         
         # Find current index
-        current_idx = self._find_nearest_index(timestamps, current_time)
+        current_idx = self._find_nearest_index(frame_results.timestamps, current_time)
         
         if current_idx < 0:
             return self._empty_update(current_time)
         
         # Check if this frame has been processed yet
-        if emotion_series[current_idx] is None:
+        # (the index may briefly lag a resize running on the executor)
+        if current_idx >= len(metrics_index) or not metrics_index.is_processed(current_idx):
             # Frame not processed yet, return placeholder
             return {
                 'time': current_time,
@@ -212,31 +422,26 @@ class RealtimeStreamingService:
                 'emotion_shifts': 0,
                 'volatility': 0.0,
                 'emotion_distribution': {},
+                'pattern_clusters': stream_data['clusters'].description,
                 'timeline_length': 0,
                 'is_processed': False
             }
         
-        # Get data up to current time (only processed frames)
-        energy_slice = energy_timeline[:current_idx + 1]
-        category_slice = categories[:current_idx + 1]
-        
         # Current values
-        current_emotion = categories[current_idx]
-        current_energy = energy_timeline[current_idx]
-        
-        # Convert NumPy array to list to avoid ambiguous truth value errors
-        if isinstance(energy_slice, np.ndarray):
-            energy_slice = energy_slice.tolist()
-        
-        # Calculate real-time metrics
-        metrics = self.metrics_processor.calculate_realtime_metrics(
-            energy_slice,
-            category_slice,
-            current_time
+        current_emotion = self.mood_mapper.get_category_display(
+            CATEGORY_KEYS[frame_results.codes[current_idx]]
         )
+        current_energy = frame_results.energy[current_idx]
+        
+        # Metrics up to current time, read from prefix sums in O(1)
+        metrics = metrics_index.query(current_idx)
         
-        # Calculate distribution up to now
-        distribution = self._calculate_distribution(category_slice)
+        # Distribution up to now
+        distribution = {
+            self.mood_mapper.get_category_display(CATEGORY_KEYS[code]): (count / metrics['count']) * 100
+            for code, count in enumerate(metrics['category_counts'])
+            if count > 0
+        }
         
         return {
             'time': current_time,
@@ -247,7 +452,8 @@ class RealtimeStreamingService:
             'emotion_shifts': int(metrics['emotion_shifts']),
             'volatility': float(metrics['volatility']),
             'emotion_distribution': distribution,
-            'timeline_length': len(energy_slice),
+            'pattern_clusters': stream_data['clusters'].description,
+            'timeline_length': current_idx + 1,
             'is_processed': True
         }
     
@@ -264,20 +470,6 @@ class RealtimeStreamingService:
         
         return int(idx)
     
-    def _calculate_distribution(self, categories: List[str]) -> Dict[str, float]:
-        """Calculate category distribution"""
-        if not categories:
-            return {}
-        
-        total = len(categories)
-        distribution = {}
-        
-        for category in set(categories):
-            count = categories.count(category)
-            distribution[category] = (count / total) * 100
-        
-        return distribution
-    
     def _empty_update(self, current_time: float) -> Dict:
         """Return empty update for invalid time"""
         return {
@@ -289,100 +481,7 @@ class RealtimeStreamingService:
             'emotion_shifts': 0,
             'volatility': 0.0,
             'emotion_distribution': {},
-            'timeline_length': 0
-        }
-    
-    async def build_analysis_from_stream(self, stream_data: Dict, file_path: str) -> Dict:
-        """
-        Build full analysis from completed stream_data (no reprocessing needed)
-        This is much faster than running analyze_full() again
-        """
-        print("🚀 Building analysis from stream_data...")
-        
-        timestamps = stream_data['timestamps']
-        energy_timeline = stream_data['energy_timeline']
-        emotion_series = stream_data['emotion_series']
-        categories = stream_data['categories']
-        duration = stream_data['duration']
-        
-        # Convert to list if numpy array
-        if not isinstance(energy_timeline, list):
-            energy_timeline = energy_timeline.tolist()
-        
-        # Step 1: Calculate metrics from energy timeline and categories
-        # Calculate silence (frames below 20 energy)
-        silent_count = sum(1 for e in energy_timeline if e < 20)
-        silence_pct = (silent_count / len(energy_timeline)) * 100
-        
-        # Calculate participation (frames above 20 energy)
-        participation = 100 - silence_pct
-        
-        # Average energy
-        avg_energy = float(np.mean(energy_timeline))
-        
-        # Volatility
-        volatility = self.metrics_processor.calculate_volatility(energy_timeline)
-        
-        # Emotion shifts
-        emotion_shifts = self.metrics_processor.calculate_emotion_shifts(categories)
-        
-        metrics = {
-            'energy_timeline': energy_timeline,
-            'silence_percentage': silence_pct,
-            'participation': participation,
-            'avg_energy': avg_energy,
-            'volatility': volatility,
-            'emotion_shifts': emotion_shifts
-        }
-        
-        # Step 2: Get distribution (use display names from categories)
-        distribution = self._calculate_distribution(categories)
-        dominant_emotion = self.mood_mapper.get_dominant_emotion(distribution)
-        
-        # Step 3: Clustering
-        cluster_data = self.cluster_analyzer.analyze(
-            emotion_series,
-            energy_timeline
-        )
-        
-        # Step 4: Risk assessment
-        psych_risk = self.risk_assessor.assess_psychological_safety(
-            metrics,
-            distribution
-        )
-        
-        # Step 5: Build timeline
-        timeline_data = []
-        for i, (time, energy, category, emotion) in enumerate(
-            zip(timestamps, energy_timeline, categories, emotion_series)
-        ):
-            timeline_data.append({
-                'time': float(time),
-                'energy': float(energy),
-                'category': category,
-                'emotion_raw': emotion
-            })
-        
-        # Step 6: Create summary
-        summary = {
-            'dominant_emotion': dominant_emotion,
-            'avg_energy': float(metrics['avg_energy']),
-            'silence_pct': float(metrics['silence_percentage']),
-            'participation': float(metrics['participation']),
-            'volatility': float(metrics['volatility']),
-            'psych_risk': psych_risk,
-            'distribution': distribution
-        }
-        
-        # Step 7: Generate AI insights
-        suggestions = self.insights_generator.generate_suggestions(summary)
-        
-        print("✅ Analysis built from stream_data (no reprocessing)!")
-        
-        return {
-            'duration': float(duration),
-            'summary': summary,
-            'timeline': timeline_data,
-            'clusters': cluster_data,
-            'suggestions': suggestions
+            'pattern_clusters': None,
+            'timeline_length': 0,
+            'is_processed': False
         }
@@ -0,0 +1,188 @@
+"""
+Session Reaper Service
+Background garbage collection of idle sessions, their files and live streams
+"""
+import asyncio
+import shutil
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+from config import settings
+
+
+def directory_size(path: Path) -> int:
+    """Total size of the files under path (0 if it is gone)"""
+    total = 0
+    for entry in path.rglob('*'):
+        try:
+            if entry.is_file():
+                total += entry.stat().st_size
+        except FileNotFoundError:
+            continue
+    return total
+
+
+class SessionReaper:
+    """
+    Periodically reclaims sessions nobody is using
+
+    Each pass, least recently used first:
+    - sessions idle longer than SESSION_IDLE_TTL are deleted (store entry,
+      upload, reports, live stream)
+    - while session files exceed SESSION_DISK_BUDGET, sessions are deleted
+    - while live streams exceed SESSION_MEMORY_BUDGET, streams are dropped
+      (the session stays; a viewer rebuilds it from the analysis cache)
+    - session directories with no session, and live streams whose session
+      was deleted by another worker, are removed
+    Sessions with connected viewers are never reaped.
+
+    Passes run off the event loop, so dropped streams are only queued
+    there; stop_dropped_streams (after each pass, or after remove_session)
+    stops their background decoding and analysis on the loop.
+    """
+
+    def __init__(
+        self,
+        session_store,
+        live_streams: Dict[str, Dict],
+        estimate_stream_memory: Callable[[Dict], int],
+        has_viewers: Callable[[str], bool] = None,
+        files_dir: Path = None,
+        stop_stream: Callable[[Dict], Awaitable] = None
+    ):
+        self.session_store = session_store
+        self.live_streams = live_streams
+        self.estimate_stream_memory = estimate_stream_memory
+        self.stop_stream = stop_stream
+        self.has_viewers = has_viewers or (lambda session_id: False)
+        self.files_dir = Path(files_dir or settings.SESSION_FILES_DIR)
+
+        self.stats = {
+            'runs': 0,
+            'sessions_reaped': 0,
+            'streams_dropped': 0,
+            'orphans_removed': 0,
+            'disk_bytes_reclaimed': 0,
+            'memory_bytes_reclaimed': 0,
+            'last_run': None
+        }
+        self._task: Optional[asyncio.Task] = None
+        self._dropped: List[Dict] = []  # Streams waiting for stop_dropped_streams
+
+    def session_dir(self, session_id: str) -> Path:
+        return self.files_dir / session_id
+
+    def remove_session(self, session_id: str) -> int:
+        """Delete a session everywhere, returns disk bytes freed"""
+        self.session_store.delete(session_id)
+        stream_data = self._pop_stream(session_id)
+        if stream_data is not None:
+            self.stats['memory_bytes_reclaimed'] += self.estimate_stream_memory(stream_data)
+        return self._remove_dir(self.session_dir(session_id))
+
+    def _pop_stream(self, session_id: str) -> Optional[Dict]:
+        stream_data = self.live_streams.pop(session_id, None)
+        if stream_data is not None:
+            self._dropped.append(stream_data)
+        return stream_data
+
+    async def stop_dropped_streams(self):
+        """Stop the background work of streams dropped since the last call"""
+        dropped, self._dropped = self._dropped, []
+        if self.stop_stream is not None and dropped:
+            await asyncio.gather(*(self.stop_stream(stream_data) for stream_data in dropped))
+
+    def _remove_dir(self, path: Path) -> int:
+        freed = directory_size(path)
+        shutil.rmtree(path, ignore_errors=True)
+        self.stats['disk_bytes_reclaimed'] += freed
+        return freed
+
+    def _drop_stream(self, session_id: str) -> int:
+        stream_data = self._pop_stream(session_id)
+        if stream_data is None:
+            return 0
+        freed = self.estimate_stream_memory(stream_data)
+        self.stats['memory_bytes_reclaimed'] += freed
+        self.stats['streams_dropped'] += 1
+        return freed
+
+    def reap_once(self) -> Dict:
+        """One collection pass (blocking - run it on the I/O executor)"""
+        now = time.time()
+        sessions = self.session_store.list_activity()
+        known = {session_id for session_id, _, _ in sessions}
+
+        disk_usage = {session_id: directory_size(self.session_dir(session_id)) for session_id in known}
+        total_disk = sum(disk_usage.values())
+        reaped = 0
+
+        for session_id, metadata, last_active in sessions:
+            if self.has_viewers(session_id):
+                self.session_store.touch(session_id)
+                continue
+
+            expired = now - last_active > settings.SESSION_IDLE_TTL
+            if not expired and total_disk <= settings.SESSION_DISK_BUDGET:
+                continue
+
+            print(f"🧹 Reaping {'idle' if expired else 'least recently used'} session {session_id}")
+            self.remove_session(session_id)
+            total_disk -= disk_usage[session_id]
+            known.discard(session_id)
+            reaped += 1
+
+        self.stats['sessions_reaped'] += reaped
+
+        # Live streams: deleted elsewhere, then over the memory budget (LRU)
+        for session_id in list(self.live_streams):
+            if session_id not in known and not self.has_viewers(session_id):
+                self._drop_stream(session_id)
+
+        stream_memory = {
+            session_id: self.estimate_stream_memory(stream_data)
+            for session_id, stream_data in list(self.live_streams.items())
+        }
+        total_memory = sum(stream_memory.values())
+        for session_id, _, _ in sessions:
+            if total_memory <= settings.SESSION_MEMORY_BUDGET:
+                break
+            if session_id in stream_memory and not self.has_viewers(session_id):
+                total_memory -= self._drop_stream(session_id)
+
+        # Directories left behind by failed uploads or restarts
+        if self.files_dir.exists():
+            for path in self.files_dir.iterdir():
+                if not path.is_dir() or path.name in known:
+                    continue
+                try:
+                    idle = now - path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if idle > settings.SESSION_IDLE_TTL:
+                    self._remove_dir(path)
+                    self.stats['orphans_removed'] += 1
+
+        self.stats['runs'] += 1
+        self.stats['last_run'] = now
+        return dict(self.stats, disk_bytes=total_disk, memory_bytes=total_memory)
+
+    async def run(self, executor):
+        """Reap every REAPER_INTERVAL seconds until cancelled"""
+        while True:
+            await asyncio.sleep(settings.REAPER_INTERVAL)
+            try:
+                await executor.run_io(self.reap_once)
+                await self.stop_dropped_streams()
+            except Exception as e:
+                print(f"Warning: Session reaper pass failed: {e!r}")
+
+    def start(self, executor):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(executor))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
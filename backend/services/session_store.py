@@ -0,0 +1,247 @@
+"""
+Session Store Service
+Session metadata, status and analysis results, shared across worker processes
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from config import settings
+
+
+def encode_results(results: Dict) -> bytes:
+    """Analysis results as a compressed JSON blob"""
+    return zlib.compress(json.dumps(results, default=float).encode('utf-8'))
+
+
+def decode_results(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+class SessionStore(ABC):
+    """
+    Interface for session storage
+
+    Metadata (file path, filename, content hash, status, error, ...) is a
+    small JSON-able dict read on every request. Analysis results are kept
+    separately as compressed blobs and only loaded on request.
+    """
+
+    @abstractmethod
+    def create(self, session_id: str, metadata: Dict):
+        ...
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Session metadata (without results), None if unknown"""
+
+    @abstractmethod
+    def update(self, session_id: str, **fields):
+        """Merge fields into the session's metadata"""
+
+    @abstractmethod
+    def save_results(self, session_id: str, results: Dict):
+        """Store analysis results and mark the session complete"""
+
+    @abstractmethod
+    def load_results(self, session_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def touch(self, session_id: str):
+        """Mark the session as used now (for idle expiry)"""
+
+    @abstractmethod
+    def list_activity(self) -> List[Tuple[str, Dict, float]]:
+        """(session_id, metadata, last activity) for all sessions, least recent first"""
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store for tests and single-worker development"""
+
+    def __init__(self):
+        self._metadata: Dict[str, Dict] = {}
+        self._results: Dict[str, bytes] = {}
+        self._activity: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def create(self, session_id: str, metadata: Dict):
+        with self._lock:
+            self._metadata[session_id] = dict(metadata)
+            self._activity[session_id] = time.time()
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        metadata = self._metadata.get(session_id)
+        return dict(metadata) if metadata is not None else None
+
+    def update(self, session_id: str, **fields):
+        with self._lock:
+            if session_id in self._metadata:
+                self._metadata[session_id].update(fields)
+                self._activity[session_id] = time.time()
+
+    def save_results(self, session_id: str, results: Dict):
+        blob = encode_results(results)
+        with self._lock:
+            if session_id in self._metadata:
+                self._results[session_id] = blob
+                self._metadata[session_id].update(analysis_complete=True, status="complete")
+                self._activity[session_id] = time.time()
+
+    def load_results(self, session_id: str) -> Optional[Dict]:
+        blob = self._results.get(session_id)
+        return decode_results(blob) if blob is not None else None
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            self._results.pop(session_id, None)
+            self._activity.pop(session_id, None)
+            return self._metadata.pop(session_id, None) is not None
+
+    def count(self) -> int:
+        return len(self._metadata)
+
+    def touch(self, session_id: str):
+        with self._lock:
+            if session_id in self._metadata:
+                self._activity[session_id] = time.time()
+
+    def list_activity(self) -> List[Tuple[str, Dict, float]]:
+        with self._lock:
+            sessions = [
+                (session_id, dict(metadata), self._activity[session_id])
+                for session_id, metadata in self._metadata.items()
+            ]
+        return sorted(sessions, key=lambda session: session[2])
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store (WAL mode), safe to share between uvicorn workers
+    One connection per thread; writes are short transactions
+    """
+
+    def __init__(self, db_path: Path = None):
+        self.db_path = Path(db_path or settings.SESSION_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " id TEXT PRIMARY KEY,"
+                " metadata TEXT NOT NULL,"
+                " results BLOB,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, session_id: str, metadata: Dict):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, metadata, results, created_at, updated_at)"
+                " VALUES (?, ?, NULL, ?, ?)",
+                (session_id, json.dumps(metadata), now, now)
+            )
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT metadata FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, session_id: str, **fields):
+        conn = self._connect()
+        with conn:
+            # Read-merge-write under the write lock so workers don't clobber each other
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT metadata FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return
+            metadata = json.loads(row[0])
+            metadata.update(fields)
+            conn.execute(
+                "UPDATE sessions SET metadata = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(metadata), time.time(), session_id)
+            )
+
+    def save_results(self, session_id: str, results: Dict):
+        blob = encode_results(results)
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT metadata FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return
+            metadata = json.loads(row[0])
+            metadata.update(analysis_complete=True, status="complete")
+            conn.execute(
+                "UPDATE sessions SET metadata = ?, results = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(metadata), blob, time.time(), session_id)
+            )
+
+    def load_results(self, session_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT results FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return decode_results(row[0]) if row and row[0] is not None else None
+
+    def delete(self, session_id: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def touch(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sessions SET updated_at = ? WHERE id = ?",
+                (time.time(), session_id)
+            )
+
+    def list_activity(self) -> List[Tuple[str, Dict, float]]:
+        rows = self._connect().execute(
+            "SELECT id, metadata, updated_at FROM sessions ORDER BY updated_at"
+        ).fetchall()
+        return [(session_id, json.loads(metadata), updated_at) for session_id, metadata, updated_at in rows]
+
+
+def create_session_store(backend: str = None) -> SessionStore:
+    """Build the configured store ("sqlite" or "memory")"""
+    backend = backend or settings.SESSION_STORE
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown session store: {backend}")
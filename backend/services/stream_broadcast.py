@@ -0,0 +1,94 @@
+"""
+Stream Broadcast Service
+Per-session fan-out of realtime updates to every viewer of a stream
+"""
+from collections import OrderedDict
+from typing import Dict, Set
+from config import settings
+
+
+class SessionBroadcaster:
+    """
+    Shares computed realtime updates between the viewers of one stream
+
+    Updates are cached per frame position, tagged with how many frames up
+    to that position were analyzed and the stream's cluster version.
+    Viewers at the same frame reuse the cached update until analysis adds
+    frames (or moves the pattern clusters) in a way that changes it.
+    """
+
+    def __init__(self, streaming_service, stream_data: Dict, max_cached: int = None):
+        self.streaming_service = streaming_service
+        self.stream_data = stream_data
+        self.max_cached = max_cached or settings.BROADCAST_CACHE_FRAMES
+        self.subscribers: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self._updates = OrderedDict()  # frame index -> ((analyzed count, cluster version), update)
+
+    def get_update(self, current_time: float) -> Dict:
+        """Realtime data for a playback time, computed once per frame position"""
+        frame_idx, analyzed = self.streaming_service.get_update_key(self.stream_data, current_time)
+
+        cached = self._updates.get(frame_idx)
+        if cached is not None and cached[0] == analyzed:
+            self.hits += 1
+            self._updates.move_to_end(frame_idx)
+            update = cached[1]
+        else:
+            self.misses += 1
+            update = self.streaming_service.get_realtime_data(self.stream_data, current_time)
+            self._updates[frame_idx] = (analyzed, update)
+            self._updates.move_to_end(frame_idx)
+            if len(self._updates) > self.max_cached:
+                self._updates.popitem(last=False)
+
+        # Shared dict is never mutated; each viewer gets its own time
+        return dict(update, time=current_time)
+
+
+class BroadcastRegistry:
+    """Subscriber registry: one broadcaster per session with live viewers"""
+
+    def __init__(self):
+        self._broadcasters: Dict[str, SessionBroadcaster] = {}
+
+    def subscribe(
+        self,
+        session_id: str,
+        client_id: str,
+        streaming_service,
+        stream_data: Dict
+    ) -> SessionBroadcaster:
+        broadcaster = self._broadcasters.get(session_id)
+
+        # A re-initialized stream gets a fresh broadcaster
+        if broadcaster is None or broadcaster.stream_data is not stream_data:
+            broadcaster = SessionBroadcaster(streaming_service, stream_data)
+            self._broadcasters[session_id] = broadcaster
+
+        broadcaster.subscribers.add(client_id)
+        return broadcaster
+
+    def unsubscribe(self, session_id: str, client_id: str):
+        """Remove a viewer; the broadcaster is dropped with its last viewer"""
+        broadcaster = self._broadcasters.get(session_id)
+        if broadcaster is None:
+            return
+
+        broadcaster.subscribers.discard(client_id)
+        if not broadcaster.subscribers:
+            del self._broadcasters[session_id]
+
+    def has_viewers(self, session_id: str) -> bool:
+        broadcaster = self._broadcasters.get(session_id)
+        return broadcaster is not None and bool(broadcaster.subscribers)
+
+    def close_session(self, session_id: str):
+        self._broadcasters.pop(session_id, None)
+
+    def stats(self) -> Dict:
+        return {
+            'sessions': len(self._broadcasters),
+            'viewers': sum(len(b.subscribers) for b in self._broadcasters.values())
+        }
@@ -0,0 +1,232 @@
+"""
+Stream Connection Service
+Server-push WebSocket session: playback clock, coalesced updates, backpressure
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Optional
+from fastapi import WebSocket, WebSocketDisconnect
+from config import settings
+
+
+class PlaybackClock:
+    """
+    Client playback position extrapolated from play/pause/rate/seek events
+    so the client does not have to report its time continuously
+    """
+
+    def __init__(self, duration: float):
+        self.duration = duration
+        self.playing = False
+        self.rate = 1.0
+        self._anchor_time = 0.0
+        self._anchor_clock = time.monotonic()
+
+    def position(self) -> float:
+        current = self._anchor_time
+        if self.playing:
+            current += (time.monotonic() - self._anchor_clock) * self.rate
+        return min(max(current, 0.0), self.duration)
+
+    def _anchor(self, position: Optional[float] = None):
+        self._anchor_time = self.position() if position is None else float(position)
+        self._anchor_clock = time.monotonic()
+
+    def seek(self, position: float):
+        self._anchor(position)
+
+    def play(self, position: Optional[float] = None, rate: Optional[float] = None):
+        self._anchor(position)
+        if rate is not None:
+            self.set_rate(rate)
+        self.playing = True
+
+    def pause(self, position: Optional[float] = None):
+        self._anchor(position)
+        self.playing = False
+
+    def set_rate(self, rate: float):
+        self._anchor()
+        self.rate = min(max(float(rate), 0.0), settings.STREAM_MAX_RATE)
+
+    @property
+    def finished(self) -> bool:
+        return self.playing and self.position() >= self.duration
+
+
+class StreamConnection:
+    """
+    One viewer's WebSocket on a stream
+
+    The client sends play/pause/rate/seek once per change and the server
+    pushes updates on its own timer. Only the newest update is kept while
+    the socket is busy sending, so a slow client skips stale positions
+    instead of building a backlog. Control replies (pong, errors) are
+    never dropped.
+
+    With an encoder (compact protocol), updates go out as binary frames;
+    control messages stay JSON text. With a broadcaster, update data is
+    shared with the session's other viewers at the same frame.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        streaming_service,
+        stream_data: Dict,
+        client_id: str,
+        encoder=None,
+        broadcaster=None
+    ):
+        self.websocket = websocket
+        self.encoder = encoder
+        self.broadcaster = broadcaster
+        self.streaming_service = streaming_service
+        self.stream_data = stream_data
+        self.client_id = client_id
+        self.clock = PlaybackClock(stream_data['duration'])
+
+        self._control = deque()
+        self._pending_update: Optional[Dict] = None
+        self._outbox = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._force_push = False
+        self._last_pushed = None  # (frame position, was processed)
+
+        self.stats = {'received': 0, 'pushed': 0, 'coalesced': 0, 'dropped': 0}
+
+    async def run(self):
+        """Serve the connection until the client disconnects"""
+        sender = asyncio.create_task(self._send_loop())
+        pusher = asyncio.create_task(self._push_loop())
+        try:
+            await self._receive_loop()
+        finally:
+            sender.cancel()
+            pusher.cancel()
+            await asyncio.gather(sender, pusher, return_exceptions=True)
+            self.streaming_service.remove_client(self.stream_data, self.client_id)
+            stats = self.stats
+            print(
+                f"📊 Stream client closed: {stats['received']} messages in, "
+                f"{stats['pushed']} updates out ({stats['coalesced']} coalesced, {stats['dropped']} stale dropped)"
+            )
+
+    async def _receive_loop(self):
+        while True:
+            try:
+                data = await self.websocket.receive_json()
+            except WebSocketDisconnect:
+                print("WebSocket disconnected by client")
+                return
+
+            self.stats['received'] += 1
+            try:
+                self._handle_message(data)
+            except (TypeError, ValueError) as e:
+                self._send_control({"type": "error", "message": f"Invalid message: {e}"})
+
+    def _handle_message(self, data: Dict):
+        msg_type = data.get("type")
+        clock = self.clock
+
+        if msg_type == "ping":
+            # Respond to keep-alive ping
+            self._send_control({"type": "pong"})
+            return
+
+        if msg_type == "seek":
+            clock.seek(data.get("time", 0))
+        elif msg_type == "play":
+            clock.play(data.get("time"), data.get("rate"))
+        elif msg_type == "pause":
+            clock.pause(data.get("time"))
+        elif msg_type == "rate":
+            clock.set_rate(data.get("rate", 1.0))
+        else:
+            self._send_control({"type": "error", "message": f"Unknown message type: {msg_type}"})
+            return
+
+        # Several events before the next push collapse into one update
+        if self._force_push:
+            self.stats['coalesced'] += 1
+        self._force_push = True
+        self._wake.set()
+
+    def _push_interval(self) -> float:
+        """
+        Seconds between pushes: one per STREAM_UPDATE_INTERVAL of content
+        (at most one per analysis hop), scaled by playback rate
+        """
+        if not self.clock.playing or self.clock.rate <= 0:
+            return settings.STREAM_UPDATE_INTERVAL
+
+        content_interval = min(settings.STREAM_UPDATE_INTERVAL, settings.HOP_DURATION)
+        return max(content_interval / self.clock.rate, settings.STREAM_MIN_PUSH_INTERVAL)
+
+    async def _push_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._push_interval())
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            force = self._force_push
+            self._force_push = False
+
+            # Header-estimated duration is corrected once decoding finishes
+            self.clock.duration = self.stream_data['duration']
+            if self.clock.finished:
+                self.clock.pause(self.clock.duration)
+
+            current_time = self.clock.position()
+            if self.clock.playing or force:
+                self.streaming_service.set_playhead(self.stream_data, self.client_id, current_time)
+
+            if self.broadcaster is not None:
+                update = self.broadcaster.get_update(current_time)
+            else:
+                update = self.streaming_service.get_realtime_data(self.stream_data, current_time)
+
+            # Paused on data the client already has - nothing new to send
+            if not force and not self.clock.playing and self._last_pushed == (current_time, True):
+                continue
+
+            self._last_pushed = (current_time, update.get('is_processed', False))
+            self._queue_update({
+                "type": "update",
+                "time": current_time,
+                "playing": self.clock.playing,
+                "rate": self.clock.rate,
+                "data": update
+            })
+
+    def _queue_update(self, message: Dict):
+        if self._pending_update is not None:
+            # Client is behind - the unsent update is stale
+            self.stats['dropped'] += 1
+        self._pending_update = message
+        self._outbox.set()
+
+    def _send_control(self, message: Dict):
+        self._control.append(message)
+        self._outbox.set()
+
+    async def _send_loop(self):
+        while True:
+            await self._outbox.wait()
+            self._outbox.clear()
+
+            while self._control:
+                await self.websocket.send_json(self._control.popleft())
+
+            if self._pending_update is not None:
+                message = self._pending_update
+                self._pending_update = None
+                if self.encoder is not None:
+                    await self.websocket.send_bytes(self.encoder.encode(message))
+                else:
+                    await self.websocket.send_json(message)
+                self.stats['pushed'] += 1
@@ -0,0 +1,148 @@
+"""
+Stream Protocol Module
+Compact binary WebSocket updates: category codes, changed fields only, MessagePack
+"""
+from typing import Dict, List, Optional
+import numpy as np
+from core.mood_mapper import CATEGORY_KEYS, UNPROCESSED_CODE, MoodMapper
+from config import settings
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    print("Warning: msgpack not installed. Compact stream protocol disabled.")
+
+
+# WebSocket subprotocol a client offers to opt in to compact updates
+COMPACT_SUBPROTOCOL = "moodflo.delta.v1"
+
+# Update field -> short key (top-level message fields, then update data fields)
+_MESSAGE_KEYS = {'time': 't', 'playing': 'p', 'rate': 'r'}
+_DATA_KEYS = {
+    'current_emotion': 'c',
+    'current_energy': 'ce',
+    'avg_energy': 'ae',
+    'silence_percentage': 'sp',
+    'emotion_shifts': 'es',
+    'volatility': 'v',
+    'emotion_distribution': 'd',
+    'pattern_clusters': 'pc',
+    'timeline_length': 'n',
+    'is_processed': 'ok'
+}
+
+# Marks a message carrying every field (first message of a connection)
+_KEYFRAME_KEY = 'k'
+
+# Current-emotion code when there is no frame at all (e.g. recording shorter than one frame)
+NO_DATA_CODE = -2
+_PROCESSING_DISPLAY = 'Processing...'
+_NO_DATA_DISPLAY = 'N/A'
+
+
+def negotiate_subprotocol(offered: List[str]) -> Optional[str]:
+    """Pick the compact protocol if the client offered it and it is available"""
+    if MSGPACK_AVAILABLE and COMPACT_SUBPROTOCOL in offered:
+        return COMPACT_SUBPROTOCOL
+    return None
+
+
+def _single(value) -> float:
+    """Round to float32, the precision fields are sent with"""
+    return float(np.float32(value))
+
+
+class DeltaUpdateEncoder:
+    """
+    Encodes one connection's update messages as MessagePack deltas
+
+    Categories become integer codes (UNPROCESSED_CODE while a frame is
+    pending, NO_DATA_CODE when the stream has no frames), the distribution
+    becomes a list of percentages indexed by code, and only fields that
+    differ from the previously encoded message are sent (so the online
+    pattern clusters text only goes out when it changes).
+    Encode at send time so deltas are against what the client actually
+    received.
+    """
+
+    def __init__(self):
+        self._last: Dict = {}
+
+    @staticmethod
+    def _emotion_code(current_emotion: str) -> int:
+        if current_emotion == _NO_DATA_DISPLAY:
+            return NO_DATA_CODE
+        # 'Processing...' (and anything unknown) is a pending frame
+        return MoodMapper.get_category_code(current_emotion)
+
+    def compact(self, message: Dict) -> Dict:
+        """
+        Full message in compact form (short keys, codes, float32 values)
+        Fields missing from placeholder updates get their empty values
+        """
+        data = message.get('data', {})
+        compact = {
+            't': _single(message.get('time', 0.0)),
+            'p': bool(message.get('playing', False)),
+            'r': _single(message.get('rate', 1.0)),
+            'c': self._emotion_code(data.get('current_emotion', _PROCESSING_DISPLAY)),
+            'n': int(data.get('timeline_length', 0)),
+            'es': int(data.get('emotion_shifts', 0)),
+            'pc': data.get('pattern_clusters'),
+            'ok': bool(data.get('is_processed', False))
+        }
+        for field in ('current_energy', 'avg_energy', 'silence_percentage', 'volatility'):
+            compact[_DATA_KEYS[field]] = _single(data.get(field, 0.0))
+
+        distribution = [0.0] * len(CATEGORY_KEYS)
+        for category, percentage in data.get('emotion_distribution', {}).items():
+            code = MoodMapper.get_category_code(category)
+            if code != UNPROCESSED_CODE:
+                distribution[code] = _single(percentage)
+        compact['d'] = distribution
+
+        return compact
+
+    def encode(self, message: Dict) -> bytes:
+        fields = self.compact(message)
+        if self._last:
+            delta = {key: value for key, value in fields.items() if self._last.get(key) != value}
+        else:
+            delta = dict(fields, **{_KEYFRAME_KEY: 1})
+        self._last = fields
+        return msgpack.packb(delta, use_single_float=True)
+
+
+class DeltaUpdateDecoder:
+    """Rebuilds full update messages from DeltaUpdateEncoder output"""
+
+    def __init__(self):
+        self._state: Dict = {}
+        self._displays = [settings.MOODFLO_CATEGORIES[key] for key in CATEGORY_KEYS]
+
+    def decode(self, payload: bytes) -> Dict:
+        delta = msgpack.unpackb(payload)
+        if delta.pop(_KEYFRAME_KEY, 0):
+            self._state = {}
+        self._state.update(delta)
+        state = self._state
+
+        code = state['c']
+        data = {field: state[key] for field, key in _DATA_KEYS.items()}
+        if code == NO_DATA_CODE:
+            data['current_emotion'] = _NO_DATA_DISPLAY
+        elif code == UNPROCESSED_CODE:
+            data['current_emotion'] = _PROCESSING_DISPLAY
+        else:
+            data['current_emotion'] = self._displays[code]
+        data['emotion_distribution'] = {
+            self._displays[code]: percentage
+            for code, percentage in enumerate(state['d'])
+            if percentage > 0
+        }
+
+        message = {'type': 'update', 'data': data}
+        message.update({field: state[key] for field, key in _MESSAGE_KEYS.items()})
+        return message
@@ -0,0 +1,60 @@
+"""
+Test configuration
+Runs the backend with in-memory sessions, private session files and no analysis cache
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Before config is imported anywhere
+os.environ.setdefault("SESSION_STORE", "memory")
+os.environ.setdefault("SESSION_FILES_DIR", tempfile.mkdtemp(prefix="moodflo_tests_"))
+os.environ.setdefault("CACHE_ENABLED", "false")
+
+
+def synthetic_speech(seconds: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """Amplitude-modulated noise bursts - enough structure for every analysis stage"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 0.2 * t) ** 2
+    carrier = np.sin(2 * np.pi * 180 * t) + 0.3 * rng.standard_normal(len(t))
+    return (0.1 * envelope * carrier).astype(np.float32)
+
+
+@pytest.fixture
+def wav_file(tmp_path):
+    """Write a synthetic WAV of the given length, returns its path"""
+    def write(seconds: float, name: str = "meeting.wav") -> Path:
+        path = tmp_path / name
+        sf.write(path, synthetic_speech(seconds), 16000)
+        return path
+    return write
+
+
+@pytest.fixture(scope="session")
+def client():
+    """API client; the app (worker pool, job queue, reaper) runs once per test session"""
+    from fastapi.testclient import TestClient
+    import app as api
+
+    with TestClient(api.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def upload(client):
+    """Upload a file, returns the session id"""
+    def upload_file(path: Path) -> str:
+        with open(path, "rb") as f:
+            response = client.post("/api/upload", files={"file": (path.name, f)})
+        assert response.status_code == 200, response.text
+        return response.json()["session_id"]
+    return upload_file
@@ -0,0 +1,23 @@
+"""
+Analysis cache tests
+Cache keys follow the settings each stage depends on
+"""
+import pytest
+
+from config import settings
+from services.analysis_cache import pipeline_config_hash
+
+
+@pytest.mark.parametrize("name, value", [
+    ('CLUSTER_AUTO_K', False),
+    ('CLUSTER_MAX_K', 5),
+    ('CLUSTER_EXACT_MAX_FRAMES', 100),
+    ('CLUSTER_SILHOUETTE_SAMPLE', 500)
+])
+def test_clustering_settings_change_analysis_key(monkeypatch, name, value):
+    analysis, emotions = pipeline_config_hash('analysis'), pipeline_config_hash('emotions')
+    monkeypatch.setattr(settings, name, value)
+
+    assert pipeline_config_hash('analysis') != analysis
+    # Cached per-frame emotions stay valid
+    assert pipeline_config_hash('emotions') == emotions
@@ -0,0 +1,30 @@
+"""
+Analysis job tests
+A session's analysis runs once even when several worker processes serve it
+"""
+import os
+import subprocess
+import sys
+
+
+def test_job_owned_by_other_worker_is_not_duplicated(client, upload, wav_file):
+    import app as api
+
+    session_id = upload(wav_file(5.0))
+    other_worker = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        api.session_store.update(session_id, status="analyzing", job_id="other-job", job_pid=other_worker.pid)
+
+        response = client.post(f"/api/analyze/{session_id}")
+        assert response.status_code == 409
+        assert response.json()["detail"]["job_id"] == "other-job"
+        assert "Retry-After" in response.headers
+        assert api.analysis_jobs.active_job(session_id) is None
+    finally:
+        other_worker.kill()
+        other_worker.wait()
+
+    # The owner died mid-job: this worker takes the session over
+    response = client.post(f"/api/analyze/{session_id}")
+    assert response.status_code == 202
+    assert api.session_store.get(session_id)["job_pid"] == os.getpid()
@@ -0,0 +1,49 @@
+"""
+Analyzer service tests
+Auto-k budget from the whole analysis time, and only searched counts reported
+"""
+import asyncio
+
+import pytest
+
+from core.frame_stats import FrameStatistics
+from core.worker_pool import EmotionWorkerPool
+from services.analyzer_service import AnalyzerService
+
+from .test_cluster_analyzer import separated_mixture
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    pool = EmotionWorkerPool(1)
+    pool.start()
+    yield AnalyzerService(pool)
+    pool.shutdown()
+
+
+def build(analyzer, frame_results, analysis_seconds):
+    chosen = []
+    results = asyncio.run(analyzer.build_analysis(
+        frame_results,
+        len(frame_results) * 2.5,
+        analysis_seconds=analysis_seconds,
+        cluster_count_chosen=chosen.append
+    ))
+    return results, chosen
+
+
+def test_cluster_count_searched_within_analysis_budget(analyzer):
+    emotions, energy = separated_mixture(600, 3)
+    rms = energy / 100
+    frame_stats = FrameStatistics(rms, rms * 0.1, rms * 2)
+    frame_results = analyzer._build_frame_results(frame_stats, emotions, 16000)
+
+    # Frames analyzed earlier (e.g. by a live viewer) still count towards the budget
+    results, chosen = build(analyzer, frame_results, analysis_seconds=120.0)
+    assert chosen == [3]
+    assert results['clusters']['n_clusters'] == 3
+
+    # No time to score anything: the default count, and nothing reported to keep
+    results, chosen = build(analyzer, frame_results, analysis_seconds=-1e6)
+    assert chosen == []
+    assert results['clusters']['n_clusters'] == analyzer.cluster_analyzer.n_clusters
@@ -0,0 +1,55 @@
+"""
+Audio processor tests
+ffmpeg decodes fail cleanly instead of hanging on noisy stderr
+"""
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from core.audio_processor import _STDERR_TAIL_BYTES, AudioProcessor
+
+# A decoder that writes far more than a pipe buffer of errors before exiting
+NOISY_DECODER = [
+    sys.executable, '-c',
+    "import sys; sys.stderr.write('x' * 1000000); sys.stdout.buffer.write(bytes(64)); sys.exit(1)"
+]
+
+
+@pytest.fixture
+def noisy_processor(monkeypatch):
+    processor = AudioProcessor()
+    monkeypatch.setattr(processor, '_ffmpeg_pcm_command', lambda file_path: NOISY_DECODER)
+    monkeypatch.setattr(processor, 'probe_duration', lambda file_path: None)
+    return processor
+
+
+def run_with_timeout(func, timeout=20):
+    """Result or exception of func, failing the test if it does not return in time"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func()
+        except Exception as error:
+            outcome['error'] = error
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "decode hung"
+    return outcome
+
+
+@pytest.mark.parametrize("decode", [
+    lambda processor: processor.decode_audio('damaged.mp3'),
+    lambda processor: list(processor.stream_decode('damaged.mp3'))
+], ids=['decode_audio', 'stream_decode'])
+def test_decode_error_with_large_stderr(noisy_processor, decode):
+    outcome = run_with_timeout(lambda: decode(noisy_processor))
+
+    error = outcome.get('error')
+    assert isinstance(error, subprocess.CalledProcessError)
+    assert error.returncode == 1
+    assert 0 < len(error.stderr) <= _STDERR_TAIL_BYTES
@@ -0,0 +1,60 @@
+"""
+Cluster analysis tests
+Auto-k scoring under a deadline and cluster count selection
+"""
+import time
+
+import numpy as np
+
+from core.cluster_analyzer import (
+    ClusterAnalyzer,
+    OnlineClusterModel,
+    candidate_cluster_counts,
+    score_cluster_counts,
+    silhouette_sample
+)
+
+
+def separated_mixture(n_frames: int, n_groups: int, seed: int = 0):
+    """Emotion / energy frames drawn from well separated regimes"""
+    rng = np.random.default_rng(seed)
+    prototypes = np.eye(5)[:n_groups] * 0.8 + 0.04
+    levels = np.linspace(10, 90, n_groups)
+    group = rng.integers(0, n_groups, n_frames)
+    emotions = np.clip(prototypes[group] + rng.normal(0, 0.02, (n_frames, 5)), 0, None)
+    emotions /= emotions.sum(axis=1, keepdims=True)
+    energy = np.clip(levels[group] + rng.normal(0, 3, n_frames), 0, 100)
+    return emotions, energy
+
+
+def test_scoring_stops_at_deadline():
+    emotions, energy = separated_mixture(500, 3)
+    sample = silhouette_sample(emotions, energy)
+
+    assert score_cluster_counts(sample, [2, 3, 4], time.time() - 1) == {}
+
+    scores = score_cluster_counts(sample, candidate_cluster_counts(len(sample)), time.time() + 60)
+    assert sorted(scores) == candidate_cluster_counts(len(sample))
+    assert max(scores, key=scores.get) == 3
+
+
+def test_cluster_count_override():
+    emotions, energy = separated_mixture(300, 3)
+    result = ClusterAnalyzer().analyze(emotions, energy, n_clusters=3)
+
+    assert result['n_clusters'] == 3
+    assert set(result['labels']) == {0, 1, 2}
+    assert len(result['coordinates']) == 300
+    assert result['description'].count('Cluster') == 3
+
+
+def test_streamed_centers_resized_to_chosen_count():
+    emotions, energy = separated_mixture(2000, 3)
+    online = OnlineClusterModel(4)
+    for start in range(0, 2000, 200):
+        online.partial_fit(emotions[start:start + 200], energy[start:start + 200])
+
+    for n_clusters in (2, 3, 6):
+        result = ClusterAnalyzer().analyze(emotions, energy, online.centers, n_clusters)
+        assert result['n_clusters'] == n_clusters
+        assert len(set(result['labels'])) == n_clusters
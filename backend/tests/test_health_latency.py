@@ -0,0 +1,31 @@
+"""
+Health check latency tests
+/api/health must stay responsive while a large analysis runs
+"""
+import statistics
+import time
+
+
+def health_latency(client) -> float:
+    started = time.perf_counter()
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    return time.perf_counter() - started
+
+
+def test_health_latency_flat_during_analysis(client, upload, wav_file):
+    baseline = [health_latency(client) for _ in range(20)]
+
+    session_id = upload(wav_file(900.0, "long_meeting.wav"))
+    assert client.post(f"/api/analyze/{session_id}").status_code == 202
+
+    during = []
+    deadline = time.time() + 240
+    while (status := client.get(f"/api/analysis/{session_id}").json()["status"]) != "complete":
+        assert status != "error" and time.time() < deadline, "analysis did not finish"
+        during.append(health_latency(client))
+        time.sleep(0.05)
+
+    assert len(during) >= 5
+    assert statistics.median(during) < statistics.median(baseline) + 0.05
+    assert max(during) < 0.5
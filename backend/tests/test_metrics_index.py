@@ -0,0 +1,50 @@
+"""
+Realtime metrics index tests
+Incrementally maintained prefixes match metrics recomputed from scratch
+"""
+import numpy as np
+import pytest
+
+from core.metrics_processor import MetricsProcessor, RealtimeMetricsIndex
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_out_of_order_updates_match_recomputed_metrics(seed):
+    rng = np.random.default_rng(seed)
+    n_frames = 300
+    index = RealtimeMetricsIndex(n_frames, 5)
+    energy = np.full(n_frames, np.nan)
+    codes = np.full(n_frames, -1)
+
+    # Priority chunks around seeks, re-analysis of earlier frames, then a resize
+    for _ in range(60):
+        start = int(rng.integers(0, n_frames))
+        end = min(n_frames, start + int(rng.integers(1, 12)))
+        energy[start:end] = rng.uniform(0, 100, end - start).round(int(rng.integers(0, 2)))
+        codes[start:end] = rng.integers(0, 5, end - start)
+        index.update(start, energy[start:end], codes[start:end])
+
+    processor = MetricsProcessor()
+    for idx in range(n_frames):
+        analyzed = np.flatnonzero(codes[:idx + 1] >= 0)
+        expected = processor.calculate_realtime_metrics(
+            energy[analyzed].tolist(), codes[analyzed].tolist(), 0.0
+        )
+        metrics = index.query(idx)
+
+        assert metrics['count'] == len(analyzed)
+        assert metrics['emotion_shifts'] == expected['emotion_shifts']
+        for key in ('avg_energy', 'silence_pct', 'volatility'):
+            assert metrics[key] == pytest.approx(expected[key], abs=1e-6)
+        assert np.array_equal(metrics['category_counts'], np.bincount(codes[analyzed], minlength=5))
+
+
+def test_resize_keeps_analyzed_prefix():
+    index = RealtimeMetricsIndex(10, 5)
+    index.update(2, np.array([10.0, 30.0, 50.0]), np.array([0, 1, 1]))
+    index.resize(6)
+    index.update(5, np.array([70.0]), np.array([2]))
+
+    assert index.processed_count(5) == 4
+    assert index.query(5)['emotion_shifts'] == 2
+    assert index.query(5)['avg_energy'] == pytest.approx(40.0)
@@ -0,0 +1,71 @@
+"""
+Mood mapper tests
+The vectorized mapper agrees with the scalar rules, including at the thresholds
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from core.emotion_detector import EMOTION_KEYS, array_to_emotions
+from core.mood_mapper import CATEGORY_CODES, MoodMapper
+
+
+def around(*thresholds):
+    """Each threshold and its nearest floats either side"""
+    values = []
+    for threshold in thresholds:
+        values += [np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf)]
+    return values
+
+
+def assert_mappers_agree(emotions: np.ndarray, energy: np.ndarray):
+    codes = MoodMapper.map_emotions_to_categories(emotions, energy)
+    expected = [
+        CATEGORY_CODES[MoodMapper.map_emotion_to_category(emotion, float(level))]
+        for emotion, level in zip(array_to_emotions(emotions), energy)
+    ]
+    mismatches = np.flatnonzero(codes != np.array(expected))
+    assert not len(mismatches), f"{len(mismatches)} mismatches, first frame {emotions[mismatches[0]]}"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_matches_scalar_on_random_frames(seed):
+    rng = np.random.default_rng(seed)
+    n_frames = 10000
+    # Probability-like rows and unconstrained ones, energy over and past the 0-100 scale
+    emotions = np.vstack([
+        rng.dirichlet(np.ones(len(EMOTION_KEYS)) * rng.uniform(0.2, 5), n_frames // 2),
+        rng.uniform(0, 1, (n_frames // 2, len(EMOTION_KEYS)))
+    ])
+    energy = rng.uniform(-10, 110, n_frames)
+    assert_mappers_agree(emotions, energy)
+
+
+def test_vectorized_matches_scalar_at_thresholds():
+    grid = {
+        'neutral': [0.0] + around(0.35, 0.55),
+        'happy': [0.0] + around(0.4),
+        'sad': [0.0] + around(0.25),
+        'angry': [0.0, 0.1] + around(0.25, 0.35),
+        'fearful': [0.0, 0.1] + around(0.25, 0.35)
+    }
+    energies = [0.0, 100.0] + around(20, 30, 40, 45)
+
+    rows = np.array(list(itertools.product(*(grid[key] for key in EMOTION_KEYS))))
+    emotions = np.repeat(rows, len(energies), axis=0)
+    energy = np.tile(energies, len(rows))
+    assert_mappers_agree(emotions, energy)
+
+
+def test_rule_order_at_boundaries():
+    """Exactly-at-threshold values fall on the strict side of each rule"""
+    frame = {'neutral': 0.0, 'happy': 0.4, 'sad': 0.0, 'angry': 0.0, 'fearful': 0.0}
+    assert MoodMapper.map_emotion_to_category(frame, 31) == "volatile"
+
+    frame = {'neutral': 0.35, 'happy': 0.0, 'sad': 0.0, 'angry': 0.0, 'fearful': 0.0}
+    assert MoodMapper.map_emotion_to_category(frame, 20) == "volatile"
+
+    frame = {'neutral': 0.36, 'happy': 0.0, 'sad': 0.0, 'angry': 0.0, 'fearful': 0.0}
+    assert MoodMapper.map_emotion_to_category(frame, 20) == "thoughtful"
+    assert MoodMapper.map_emotion_to_category(frame, 45) == "thoughtful"
@@ -0,0 +1,49 @@
+"""
+Session reaper tests
+Dropping a live stream stops its background decoding and analysis, and
+the memory estimate covers the audio it was holding
+"""
+import asyncio
+import shutil
+import subprocess
+
+import pytest
+
+from services.realtime_service import RealtimeStreamingService
+from services.session_reaper import SessionReaper
+from services.session_store import InMemorySessionStore
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_removed_session_stops_stream(tmp_path, wav_file):
+    source = wav_file(120.0)
+    mp3 = tmp_path / "meeting.mp3"
+    subprocess.run(["ffmpeg", "-v", "error", "-i", str(source), str(mp3)], check=True)
+
+    async def scenario():
+        service = RealtimeStreamingService()
+        stream_data = await service.initialize_stream(str(mp3), initial_batch_duration=1.0)
+        live_streams = {"session": stream_data}
+        reaper = SessionReaper(
+            InMemorySessionStore(),
+            live_streams,
+            service.estimate_memory,
+            files_dir=tmp_path / "sessions",
+            stop_stream=service.stop_stream
+        )
+
+        running_memory = service.estimate_memory(stream_data)
+        reaper.remove_session("session")
+        await reaper.stop_dropped_streams()
+        return live_streams, stream_data, running_memory, service.estimate_memory(stream_data)
+
+    live_streams, stream_data, running_memory, stopped_memory = asyncio.run(scenario())
+
+    assert live_streams == {}
+    assert stream_data["background_task"].done()
+    assert not stream_data["is_fully_processed"]
+    assert all(process.poll() is not None for process in stream_data["decoder_processes"])
+
+    # 120 s of decoded float32 audio, then only the frame results
+    assert running_memory > 120 * 16000 * 4
+    assert stopped_memory == stream_data["frame_results"].nbytes
@@ -0,0 +1,87 @@
+"""
+Compact WebSocket protocol tests
+Delta encoding round trips, including placeholder updates without frame data
+"""
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+
+from services.realtime_service import RealtimeStreamingService
+from services.stream_protocol import (
+    COMPACT_SUBPROTOCOL,
+    MSGPACK_AVAILABLE,
+    DeltaUpdateDecoder,
+    DeltaUpdateEncoder
+)
+
+pytestmark = pytest.mark.skipif(not MSGPACK_AVAILABLE, reason="msgpack not installed")
+
+
+def update_message(data, time=1.0):
+    return {'type': 'update', 'time': time, 'playing': False, 'rate': 1.0, 'data': data}
+
+
+def test_round_trip_keeps_fields_and_sends_only_changes():
+    encoder, decoder = DeltaUpdateEncoder(), DeltaUpdateDecoder()
+    data = {
+        'current_emotion': '⚡ Energised',
+        'current_energy': 42.5,
+        'avg_energy': 30.0,
+        'silence_percentage': 10.0,
+        'emotion_shifts': 3,
+        'volatility': 2.5,
+        'emotion_distribution': {'⚡ Energised': 75.0, '🌫 Flat/Disengaged': 25.0},
+        'pattern_clusters': None,
+        'timeline_length': 8,
+        'is_processed': True
+    }
+
+    first = decoder.decode(encoder.encode(update_message(data)))
+    assert first['data']['current_emotion'] == '⚡ Energised'
+    assert first['data']['emotion_distribution'] == data['emotion_distribution']
+    assert first['data']['emotion_shifts'] == 3
+
+    moved = dict(data, current_energy=12.0)
+    payload = encoder.encode(update_message(moved, time=3.5))
+    second = decoder.decode(payload)
+    assert second['time'] == 3.5
+    assert second['data']['current_energy'] == 12.0
+    assert second['data']['avg_energy'] == 30.0
+    assert len(payload) < 20
+
+    clustered = dict(moved, pattern_clusters='Cluster 1: calm')
+    third = decoder.decode(encoder.encode(update_message(clustered, time=4.0)))
+    assert third['data']['pattern_clusters'] == 'Cluster 1: calm'
+    assert 'pc' not in msgpack.unpackb(encoder.encode(update_message(clustered, time=4.5)))
+
+
+def test_empty_update_encodes():
+    """No frames at all (recording shorter than one frame) is 'N/A', not pending"""
+    empty = RealtimeStreamingService._empty_update(None, 2.0)
+    message = DeltaUpdateDecoder().decode(DeltaUpdateEncoder().encode(update_message(empty, 2.0)))
+
+    assert message['data']['current_emotion'] == 'N/A'
+    assert message['data']['is_processed'] is False
+    assert message['data']['emotion_distribution'] == {}
+
+
+def test_placeholder_without_optional_fields_encodes():
+    message = DeltaUpdateDecoder().decode(
+        DeltaUpdateEncoder().encode(update_message({'current_emotion': 'Processing...'}))
+    )
+    assert message['data']['current_emotion'] == 'Processing...'
+    assert message['data']['timeline_length'] == 0
+
+
+def test_zero_frame_stream_reaches_binary_client(client, upload, wav_file):
+    """A recording shorter than one frame still gets binary updates (regression: send loop died)"""
+    session_id = upload(wav_file(2.0, "short.wav"))
+
+    with client.websocket_connect(f"/ws/stream/{session_id}", subprotocols=[COMPACT_SUBPROTOCOL]) as ws:
+        while ws.receive_json()["type"] != "ready":
+            pass
+        ws.send_json({"type": "seek", "time": 0.0})
+        message = DeltaUpdateDecoder().decode(ws.receive_bytes())
+
+    assert message['data']['current_emotion'] == 'N/A'
+    assert message['data']['is_processed'] is False
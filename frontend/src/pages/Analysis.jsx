@@ -6,6 +6,11 @@ import { LineChart, Line, AreaChart, Area, PieChart, Pie, BarChart, Bar, Scatter
 import { getEmotionColor, getRiskColor, formatDuration, emotionConfig } from '../utils/helpers'
 import toast from 'react-hot-toast'
 
+// Scatter colors by cluster label (the cluster count is chosen per meeting, up to 8)
+const CLUSTER_COLORS = [
+  '#667eea', '#f093fb', '#4facfe', '#43e97b', '#ffa500', '#f5576c', '#a8edea', '#fed6e3'
+]
+
 export default function Analysis() {
   const { sessionId } = useParams()
   const navigate = useNavigate()
@@ -116,11 +121,11 @@ export default function Analysis() {
 
   const { summary, timeline, clusters, suggestions, duration } = results
 
-  // Prepare chart data
-  const timelineData = timeline.map(point => ({
-    time: (point.time / 60).toFixed(2),
-    energy: point.energy,
-    category: point.category,
+  // Prepare chart data (columnar timeline: parallel arrays, category codes)
+  const timelineData = timeline.time.map((time, i) => ({
+    time: (time / 60).toFixed(2),
+    energy: timeline.energy[i],
+    category: timeline.categories[timeline.category[i]],
   }))
 
   const distributionData = Object.entries(summary.distribution).map(([emotion, percentage]) => ({
@@ -392,9 +397,7 @@ export default function Analysis() {
                 }))}
               >
                 {clusters.coordinates.map((entry, index) => (
-                  <Cell key={`cell-${index}`} fill={[
-                    '#667eea', '#f093fb', '#4facfe', '#43e97b', '#ffa500'
-                  ][clusters.labels[index] % 5]} />
+                  <Cell key={`cell-${index}`} fill={CLUSTER_COLORS[clusters.labels[index] % CLUSTER_COLORS.length]} />
                 ))}
               </Scatter>
             </ScatterChart>
@@ -111,25 +111,44 @@ export default function LiveDashboard() {
     const video = videoRef.current
     if (!video) return
 
-    const handleTimeUpdate = () => {
-      const time = video.currentTime
-      setCurrentTime(time)
-      if (wsService && connected) {
-        wsService.seek(time)
-      }
-    }
+    // Only playback changes are sent; the server pushes updates while playing
+    const streaming = () => wsService && connected
+
+    const handleTimeUpdate = () => setCurrentTime(video.currentTime)
 
-    const handlePlay = () => setIsPlaying(true)
-    const handlePause = () => setIsPlaying(false)
+    const handlePlay = () => {
+      setIsPlaying(true)
+      if (streaming()) wsService.play(video.currentTime, video.playbackRate)
+    }
+    const handlePause = () => {
+      setIsPlaying(false)
+      if (streaming()) wsService.pause(video.currentTime)
+    }
+    const handleSeeked = () => {
+      if (streaming()) wsService.seek(video.currentTime)
+    }
+    const handleRateChange = () => {
+      if (streaming()) wsService.setRate(video.playbackRate)
+    }
 
     video.addEventListener('timeupdate', handleTimeUpdate)
     video.addEventListener('play', handlePlay)
     video.addEventListener('pause', handlePause)
+    video.addEventListener('seeked', handleSeeked)
+    video.addEventListener('ratechange', handleRateChange)
+
+    // Initial position, in case the video is already playing
+    if (streaming()) {
+      if (video.paused) wsService.seek(video.currentTime)
+      else wsService.play(video.currentTime, video.playbackRate)
+    }
 
     return () => {
       video.removeEventListener('timeupdate', handleTimeUpdate)
       video.removeEventListener('play', handlePlay)
       video.removeEventListener('pause', handlePause)
+      video.removeEventListener('seeked', handleSeeked)
+      video.removeEventListener('ratechange', handleRateChange)
     }
   }, [wsService, connected])
 
@@ -443,6 +462,11 @@ export default function LiveDashboard() {
                realtimeData?.volatility > 4 ? '📊 Moderate changes' :
                '✅ Stable emotions'}
             </p>
+            {realtimeData?.pattern_clusters && (
+              <p className="text-xs text-gray-500 mt-4">
+                🔬 {realtimeData.pattern_clusters}
+              </p>
+            )}
           </div>
         </div>
       </div>
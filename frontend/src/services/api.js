@@ -13,6 +13,13 @@ const api = axios.create({
   },
 })
 
+const JOB_POLL_INTERVAL = 1000 // ms
+
+// Analysis response version: 2 = columnar timeline (parallel arrays)
+const RESULTS_VERSION = 2
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
 export const apiService = {
   /**
    * Upload a meeting recording file
@@ -38,9 +45,49 @@ export const apiService = {
 
   /**
    * Start comprehensive analysis
+   * Queues a background job and polls it until the results are ready
+   */
+  startAnalysis: async (sessionId, onProgress) => {
+    let response
+    for (;;) {
+      try {
+        response = await api.post(`/api/analyze/${sessionId}`, null, {
+          params: { version: RESULTS_VERSION },
+        })
+        break
+      } catch (error) {
+        // Server is at capacity (429) or another server worker is analyzing
+        // the session (409) - wait as long as it asks, then retry
+        if (![409, 429].includes(error.response?.status)) throw error
+        const retryAfter = Number(error.response.headers['retry-after']) || 5
+        await sleep(retryAfter * 1000)
+      }
+    }
+
+    if (response.data.status === 'complete') {
+      return response.data
+    }
+
+    const jobId = response.data.job_id
+    for (;;) {
+      await sleep(JOB_POLL_INTERVAL)
+      const job = await apiService.getJob(jobId)
+      onProgress?.(job)
+
+      if (job.status === 'complete') {
+        return apiService.getAnalysis(sessionId)
+      }
+      if (job.status === 'failed' || job.status === 'cancelled') {
+        throw new Error(job.error || `Analysis ${job.status}`)
+      }
+    }
+  },
+
+  /**
+   * Get analysis job status and progress
    */
-  startAnalysis: async (sessionId) => {
-    const response = await api.post(`/api/analyze/${sessionId}`)
+  getJob: async (jobId) => {
+    const response = await api.get(`/api/jobs/${jobId}`)
     return response.data
   },
 
@@ -48,7 +95,9 @@ export const apiService = {
    * Get analysis results
    */
   getAnalysis: async (sessionId) => {
-    const response = await api.get(`/api/analysis/${sessionId}`)
+    const response = await api.get(`/api/analysis/${sessionId}`, {
+      params: { version: RESULTS_VERSION },
+    })
     return response.data
   },
 
@@ -186,17 +235,42 @@ export class WebSocketService {
   }
 
   /**
-   * Send seek time to server
+   * Send a playback event; the server pushes updates on its own timer
    */
-  seek(time) {
+  send(message) {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-      this.ws.send(JSON.stringify({
-        type: 'seek',
-        time: time,
-      }))
+      this.ws.send(JSON.stringify(message))
     }
   }
 
+  /**
+   * Send seek time to server
+   */
+  seek(time) {
+    this.send({ type: 'seek', time: time })
+  }
+
+  /**
+   * Playback started (or resumed) at time with the given rate
+   */
+  play(time, rate = 1) {
+    this.send({ type: 'play', time: time, rate: rate })
+  }
+
+  /**
+   * Playback paused at time
+   */
+  pause(time) {
+    this.send({ type: 'pause', time: time })
+  }
+
+  /**
+   * Playback rate changed
+   */
+  setRate(rate) {
+    this.send({ type: 'rate', rate: rate })
+  }
+
   /**
    * Register event listener
    */